@@ -0,0 +1,119 @@
+"""
+Bulk Admin Operations for Cashfree AI Support Assistant
+Runs admin operations over many merchants as batched jobs that stream progress
+"""
+from typing import Dict, List, Any, Optional, Iterator
+from datetime import datetime
+import uuid
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+DEFAULT_REMINDER_MESSAGE = "Please complete your pending KYC and compliance requirements to avoid account holds."
+
+
+class BulkAdminJob:
+    """A bulk admin operation over a resolved list of merchants"""
+
+    OPERATIONS = ("merchant_list", "compliance_reminder", "create_ticket")
+
+    def __init__(self, data_manager, operation: str, merchant_ids: Optional[List[str]] = None,
+                 filters: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Prepare a bulk admin job
+
+        Args:
+            data_manager: MerchantDataManager holding the merchant data
+            operation: One of OPERATIONS
+            merchant_ids: Explicit target merchants
+            filters: Filter predicates used when merchant_ids is not given
+            params: Operation parameters (subject/description/priority or message)
+            batch_size: Merchants processed per batch
+        """
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        if operation == "create_ticket" and not (params or {}).get("subject"):
+            raise ValueError("Subject is required to create tickets")
+
+        self.job_id = uuid.uuid4().hex[:12]
+        self.data_manager = data_manager
+        self.operation = operation
+        self.params = params or {}
+        self.batch_size = max(1, min(int(batch_size), MAX_BATCH_SIZE))
+
+        if merchant_ids:
+            # Drop duplicates but keep the caller's order
+            self.merchant_ids = list(dict.fromkeys(merchant_ids))
+        else:
+            self.merchant_ids = data_manager.find_merchants(filters or {})
+
+    def _run_batch(self, batch: List[str]) -> Dict[str, Any]:
+        """Run the operation for one batch of merchants"""
+        if self.operation == "merchant_list":
+            succeeded = []
+            failed = []
+            for merchant_id in batch:
+                record = self.data_manager.get_merchant_record(merchant_id)
+                if record is None:
+                    failed.append({"merchant_id": merchant_id, "error": "Merchant not found"})
+                else:
+                    succeeded.append(record)
+            return {"succeeded": succeeded, "failed": failed}
+
+        if self.operation == "compliance_reminder":
+            return self.data_manager.send_compliance_reminders(
+                batch, self.params.get("message", DEFAULT_REMINDER_MESSAGE)
+            )
+
+        return self.data_manager.create_tickets_on_behalf(
+            batch,
+            self.params["subject"],
+            self.params.get("description", self.params["subject"]),
+            self.params.get("priority", "medium")
+        )
+
+    def run(self) -> Iterator[Dict[str, Any]]:
+        """Run the job batch by batch, yielding a progress event after each batch"""
+        total = len(self.merchant_ids)
+        processed = 0
+        succeeded = 0
+        failed = 0
+
+        yield {
+            "event": "started",
+            "job_id": self.job_id,
+            "operation": self.operation,
+            "total": total,
+            "batch_size": self.batch_size,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        for start in range(0, total, self.batch_size):
+            batch = self.merchant_ids[start:start + self.batch_size]
+            result = self._run_batch(batch)
+            processed += len(batch)
+            succeeded += len(result["succeeded"])
+            failed += len(result["failed"])
+
+            yield {
+                "event": "progress",
+                "job_id": self.job_id,
+                "processed": processed,
+                "total": total,
+                "percent": int((processed / total) * 100),
+                "succeeded": succeeded,
+                "failed": failed,
+                "results": result["succeeded"],
+                "errors": result["failed"]
+            }
+
+        yield {
+            "event": "completed",
+            "job_id": self.job_id,
+            "operation": self.operation,
+            "total": total,
+            "succeeded": succeeded,
+            "failed": failed,
+            "timestamp": datetime.now().isoformat()
+        }
@@ -2,19 +2,115 @@
 Flask API for AI Customer Support Assistant
 Comprehensive endpoints for all merchant support scenarios with separate data management
 """
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify, render_template_string, Response, stream_with_context, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from support_ai import CashfreeSupportAI
-from data_manager import MerchantDataManager
+from data_manager import MerchantDataManager, EVENT_TYPES
+from admin_operations import BulkAdminJob
+from rate_limiter import RateLimiter, MemoryBackend, SQLiteBackend
+from job_queue import JobQueue
+from http_cache import ResponseCache, negotiate_encoding
+from data_export import DataExport
+from shard_router import shard_admin_required
 from config import Config
-import json
+from functools import wraps
+import serialization
 from datetime import datetime
 
+def pretty_requested():
+    """Whether the client asked for indented JSON with ?pretty=true"""
+    return has_request_context() and request.args.get('pretty', '').lower() in ('1', 'true', 'yes')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by the serialization module; compact unless ?pretty=true"""
+    
+    def dumps(self, obj, **kwargs):
+        """Encode to a JSON string"""
+        pretty = bool(kwargs.get('indent')) or pretty_requested()
+        return serialization.dumps(obj, pretty, kwargs.get('default', self.default)).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        """Decode a JSON string or bytes"""
+        return serialization.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Serialize the arguments into a JSON response"""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = serialization.dumps(obj, pretty_requested(), self.default) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
-# Initialize AI support assistant and data manager
-support_ai = CashfreeSupportAI()
+# Initialize data manager and the AI support assistant reading the same data
 data_manager = MerchantDataManager()
+support_ai = CashfreeSupportAI(data_manager)
+
+# Token buckets for the AI endpoints; the SQLite backend is shared by all gunicorn workers
+rate_limiter = RateLimiter(
+    SQLiteBackend(Config.RATE_LIMIT_DB, Config.RATE_LIMIT_MAX_BUCKETS) if Config.RATE_LIMIT_BACKEND == 'sqlite' else MemoryBackend(Config.RATE_LIMIT_MAX_BUCKETS),
+    Config.RATE_LIMITS
+)
+
+# Worker threads for slow operations, polled through /api/jobs/<job_id>
+job_queue = JobQueue(Config.JOB_WORKERS, Config.JOB_STORE_DIR)
+
+# Serialized /api/data/* bodies, reused until the data version changes
+response_cache = ResponseCache(Config.COMPRESSION_MIN_BYTES)
+
+def data_response(domain, build, etag=None, cache_key=None):
+    """Serve a data endpoint with ETag revalidation and negotiated compression"""
+    etag = etag or data_manager.get_data_version(domain)
+    # X-Change-Cursor: where to start /api/data/changes from after this full load
+    headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache', 'X-Change-Cursor': data_manager.get_change_cursor()}
+    if request.if_none_match.contains_weak(etag):
+        # Nothing is rebuilt or serialized for an unchanged domain
+        response_cache.record_not_modified()
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag, weak=True)
+        return response
+    
+    cache_key = cache_key or domain
+    if pretty_requested():
+        cache_key += '|pretty'
+    body, encoding = response_cache.get_body(
+        cache_key, etag,
+        negotiate_encoding(request.headers.get('Accept-Encoding', '')),
+        lambda: (app.json.dumps(build()) + "\n").encode('utf-8')
+    )
+    response = Response(body, mimetype='application/json', headers=headers)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag, weak=True)
+    return response
+
+def format_event(event_id, event_type, data):
+    """Encode one server-sent event"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {app.json.dumps(data)}\n\n"
+
+def get_request_merchant_id():
+    """Merchant a request is made for, from the body or X-Merchant-ID header"""
+    data = request.get_json(silent=True) or {}
+    return data.get('merchant_id') or request.headers.get('X-Merchant-ID') or data_manager.merchant_data['merchant_id']
+
+def get_client_id():
+    """Client address, honouring the first X-Forwarded-For hop behind a proxy"""
+    forwarded = request.headers.get('X-Forwarded-For', '')
+    return forwarded.split(',')[0].strip() or request.remote_addr or 'unknown'
+
+def rate_limited(view):
+    """Reject requests over the merchant, client or global rate limit with 429"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if Config.RATE_LIMIT_ENABLED:
+            retry_after = rate_limiter.check(get_request_merchant_id(), get_client_id())
+            if retry_after:
+                response = jsonify({'error': 'Rate limit exceeded', 'retry_after': round(retry_after, 2)})
+                response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                return response, 429
+        return view(*args, **kwargs)
+    return wrapper
 
 @app.route('/')
 def home():
@@ -456,10 +552,15 @@ def home():
                 }
             }
             
+            let currentDataType = 'merchant';
+            
             async function showData(dataType) {
                 // Update active tab
-                document.querySelectorAll('.data-tab').forEach(tab => tab.classList.remove('active'));
-                event.target.classList.add('active');
+                if (window.event && window.event.target.classList.contains('data-tab')) {
+                    document.querySelectorAll('.data-tab').forEach(tab => tab.classList.remove('active'));
+                    window.event.target.classList.add('active');
+                }
+                currentDataType = dataType;
                 
                 try {
                     const response = await fetch(`/api/data/${dataType}`);
@@ -483,9 +584,21 @@ def home():
                 }
             }
             
+            // Refresh the open tab when the server pushes a change to it
+            const eventTabs = { ticket_updated: 'tickets', kyc_progress: 'kyc', payout_status: 'payout' };
+            function subscribeToUpdates() {
+                if (!window.EventSource) return;
+                const events = new EventSource('/api/events');
+                Object.keys(eventTabs).forEach(type => events.addEventListener(type, () => {
+                    if (currentDataType === eventTabs[type]) showData(currentDataType);
+                }));
+                events.addEventListener('resync', () => showData(currentDataType));
+            }
+            
             // Load initial data
             window.onload = function() {
                 showData('merchant');
+                subscribeToUpdates();
             };
         </script>
     </body>
@@ -494,6 +607,7 @@ def home():
     return render_template_string(html_template)
 
 @app.route('/api/query', methods=['POST'])
+@rate_limited
 def handle_query():
     """Handle merchant support queries"""
     try:
@@ -507,9 +621,14 @@ def handle_query():
         # Get optional ticket history
         ticket_history = data.get('ticket_history', None)
         
+        # Optionally return the query analysis from the same model call
+        include_analysis = bool(data.get('analyze', False))
+        
         # Generate AI response
         try:
-            response_data = support_ai.generate_response(merchant_query, ticket_history)
+            response_data = support_ai.generate_response(
+                merchant_query, ticket_history, include_analysis, merchant_id=get_request_merchant_id()
+            )
             return jsonify(response_data)
         except Exception as ai_error:
             # Fallback response when AI is not available
@@ -530,6 +649,7 @@ def handle_query():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analyze', methods=['POST'])
+@rate_limited
 def analyze_query():
     """Analyze and categorize merchant query"""
     try:
@@ -540,7 +660,7 @@ def analyze_query():
             return jsonify({'error': 'No query provided'}), 400
         
         # Analyze query
-        analysis = support_ai.analyze_query(merchant_query)
+        analysis = support_ai.analyze_query(merchant_query, merchant_id=get_request_merchant_id())
         
         return jsonify(analysis)
         
@@ -548,16 +668,43 @@ def analyze_query():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/summary', methods=['GET'])
+@rate_limited
 def get_conversation_summary():
-    """Get summary of conversation history"""
+    """Get summary of conversation history, or queue it as a job with ?async=true"""
     try:
+        if request.args.get('async', '').lower() == 'true':
+            job = job_queue.submit('summary', lambda report: {'summary': support_ai.get_conversation_summary()})
+            return jsonify({'job_id': job['job_id'], 'status': job['status'], 'status_url': f"/api/jobs/{job['job_id']}"}), 202
+        
         summary = support_ai.get_conversation_summary()
         return jsonify({'summary': summary})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/pipeline/stats', methods=['GET'])
+def get_pipeline_stats():
+    """Get the share of queries answered per tier and tier latency"""
+    try:
+        return jsonify(support_ai.get_pipeline_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/rate-limit/stats', methods=['GET'])
+def get_rate_limit_stats():
+    """Get rate limiter counts and model scheduler state for this worker"""
+    try:
+        return jsonify({
+            'backend': Config.RATE_LIMIT_BACKEND,
+            'limits': Config.RATE_LIMITS,
+            'requests': rate_limiter.get_stats(),
+            'scheduler': support_ai.scheduler.get_stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/scenario/<scenario_type>', methods=['POST'])
+@rate_limited
 def handle_scenario(scenario_type):
     """Handle specific merchant scenarios"""
     try:
@@ -580,8 +727,7 @@ def handle_scenario(scenario_type):
 def get_merchant_data():
     """Get merchant information"""
     try:
-        data = data_manager.get_merchant_info()
-        return jsonify(data)
+        return data_response('merchant', data_manager.get_merchant_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -589,8 +735,7 @@ def get_merchant_data():
 def get_account_data():
     """Get account status data"""
     try:
-        data = data_manager.get_account_status()
-        return jsonify(data)
+        return data_response('account', data_manager.get_account_status)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -598,8 +743,7 @@ def get_account_data():
 def get_kyc_data():
     """Get KYC status data"""
     try:
-        data = data_manager.get_kyc_status()
-        return jsonify(data)
+        return data_response('kyc', data_manager.get_kyc_status)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -607,8 +751,7 @@ def get_kyc_data():
 def get_payout_data():
     """Get payout information"""
     try:
-        data = data_manager.get_payout_info()
-        return jsonify(data)
+        return data_response('payout', data_manager.get_payout_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -616,8 +759,7 @@ def get_payout_data():
 def get_tickets_data():
     """Get support tickets data"""
     try:
-        data = data_manager.get_support_tickets()
-        return jsonify(data)
+        return data_response('tickets', data_manager.get_support_tickets)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -625,8 +767,7 @@ def get_tickets_data():
 def get_limits_data():
     """Get transaction limits data"""
     try:
-        data = data_manager.get_transaction_limits()
-        return jsonify(data)
+        return data_response('limits', data_manager.get_transaction_limits)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -634,8 +775,7 @@ def get_limits_data():
 def get_notifications_data():
     """Get notification preferences"""
     try:
-        data = data_manager.get_notification_preferences()
-        return jsonify(data)
+        return data_response('notifications', data_manager.get_notification_preferences)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -643,19 +783,143 @@ def get_notifications_data():
 def get_dashboard_data():
     """Get dashboard insights"""
     try:
-        data = data_manager.get_dashboard_insights()
-        return jsonify(data)
+        return data_response('dashboard', data_manager.get_dashboard_insights)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/data/summary', methods=['GET'])
 def get_all_data_summary():
-    """Get comprehensive data summary"""
+    """Get comprehensive data summary, optionally projected with ?fields= or ?include="""
     try:
-        data = data_manager.get_all_data_summary()
-        return jsonify(data)
+        fields = [
+            field.strip()
+            for name in ('fields', 'include')
+            for field in request.args.get(name, '').split(',') if field.strip()
+        ]
+        if not fields:
+            return data_response('summary', data_manager.get_all_data_summary)
+        
+        try:
+            projection = data_manager.parse_summary_fields(fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        # One cached body per distinct projection; its ETag ignores changes to other sections
+        canonical = ','.join(
+            section if names is None else ','.join(f"{section}.{name}" for name in names)
+            for section, names in projection.items()
+        )
+        return data_response(
+            'summary',
+            lambda: data_manager.get_all_data_summary(fields),
+            etag=data_manager.get_summary_version(list(projection)),
+            cache_key=f"summary?{canonical}"
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/data/changes', methods=['GET'])
+def get_data_changes():
+    """Get records changed since a change feed cursor"""
+    try:
+        since = request.args.get('since')
+        if not since:
+            # No cursor yet: hand out the current position to sync from
+            return jsonify({'changes': [], 'cursor': data_manager.get_change_cursor(), 'has_more': False, 'reset': False})
+        
+        domains = [domain for domain in request.args.get('domains', '').split(',') if domain] or None
+        limit = max(1, min(request.args.get('limit', 500, type=int), 5000))
+        return jsonify(data_manager.get_changes(since, domains, limit))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Push a merchant's ticket, KYC and payout updates as server-sent events"""
+    try:
+        merchant_id = request.args.get('merchant_id') or get_request_merchant_id()
+        types = [event_type for event_type in request.args.get('types', '').split(',') if event_type] or None
+        unknown = sorted(set(types or ()) - set(EVENT_TYPES.values()))
+        if unknown:
+            return jsonify({'error': f"Unknown event types: {', '.join(unknown)}"}), 400
+        # Browsers send Last-Event-ID when they reconnect on their own
+        since = request.headers.get('Last-Event-ID') or request.args.get('since')
+        # Subscribe before replaying so nothing published in between is missed
+        subscription = data_manager.events.subscribe(merchant_id, types)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            last_id = data_manager.get_change_cursor()
+            last_seq = data_manager.change_log.sequence
+            replayed = data_manager.replay_events(since, merchant_id, types, Config.EVENT_STREAM_MAX_PENDING) if since else []
+            if replayed is None:
+                yield format_event(last_id, 'resync', {'since': since, 'cursor': last_id})
+            else:
+                for event in replayed:
+                    yield format_event(event['id'], event['type'], event['data'])
+                    if event['seq'] > last_seq:
+                        last_id, last_seq = event['id'], event['seq']
+                yield format_event(last_id, 'ready', {'merchant_id': merchant_id, 'cursor': last_id})
+            
+            while True:
+                events, lagged = subscription.wait(Config.EVENT_STREAM_HEARTBEAT)
+                if lagged:
+                    # Too slow to keep up: the dropped events are fetched from the change feed instead
+                    cursor = data_manager.get_change_cursor()
+                    yield format_event(cursor, 'resync', {'since': last_id, 'cursor': cursor})
+                    last_id = cursor
+                elif not events:
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                for event in events:
+                    if event['seq'] <= last_seq:
+                        continue
+                    yield format_event(event['id'], event['type'], event['data'])
+                    last_id, last_seq = event['id'], event['seq']
+        finally:
+            data_manager.events.unsubscribe(subscription)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/events/stats', methods=['GET'])
+def get_event_stats():
+    """Get open event streams and delivery counts for this worker"""
+    try:
+        return jsonify(data_manager.events.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Query parameters of /api/export/<entity> that are not column filters
+EXPORT_OPTIONS = ('format', 'cursor', 'limit', 'from', 'to', 'batch_size')
+
+@app.route('/api/export/<entity>', methods=['GET'])
+def export_data(entity):
+    """Stream every matching row of an entity as NDJSON, CSV or column batches"""
+    try:
+        export = DataExport(
+            data_manager,
+            entity,
+            request.args.get('format', 'ndjson'),
+            filters={name: value for name, value in request.args.items() if name not in EXPORT_OPTIONS},
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int),
+            batch_size=request.args.get('batch_size', 500, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    
+    return Response(stream_with_context(export.stream()), content_type=export.content_type, headers={
+        'Content-Disposition': f'attachment; filename="{export.filename}"'
+    })
 
 @app.route('/api/data/reload', methods=['POST'])
 def reload_data():
@@ -674,7 +938,7 @@ def list_data_files():
     """List all available data files"""
     try:
         import os
-        data_folder = "data"
+        data_folder = data_manager.data_folder
         if not os.path.exists(data_folder):
             return jsonify({'files': [], 'message': 'Data folder not found'})
         
@@ -721,12 +985,30 @@ def update_ticket_status(ticket_id):
         if not status:
             return jsonify({'error': 'Status is required'}), 400
         
-        success = data_manager.update_ticket_status(ticket_id, status)
+        success = data_manager.update_ticket_status(ticket_id, status, data.get('resolution'))
         if success:
             return jsonify({'message': f'Ticket {ticket_id} status updated to {status}'})
         else:
             return jsonify({'error': 'Ticket not found'}), 404
-        
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sla/stats', methods=['GET'])
+def get_sla_stats():
+    """Resolution-time mean and percentiles per priority and category, with SLA hit rates"""
+    try:
+        return jsonify(data_manager.get_sla_report())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sla/at-risk', methods=['GET'])
+def get_sla_at_risk():
+    """Open tickets past the warning share of their SLA target, most overdue first"""
+    try:
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        tickets = data_manager.get_sla_at_risk(limit)
+        return jsonify({'tickets': tickets, 'count': len(tickets)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -750,8 +1032,283 @@ def add_kyc_document():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# WSGI application for Vercel deployment
-app.wsgi_app = app
+@app.route('/api/kyc/document/<document_type>/status', methods=['PUT'])
+def update_kyc_document_status(document_type):
+    """Update the verification status of a KYC document"""
+    try:
+        data = request.get_json()
+        status = data.get('status', '')
+        
+        if not status:
+            return jsonify({'error': 'Status is required'}), 400
+        
+        error = data_manager.update_kyc_document_status(document_type, status)
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify({'message': f'Document {document_type} status updated to {status}'})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/kyc/documents/bulk', methods=['POST'])
+def bulk_update_kyc_documents():
+    """Apply many KYC document verdicts in one call"""
+    try:
+        data = request.get_json()
+        verdicts = data.get('verdicts', [])
+        
+        if not verdicts:
+            return jsonify({'error': 'No verdicts provided'}), 400
+        
+        result = data_manager.bulk_update_kyc_documents(verdicts)
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/notifications/preferences', methods=['PUT'])
+def update_notification_preference():
+    """Update a single notification preference"""
+    try:
+        data = request.get_json()
+        channel = data.get('channel', '')
+        event_type = data.get('event_type', '')
+        enabled = data.get('enabled', True)
+        
+        if not channel or not event_type:
+            return jsonify({'error': 'Channel and event type are required'}), 400
+        
+        success = data_manager.update_notification_preference(channel, event_type, enabled)
+        if success:
+            return jsonify({'message': f'{channel} notifications for {event_type} set to {bool(enabled)}'})
+        else:
+            return jsonify({'error': f'Unknown channel: {channel}'}), 400
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/notifications/recipients/<event_type>', methods=['GET'])
+def get_notification_recipients(event_type):
+    """Get merchants subscribed to an event type, grouped by channel"""
+    try:
+        channel = request.args.get('channel')
+        data = data_manager.get_notification_recipients(event_type, channel)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Admin Endpoints
+@app.route('/api/admin/merchants', methods=['GET'])
+def list_merchants():
+    """List merchants matching admin filters, one page at a time"""
+    try:
+        filters = {
+            field: request.args.getlist(field)
+            for field in ('account_status', 'compliance_status', 'risk_score')
+            if request.args.getlist(field)
+        }
+        for field in ('risk_score_min', 'risk_score_max', 'last_activity_after', 'last_activity_before', 'inactive_days'):
+            if request.args.get(field):
+                filters[field] = request.args.get(field)
+        if 'pending_kyc' in request.args:
+            filters['pending_kyc'] = request.args.get('pending_kyc', '').lower() == 'true'
+        
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        cursor = int(request.args.get('cursor', 0))
+        
+        return jsonify(data_manager.query_merchants(filters, limit=limit, cursor=cursor))
+    except (ValueError, KeyError) as e:
+        return jsonify({'error': f'Invalid filter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/cache/stats', methods=['GET'])
+def get_shared_cache_stats():
+    """Get this worker's view of the shared merchant cache"""
+    try:
+        return jsonify(data_manager.get_shared_cache_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/audit/<merchant_id>/state', methods=['GET'])
+def get_audit_state(merchant_id):
+    """Rebuild a merchant's records as they were at ?at= (ISO date or timestamp; default now)"""
+    try:
+        state = data_manager.get_audit_state(merchant_id, request.args.get('at'))
+        if state is None:
+            return jsonify({'error': f'No audited state for {merchant_id} at that time'}), 404
+        return jsonify(state)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid time: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/audit/<merchant_id>/events', methods=['GET'])
+def get_audit_events(merchant_id):
+    """A merchant's audited changes between ?since= and ?until=, oldest first"""
+    try:
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        events = data_manager.get_audit_events(merchant_id, request.args.get('since'), request.args.get('until'), limit)
+        return jsonify({'merchant_id': merchant_id, 'events': events, 'count': len(events)})
+    except ValueError as e:
+        return jsonify({'error': f'Invalid time: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/audit/stats', methods=['GET'])
+def get_audit_stats():
+    """Get audit log event and snapshot counts"""
+    try:
+        if not data_manager.audit:
+            return jsonify({'enabled': False})
+        return jsonify({'enabled': True, **data_manager.audit.get_stats()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/shard/merchants', methods=['GET'])
+@shard_admin_required
+def get_shard_merchants():
+    """Directory merchants held by this data node (optional ?ids=) and, for ?ids=, their tickets; used by the shard router"""
+    try:
+        ids = [merchant_id for merchant_id in request.args.get('ids', '').split(',') if merchant_id] or None
+        merchants = data_manager.get_directory_merchants(ids)
+        tickets = data_manager.get_merchant_tickets(ids) if ids else []
+        return jsonify({'merchants': merchants, 'tickets': tickets})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/shard/merchants', methods=['PUT'])
+@shard_admin_required
+def put_shard_merchants():
+    """Store directory merchants moved to this data node, with their tickets"""
+    try:
+        data = request.get_json() or {}
+        merchants = data.get('merchants')
+        tickets = data.get('tickets', [])
+        if not isinstance(merchants, list) or not isinstance(tickets, list):
+            return jsonify({'error': 'merchants and tickets must be lists'}), 400
+        return jsonify({
+            'stored': data_manager.put_directory_merchants(merchants),
+            'tickets': data_manager.put_merchant_tickets(tickets)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/shard/merchants', methods=['DELETE'])
+@shard_admin_required
+def delete_shard_merchants():
+    """Drop directory merchants moved away from this data node, with their tickets"""
+    try:
+        data = request.get_json() or {}
+        merchant_ids = data.get('merchant_ids')
+        if not isinstance(merchant_ids, list):
+            return jsonify({'error': 'merchant_ids must be a list'}), 400
+        return jsonify({'removed': data_manager.remove_directory_merchants(merchant_ids)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/bulk/<operation>', methods=['POST'])
+def run_bulk_operation(operation):
+    """Run a bulk admin operation, streaming NDJSON progress events"""
+    try:
+        data = request.get_json() or {}
+        merchant_ids = data.get('merchant_ids')
+        filters = data.get('filters')
+        
+        if not merchant_ids and not filters:
+            return jsonify({'error': 'merchant_ids or filters are required'}), 400
+        
+        job = BulkAdminJob(
+            data_manager,
+            operation,
+            merchant_ids=merchant_ids,
+            filters=filters,
+            params=data.get('params'),
+            batch_size=data.get('batch_size', 500)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        for event in job.run():
+            yield app.json.dumps(event) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def run_bulk_admin_job(job: BulkAdminJob):
+    """Job body for a bulk admin operation; reports each progress event and returns the completed event with every batch's results"""
+    def run(report):
+        results = []
+        errors = []
+        final = None
+        for event in job.run():
+            if event['event'] == 'completed':
+                final = {**event, 'results': results, 'errors': errors}
+            else:
+                if event['event'] == 'progress':
+                    results.extend(event['results'])
+                    errors.extend(event['errors'])
+                report(event)
+        return final
+    return run
+
+@app.route('/api/jobs', methods=['POST'])
+@rate_limited
+def submit_job():
+    """Queue a slow operation (summary, bulk_admin, reindex) and return its job ID immediately"""
+    try:
+        data = request.get_json() or {}
+        job_type = data.get('type')
+        params = data.get('params') or {}
+        
+        if job_type == 'summary':
+            fn = lambda report: {'summary': support_ai.get_conversation_summary()}
+        elif job_type == 'bulk_admin':
+            if not params.get('merchant_ids') and not params.get('filters'):
+                return jsonify({'error': 'merchant_ids or filters are required'}), 400
+            fn = run_bulk_admin_job(BulkAdminJob(
+                data_manager,
+                params.get('operation'),
+                merchant_ids=params.get('merchant_ids'),
+                filters=params.get('filters'),
+                params=params.get('params'),
+                batch_size=params.get('batch_size', 500)
+            ))
+        elif job_type == 'reindex':
+            fn = lambda report: {'indexes': data_manager.rebuild_indexes()}
+        else:
+            return jsonify({'error': 'type must be one of: summary, bulk_admin, reindex'}), 400
+        
+        job = job_queue.submit(job_type, fn, params)
+        return jsonify({'job_id': job['job_id'], 'status': job['status'], 'status_url': f"/api/jobs/{job['job_id']}"}), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List recent jobs, optionally filtered by status"""
+    try:
+        jobs = job_queue.list_jobs(request.args.get('status'), request.args.get('limit', 50, type=int))
+        return jsonify({'jobs': jobs, 'count': len(jobs), 'stats': job_queue.get_stats()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status, progress and result"""
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# WSGI application for Vercel deployment: Vercel and gunicorn serve the module-level app
 
 # Remove the if __name__ == '__main__' block for Vercel compatibility
 # The app will be served by Vercel's serverless functions 
\ No newline at end of file
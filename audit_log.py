@@ -0,0 +1,323 @@
+"""
+Audit Log for Cashfree AI Support Assistant
+Append-only log of merchant data mutations with periodic snapshots for point-in-time reconstruction
+"""
+from typing import Dict, List, Any, Optional
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+import os
+import threading
+import serialization
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writers are then not serialized across processes
+    fcntl = None
+
+# Events per merchant between snapshots; also the most events a reconstruction replays
+DEFAULT_SNAPSHOT_EVERY = 100
+
+# Folder -> the process's one log for it, so every data manager in a process shares a writer
+_LOGS: Dict[str, "AuditLog"] = {}
+_LOGS_LOCK = threading.Lock()
+
+
+def open_audit_log(folder: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY) -> "AuditLog":
+    """Get this process's log for a folder, opening it on first use"""
+    key = os.path.realpath(folder)
+    with _LOGS_LOCK:
+        log = _LOGS.get(key)
+        if log is None:
+            log = _LOGS[key] = AuditLog(folder, snapshot_every)
+        return log
+
+
+def normalize_time(value: str) -> str:
+    """
+    Turn an ISO date or timestamp into the form log entries are stamped with
+
+    Raises:
+        ValueError: If the value is not an ISO date or timestamp
+    """
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        # Entries are stamped in server local time
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+class _Positions:
+    """Parallel sorted lists of one merchant's entries: sequence, timestamp, file offset"""
+
+    __slots__ = ("seqs", "times", "offsets")
+
+    def __init__(self):
+        self.seqs: List[int] = []
+        self.times: List[str] = []
+        self.offsets: List[int] = []
+
+    def add(self, seq: int, at: str, offset: int) -> None:
+        self.seqs.append(seq)
+        self.times.append(at)
+        self.offsets.append(offset)
+
+
+class AuditLog:
+    """
+    Every mutation appended as an event; each merchant's folded state snapshotted every N of its events
+
+    State is domain -> key -> record, e.g. {"tickets": {"TKT001": {...}}, "kyc": {"MERCH1": {...}}}.
+    A past state is the nearest snapshot at or before the requested time plus the events after it,
+    so a reconstruction reads one snapshot and at most snapshot_every events however long the history.
+    
+    Writers in other processes are serialized by an exclusive lock file; each write first indexes
+    whatever they appended, so sequence numbers and offsets always come from the files themselves.
+    Use open_audit_log() to share one instance per folder within a process.
+    """
+
+    def __init__(self, folder: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        """
+        Open (or create) the log in a folder and index its entries
+
+        Args:
+            folder: Folder holding events.jsonl and snapshots.jsonl
+            snapshot_every: Events per merchant between snapshots
+        """
+        os.makedirs(folder, exist_ok=True)
+        self.events_path = os.path.join(folder, "events.jsonl")
+        self.snapshots_path = os.path.join(folder, "snapshots.jsonl")
+        self.lock_path = os.path.join(folder, "audit.lock")
+        self.snapshot_every = max(1, snapshot_every)
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.events: Dict[str, _Positions] = {}
+        self.snapshots: Dict[str, _Positions] = {}
+        # merchant_id -> latest folded state, and events folded in since its last snapshot
+        self.current: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.pending: Dict[str, int] = {}
+        # Bytes of each file indexed so far
+        self.events_size = 0
+        self.snapshots_size = 0
+        self._catch_up()
+        self.events_file = open(self.events_path, "ab")
+        self.snapshots_file = open(self.snapshots_path, "ab")
+
+    def _catch_up(self) -> None:
+        """Index snapshots and events appended since the last call, by this or any other process"""
+        for offset, end, entry in self._scan(self.snapshots_path, self.snapshots_size):
+            merchant_id = entry["merchant_id"]
+            self.snapshots.setdefault(merchant_id, _Positions()).add(entry["seq"], entry["at"], offset)
+            self.current[merchant_id] = entry["state"]
+            self.pending[merchant_id] = 0
+            self.sequence = max(self.sequence, entry["seq"])
+            self.snapshots_size = end
+        for offset, end, entry in self._scan(self.events_path, self.events_size):
+            merchant_id = entry["merchant_id"]
+            self.events.setdefault(merchant_id, _Positions()).add(entry["seq"], entry["at"], offset)
+            snapshots = self.snapshots.get(merchant_id)
+            # Events up to the merchant's last snapshot are already part of its state
+            if not snapshots or entry["seq"] > snapshots.seqs[-1]:
+                self._apply(self.current.setdefault(merchant_id, {}), entry)
+                self.pending[merchant_id] = self.pending.get(merchant_id, 0) + 1
+            self.sequence = max(self.sequence, entry["seq"])
+            self.events_size = end
+
+    @staticmethod
+    def _scan(path: str, start: int = 0):
+        """Yield (offset, end offset, entry) for every complete line of a log file from an offset"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A write in progress or cut short; picked up on a later scan once complete
+                    break
+                yield offset, offset + len(line), serialization.loads(line)
+                offset += len(line)
+
+    @contextmanager
+    def _writing(self):
+        """Hold the cross-process write lock and index what other processes appended"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _apply(state: Dict[str, Dict[str, Any]], event: Dict[str, Any]) -> None:
+        """Fold one event into a state"""
+        records = state.setdefault(event["domain"], {})
+        if event["op"] == "delete" or event["record"] is None:
+            records.pop(event["key"], None)
+        else:
+            records[event["key"]] = event["record"]
+
+    def append(self, merchant_id: str, domain: str, key: str, record: Optional[Dict[str, Any]],
+               op: str = "upsert") -> int:
+        """
+        Record a mutation
+
+        Args:
+            merchant_id: Merchant the record belongs to
+            domain: Data domain (merchant, kyc, tickets, notifications, limits)
+            key: Record identity within the domain
+            record: New record state, None for deletions
+            op: "upsert" or "delete"
+
+        Returns:
+            Sequence number of the event
+        """
+        with self.lock, self._writing():
+            self.sequence += 1
+            event = {
+                "seq": self.sequence,
+                "at": datetime.now().isoformat(),
+                "merchant_id": merchant_id,
+                "domain": domain,
+                "key": key,
+                "op": op,
+                "record": record
+            }
+            line = serialization.dumps(event) + b"\n"
+            offset = self._write(self.events_file, line)
+            self.events_size = offset + len(line)
+            self.events.setdefault(merchant_id, _Positions()).add(event["seq"], event["at"], offset)
+            # Fold the decoded copy so later in-place edits of the caller's record cannot leak in
+            self._apply(self.current.setdefault(merchant_id, {}), serialization.loads(line))
+            self.pending[merchant_id] = self.pending.get(merchant_id, 0) + 1
+            if self.pending[merchant_id] >= self.snapshot_every:
+                self._snapshot(merchant_id)
+            return event["seq"]
+
+    def record_state(self, merchant_id: str, state: Dict[str, Dict[str, Any]]) -> None:
+        """Snapshot a merchant's full state as loaded from files, e.g. on first start or after a reload"""
+        with self.lock, self._writing():
+            self.current[merchant_id] = serialization.loads(serialization.dumps(state))
+            self._snapshot(merchant_id)
+
+    def has_state(self, merchant_id: str) -> bool:
+        """Whether anything has been recorded for a merchant"""
+        with self.lock:
+            self._catch_up()
+            return merchant_id in self.current
+
+    def _snapshot(self, merchant_id: str) -> None:
+        """Write a merchant's current folded state (caller holds both locks)"""
+        entry = {
+            "merchant_id": merchant_id,
+            "seq": self.sequence,
+            "at": datetime.now().isoformat(),
+            "state": self.current[merchant_id]
+        }
+        line = serialization.dumps(entry) + b"\n"
+        offset = self._write(self.snapshots_file, line)
+        self.snapshots_size = offset + len(line)
+        self.snapshots.setdefault(merchant_id, _Positions()).add(entry["seq"], entry["at"], offset)
+        self.pending[merchant_id] = 0
+
+    @staticmethod
+    def _write(file, line: bytes) -> int:
+        """Append one encoded line and return its offset, which other processes' appends may have moved"""
+        file.seek(0, os.SEEK_END)
+        offset = file.tell()
+        file.write(line)
+        file.flush()
+        return offset
+
+    @staticmethod
+    def _read(path: str, offset: int) -> Dict[str, Any]:
+        """Read the entry at an offset"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return serialization.loads(f.readline())
+
+    def state_at(self, merchant_id: str, at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild a merchant's state as it was at a point in time
+
+        Args:
+            merchant_id: Merchant to rebuild
+            at: ISO date or timestamp; now if None
+
+        Returns:
+            Dictionary with the state, the snapshot it started from and the events replayed,
+            or None if nothing was recorded for the merchant by then
+        """
+        as_of = normalize_time(at) if at else datetime.now().isoformat()
+        with self.lock:
+            self._catch_up()
+            snapshots = self.snapshots.get(merchant_id, _Positions())
+            events = self.events.get(merchant_id, _Positions())
+            index = bisect_right(snapshots.times, as_of) - 1
+            if index >= 0:
+                start_seq, snapshot_offset = snapshots.seqs[index], snapshots.offsets[index]
+            else:
+                start_seq, snapshot_offset = 0, None
+            first = bisect_right(events.seqs, start_seq)
+            last = bisect_right(events.times, as_of, lo=first)
+            offsets = events.offsets[first:last]
+
+        if snapshot_offset is None and not offsets:
+            return None
+        state = self._read(self.snapshots_path, snapshot_offset)["state"] if snapshot_offset is not None else {}
+        last_seq = start_seq
+        if offsets:
+            with open(self.events_path, "rb") as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    event = serialization.loads(f.readline())
+                    self._apply(state, event)
+                    last_seq = event["seq"]
+        return {
+            "merchant_id": merchant_id,
+            "as_of": as_of,
+            "state": state,
+            "snapshot_seq": start_seq if snapshot_offset is not None else None,
+            "events_replayed": len(offsets),
+            "last_seq": last_seq
+        }
+
+    def history(self, merchant_id: str, since: Optional[str] = None, until: Optional[str] = None,
+                limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get a merchant's events in a time range, oldest first
+
+        Args:
+            merchant_id: Merchant whose events to read
+            since: Only events at or after this ISO date or timestamp
+            until: Only events before this ISO date or timestamp
+            limit: Most events to return
+        """
+        with self.lock:
+            self._catch_up()
+            events = self.events.get(merchant_id, _Positions())
+            first = bisect_left(events.times, normalize_time(since)) if since else 0
+            last = bisect_left(events.times, normalize_time(until)) if until else len(events.times)
+            offsets = events.offsets[first:min(last, first + max(1, limit))]
+        result = []
+        if offsets:
+            with open(self.events_path, "rb") as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    result.append(serialization.loads(f.readline()))
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event, snapshot and merchant counts"""
+        with self.lock:
+            self._catch_up()
+            return {
+                "sequence": self.sequence,
+                "merchants": len(self.current),
+                "events": sum(len(positions.seqs) for positions in self.events.values()),
+                "snapshots": sum(len(positions.seqs) for positions in self.snapshots.values()),
+                "snapshot_every": self.snapshot_every
+            }
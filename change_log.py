@@ -0,0 +1,116 @@
+"""
+Change Log for Cashfree AI Support Assistant
+Mutation log behind the delta sync API, compacted to the latest change per record
+"""
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import threading
+
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class ChangeLog:
+    """
+    Sequenced record changes, keeping only the newest entry for each record
+
+    A record changed many times costs one entry, so the log grows with the number of
+    distinct records changed. When it exceeds max_entries the oldest entries are dropped
+    and cursors older than what was dropped must resync in full.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Create an empty log"""
+        self.max_entries = max(1, max_entries)
+        self.lock = threading.Lock()
+        self.sequence = 0
+        # Changes at or below this sequence are no longer available
+        self.floor = 0
+        # seq -> change, in sequence order
+        self.entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.latest: Dict[Tuple[str, str], int] = {}
+
+    def append(self, domain: str, key: str, record: Optional[Dict[str, Any]], op: str = "upsert") -> int:
+        """
+        Record a change, replacing any earlier entry for the same record
+
+        Args:
+            domain: Data domain (tickets, kyc, merchant, notifications)
+            key: Record identity within the domain
+            record: New record state, None for deletions
+            op: "upsert" or "delete"
+
+        Returns:
+            Sequence number of the change
+        """
+        with self.lock:
+            self.sequence += 1
+            previous = self.latest.get((domain, key))
+            if previous is not None:
+                del self.entries[previous]
+            self.entries[self.sequence] = {
+                "seq": self.sequence,
+                "domain": domain,
+                "key": key,
+                "op": op,
+                "record": record,
+                "changed_at": datetime.now().isoformat()
+            }
+            self.latest[(domain, key)] = self.sequence
+
+            while len(self.entries) > self.max_entries:
+                seq, change = self.entries.popitem(last=False)
+                del self.latest[(change["domain"], change["key"])]
+                self.floor = seq
+            return self.sequence
+
+    def reset(self) -> None:
+        """Drop every entry, so all existing cursors must resync in full"""
+        with self.lock:
+            self.entries.clear()
+            self.latest.clear()
+            self.floor = self.sequence
+
+    def since(self, seq: int, domains: Optional[Iterable[str]] = None, limit: int = 500) -> Dict[str, Any]:
+        """
+        Get changes after a sequence number, oldest first
+
+        Args:
+            seq: Last sequence the client has applied
+            domains: Only return changes in these domains
+            limit: Maximum changes to return
+
+        Returns:
+            Dictionary with changes, the sequence to resume from, whether more changes
+            are waiting, and reset=True when seq is older than the compacted log
+        """
+        wanted = set(domains) if domains else None
+        with self.lock:
+            if seq < self.floor or seq > self.sequence:
+                return {"changes": [], "seq": self.sequence, "has_more": False, "reset": True}
+
+            # Walk back from the newest entry; only entries after seq are visited
+            pending = []
+            for entry_seq in reversed(self.entries):
+                if entry_seq <= seq:
+                    break
+                change = self.entries[entry_seq]
+                if wanted is None or change["domain"] in wanted:
+                    pending.append(change)
+            pending.reverse()
+            current = self.sequence
+
+        changes = pending[:limit]
+        has_more = len(pending) > limit
+        return {
+            "changes": [dict(change) for change in changes],
+            # Without more to fetch, resume from the head so skipped domains are not revisited
+            "seq": changes[-1]["seq"] if has_more else current,
+            "has_more": has_more,
+            "reset": False
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the head sequence, retained entries and compaction floor"""
+        with self.lock:
+            return {"sequence": self.sequence, "entries": len(self.entries), "floor": self.floor}
@@ -2,6 +2,7 @@
 Configuration settings for the AI Customer Support Assistant
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -10,6 +11,9 @@ load_dotenv()
 class Config:
     """Configuration class for the application"""
     
+    # Folder holding the JSON data files; give each local data node its own
+    DATA_FOLDER = os.getenv('DATA_FOLDER', 'data')
+    
     # Google Gemini API settings
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     
@@ -21,6 +25,95 @@ class Config:
     MODEL_NAME = "gemini-1.5-flash"  # Using Gemini for cost efficiency
     MAX_TOKENS = 1000  # Limit response length
     
+    # Model routing: triage (category, priority, escalation) runs on the local keyword classifier ("local"),
+    # a small model ("model") or the answer model as before ("main"); answers use their category's profile
+    TRIAGE_MODE = os.getenv('TRIAGE_MODE', 'local')
+    TRIAGE_PROFILE = {"model": os.getenv('TRIAGE_MODEL_NAME', 'gemini-1.5-flash-8b'), "max_tokens": 256, "temperature": 0.0}
+    # Category -> overrides of the "default" profile (model, max_tokens, temperature)
+    MODEL_PROFILES = {
+        "default": {"model": MODEL_NAME, "max_tokens": MAX_TOKENS, "temperature": 0.7},
+        "account_hold": {"temperature": 0.3},
+        "kyc_compliance": {"temperature": 0.3},
+        "payout_issue": {"temperature": 0.4},
+        "transaction_limit": {"max_tokens": 600, "temperature": 0.3},
+        "notification": {"max_tokens": 400, "temperature": 0.3},
+        "dashboard_insight": {"max_tokens": 600},
+        "testing": {"model": TRIAGE_PROFILE["model"], "max_tokens": 400},
+        "self_help": {"max_tokens": 700}
+    }
+    # USD per million (input, output) tokens, for the cost estimates in pipeline stats and the routing benchmark
+    MODEL_PRICES = {
+        "gemini-1.5-flash": (0.075, 0.30),
+        "gemini-1.5-flash-8b": (0.0375, 0.15)
+    }
+    SIMILAR_TICKETS_K = 3  # Past resolved tickets added to the response prompt
+    PROMPT_CACHE_ENABLED = os.getenv('PROMPT_CACHE_ENABLED', 'False').lower() == 'true'  # Gemini context caching for the system prompt
+    PROMPT_CACHE_TTL = int(os.getenv('PROMPT_CACHE_TTL', '3600'))  # Seconds
+    KB_CONFIDENCE_THRESHOLD = float(os.getenv('KB_CONFIDENCE_THRESHOLD', '0.75'))  # Minimum match to answer locally
+    
+    # Rate limiting for the AI endpoints: (requests per minute, burst size)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # "memory" (per process) or "sqlite" (shared by workers)
+    RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'cashfree_rate_limits.db'))
+    RATE_LIMIT_MAX_BUCKETS = int(os.getenv('RATE_LIMIT_MAX_BUCKETS', '100000'))  # Either backend; refilled buckets are evicted first
+    RATE_LIMITS = {
+        "merchant": (int(os.getenv('RATE_LIMIT_MERCHANT_PER_MIN', '20')), int(os.getenv('RATE_LIMIT_MERCHANT_BURST', '5'))),
+        "client": (int(os.getenv('RATE_LIMIT_CLIENT_PER_MIN', '60')), int(os.getenv('RATE_LIMIT_CLIENT_BURST', '10'))),
+        "global": (int(os.getenv('RATE_LIMIT_GLOBAL_PER_MIN', '300')), int(os.getenv('RATE_LIMIT_GLOBAL_BURST', '50')))
+    }  # 0 per minute leaves a scope unlimited
+    
+    # Model concurrency shared fairly across merchants (per worker process)
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+    LLM_MERCHANT_WEIGHTS: dict = {}  # merchant_id -> relative share, default 1.0
+    LLM_RESERVED_HIGH_PRIORITY = int(os.getenv('LLM_RESERVED_HIGH_PRIORITY', '1'))  # Slots kept for escalated/high-priority queries
+    LLM_LOW_PRIORITY_MAX_WAIT = float(os.getenv('LLM_LOW_PRIORITY_MAX_WAIT', '2.0'))  # Seconds before low-priority work falls back to templates
+    LOW_PRIORITY_CATEGORIES = ["dashboard_insight", "testing"]  # Deferrable query categories
+    
+    # Background jobs (summaries, bulk admin operations, reindexing)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_STORE_DIR = os.getenv('JOB_STORE_DIR', os.path.join(tempfile.gettempdir(), 'cashfree_jobs'))  # Shared by workers on one host
+    
+    # Compact snapshot of the data files (python data_snapshot.py data data/data.snapshot); JSON is used when unset or stale
+    DATA_SNAPSHOT_PATH = os.getenv('DATA_SNAPSHOT_PATH', '')
+    
+    # Merchant records shared by all worker processes through a memory-mapped snapshot
+    SHARED_CACHE_ENABLED = os.getenv('SHARED_CACHE_ENABLED', 'False').lower() == 'true'
+    SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'cashfree_merchants.snap'))
+    SHARED_CACHE_CHECK_INTERVAL = float(os.getenv('SHARED_CACHE_CHECK_INTERVAL', '0'))  # Seconds between checks for other workers' updates
+    
+    # /api/data/* responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+    
+    # JSON encoding: auto picks orjson, then msgspec, then the json module; data files are indented only on request
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+    DATA_FILES_PRETTY = os.getenv('DATA_FILES_PRETTY', 'False').lower() == 'true'
+    
+    # Sharding: data node base URLs for shard_router.py, virtual points per node, forward timeout
+    SHARD_NODES = [node.strip() for node in os.getenv('SHARD_NODES', '').split(',') if node.strip()]
+    SHARD_VNODES = int(os.getenv('SHARD_VNODES', '128'))
+    SHARD_FORWARD_TIMEOUT = float(os.getenv('SHARD_FORWARD_TIMEOUT', '10'))
+    SHARD_ADMIN_TOKEN = os.getenv('SHARD_ADMIN_TOKEN', '')  # Required to move merchants between nodes; moves are disabled while empty
+    
+    # Delta sync: distinct records kept in the change feed before old cursors must resync
+    CHANGE_LOG_MAX_ENTRIES = int(os.getenv('CHANGE_LOG_MAX_ENTRIES', '10000'))
+    
+    # Server-sent events: buffered events per slow stream before it must resync, keep-alive seconds
+    EVENT_STREAM_MAX_PENDING = int(os.getenv('EVENT_STREAM_MAX_PENDING', '100'))
+    EVENT_STREAM_HEARTBEAT = float(os.getenv('EVENT_STREAM_HEARTBEAT', '15'))
+    
+    # Audit log: folder for the event log and snapshots (default: DATA_FOLDER/audit), events per merchant between snapshots
+    AUDIT_LOG_ENABLED = os.getenv('AUDIT_LOG_ENABLED', 'True').lower() == 'true'
+    AUDIT_LOG_DIR = os.getenv('AUDIT_LOG_DIR', '') or os.path.join(DATA_FOLDER, 'audit')
+    AUDIT_SNAPSHOT_EVERY = int(os.getenv('AUDIT_SNAPSHOT_EVERY', '100'))
+    
+    # SLA: resolution targets in hours per priority, and share of the target after which an open ticket is at risk
+    SLA_TARGET_HOURS = {
+        priority: float(hours) for priority, _, hours in (
+            item.strip().partition(':') for item in os.getenv('SLA_TARGET_HOURS', 'high:4,medium:24,low:72').split(',')
+        ) if hours
+    }
+    SLA_WARNING_FRACTION = float(os.getenv('SLA_WARNING_FRACTION', '0.8'))
+    
     # Support context
     MERCHANT_ISSUES = {
         "account_hold": "Account freeze or limit holds",
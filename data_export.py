@@ -0,0 +1,221 @@
+"""
+Data Export for Cashfree AI Support Assistant
+Streams tickets, KYC history, transactions, payouts and merchants as NDJSON, CSV or column batches
+
+Usage:
+    python data_export.py <entity> [--format ndjson|csv|columnar] [--cursor CURSOR] [--limit N]
+                          [--from DATE] [--to DATE] [--where column=value ...]
+"""
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+import csv
+import io
+import serialization
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+# entity -> (exported columns, date column used by the from/to filters)
+EXPORT_ENTITIES = {
+    "tickets": ((
+        "ticket_id", "merchant_id", "subject", "description", "status", "priority",
+        "created_date", "last_updated", "resolution"
+    ), "created_date"),
+    "kyc_history": (("merchant_id", "date", "action", "status", "document_type"), "date"),
+    "transactions": (("merchant_id", "transaction_id", "amount", "status", "date", "payment_method"), "date"),
+    "payouts": (("merchant_id", "transaction_id", "date", "amount", "status"), "date"),
+    "merchants": ((
+        "merchant_id", "business_name", "account_status", "account_type", "registration_date",
+        "last_activity", "compliance_status", "risk_score", "pending_documents",
+        "uploaded_documents", "rejected_documents"
+    ), "last_activity")
+}
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    # One JSON object per batch holding a value list per column
+    "columnar": ("application/x-ndjson", "columns.ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv")
+}
+
+
+class DataExport:
+    """One export: an entity, a format, filters and the position to resume from"""
+
+    def __init__(self, data_manager, entity: str, export_format: str = "ndjson",
+                 filters: Optional[Dict[str, str]] = None, date_from: Optional[str] = None,
+                 date_to: Optional[str] = None, cursor: Optional[str] = None,
+                 limit: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Prepare an export
+
+        Args:
+            data_manager: MerchantDataManager holding the data
+            entity: One of EXPORT_ENTITIES
+            export_format: One of EXPORT_FORMATS
+            filters: column -> value equality filters
+            date_from: Keep rows whose date column is on or after this ISO date or timestamp
+            date_to: Keep rows whose date column is before this ISO date or timestamp
+            cursor: _cursor value of the last row received, to resume after it
+            limit: Most rows to export; resume with the last row's _cursor
+            batch_size: Rows encoded per chunk written to the stream
+
+        Raises:
+            ValueError: For an unknown entity, format, filter column or cursor
+        """
+        if entity not in EXPORT_ENTITIES:
+            raise ValueError(f"Unknown export entity: {entity}")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        self.columns, self.date_column = EXPORT_ENTITIES[entity]
+        unknown = sorted(set(filters or {}) - set(self.columns))
+        if unknown:
+            raise ValueError(f"Unknown filter columns for {entity}: {', '.join(unknown)}")
+
+        self.data_manager = data_manager
+        self.entity = entity
+        self.format = export_format
+        self.filters = filters or {}
+        self.date_from = date_from
+        self.date_to = date_to
+        self.start = self._parse_cursor(cursor) if cursor else 0
+        self.limit = limit if limit and limit > 0 else None
+        self.batch_size = max(1, min(int(batch_size), MAX_BATCH_SIZE))
+
+    def _parse_cursor(self, cursor: str) -> int:
+        """Source position to resume from"""
+        entity, _, position = cursor.partition(":")
+        if entity != self.entity or not position.isdigit():
+            raise ValueError(f"Invalid cursor for {self.entity}: {cursor}")
+        return int(position)
+
+    @property
+    def content_type(self) -> str:
+        """Response content type"""
+        return EXPORT_FORMATS[self.format][0]
+
+    @property
+    def filename(self) -> str:
+        """Suggested download file name"""
+        return f"{self.entity}.{EXPORT_FORMATS[self.format][1]}"
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        """Whether a row passes the filters"""
+        for column, value in self.filters.items():
+            if str(row.get(column, "")) != value:
+                return False
+        if self.date_from or self.date_to:
+            # ISO dates and timestamps order correctly as strings
+            date = str(row.get(self.date_column) or "")
+            if self.date_from and date < self.date_from:
+                return False
+            if self.date_to and date >= self.date_to:
+                return False
+        return True
+
+    def rows(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (cursor, row) for every matching row, reading the source one record at a time"""
+        exported = 0
+        for position, row in self.data_manager.iter_export_rows(self.entity, self.start):
+            if not self._matches(row):
+                continue
+            yield f"{self.entity}:{position + 1}", {column: row.get(column) for column in self.columns}
+            exported += 1
+            if self.limit is not None and exported >= self.limit:
+                return
+
+    def _batches(self) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """Group rows into batches of batch_size"""
+        batch = []
+        for item in self.rows():
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def stream(self) -> Iterator[bytes]:
+        """
+        Encode the export chunk by chunk; only one batch of rows is held at a time
+
+        Every row carries _cursor, the value to pass as cursor to resume after it.
+        Column batches carry the cursor of their last row instead.
+        """
+        if self.format == "csv":
+            yield self._csv_chunk([self.columns + ("_cursor",)])
+        for batch in self._batches():
+            if self.format == "ndjson":
+                yield b"".join(serialization.dumps({**row, "_cursor": cursor}) + b"\n" for cursor, row in batch)
+            elif self.format == "columnar":
+                columns = {column: [row[column] for _, row in batch] for column in self.columns}
+                yield serialization.dumps({"rows": len(batch), "columns": columns, "_cursor": batch[-1][0]}) + b"\n"
+            else:
+                yield self._csv_chunk([
+                    [self._csv_value(row[column]) for column in self.columns] + [cursor]
+                    for cursor, row in batch
+                ])
+
+    @staticmethod
+    def _csv_value(value: Any) -> Any:
+        """Cell value; lists and objects are written as JSON"""
+        if isinstance(value, (list, dict)):
+            return serialization.dumps(value).decode("utf-8")
+        return "" if value is None else value
+
+    @staticmethod
+    def _csv_chunk(rows: List[Any]) -> bytes:
+        """Encode CSV rows"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+def main(argv: List[str]) -> int:
+    """Command line export to stdout"""
+    import argparse
+    import sys
+    from data_manager import MerchantDataManager
+
+    parser = argparse.ArgumentParser(description="Stream a data export to stdout")
+    parser.add_argument("entity", choices=sorted(EXPORT_ENTITIES))
+    parser.add_argument("--format", default="ndjson", choices=sorted(EXPORT_FORMATS))
+    parser.add_argument("--cursor", help="_cursor of the last row already exported")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--from", dest="date_from")
+    parser.add_argument("--to", dest="date_to")
+    parser.add_argument("--where", action="append", default=[], metavar="COLUMN=VALUE")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    filters = {}
+    for condition in args.where:
+        column, separator, value = condition.partition("=")
+        if not separator:
+            parser.error(f"--where expects COLUMN=VALUE, got {condition}")
+        filters[column] = value
+
+    try:
+        export = DataExport(
+            MerchantDataManager(),
+            args.entity,
+            args.format,
+            filters=filters,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            cursor=args.cursor,
+            limit=args.limit,
+            batch_size=args.batch_size
+        )
+    except ValueError as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        return 2
+    for chunk in export.stream():
+        sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
@@ -2,36 +2,404 @@
 Data Manager for Cashfree AI Support Assistant
 Handles all merchant data, mock data, and data operations from JSON files
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Set
 from datetime import datetime, timedelta
-import json
-import random
 import os
+from notification_router import NotificationRouter, CHANNEL_SECTIONS
+from kyc_workflow import KYCWorkflow
+from merchant_index import MerchantQueryEngine
+from ticket_index import TicketRetrievalIndex
+from shared_cache import SharedMerchantCache
+from data_snapshot import DataSnapshot, LazyRecords
+from records import CompactRecord, Ticket, Payout, Transaction
+from change_log import ChangeLog
+from event_broker import EventBroker
+from audit_log import AuditLog, open_audit_log
+from sla_engine import SLAEngine
+from config import Config
+import serialization
+import functools
+import hashlib
+import threading
+import uuid
+
+# Ticket statuses whose tickets are used as reference resolutions
+RESOLVED_TICKET_STATUSES = ("resolved", "closed")
+
+# Data domains served by the /api/data/* endpoints, and the files each one is read from
+DATA_DOMAINS = ("merchant", "account", "kyc", "payout", "tickets", "limits", "notifications", "dashboard")
+FILE_DOMAINS = {
+    "merchant_data.json": ("merchant", "account"),
+    "kyc_data.json": ("kyc",),
+    "payout_data.json": ("payout",),
+    "ticket_data.json": ("tickets",),
+    "transaction_data.json": ("limits",),
+    "notification_data.json": ("notifications",),
+    "dashboard_data.json": ("dashboard",)
+}
+
+# Sections of /api/data/summary: data domain, source data attribute and exposed fields (None: all)
+SUMMARY_SECTIONS = {
+    "merchant_info": ("merchant", "merchant_data", None),
+    "account_status": ("account", "merchant_data", (
+        "merchant_id", "account_status", "compliance_status", "risk_score", "last_activity"
+    )),
+    "kyc_status": ("kyc", "kyc_data", (
+        "merchant_id", "kyc_status", "kyc_level", "verification_progress", "pending_documents",
+        "uploaded_documents", "verified_documents", "rejected_documents"
+    )),
+    "payout_info": ("payout", "payout_data", (
+        "merchant_id", "last_payout", "next_settlement", "payout_schedule", "total_payouts",
+        "payout_amount", "pending_payouts"
+    )),
+    "transaction_limits": ("limits", "transaction_data", (
+        "merchant_id", "transaction_limit", "daily_limit", "monthly_limit", "current_usage", "limit_utilization"
+    )),
+    "support_tickets": ("tickets", "ticket_data", (
+        "merchant_id", "open_tickets", "total_tickets", "resolved_tickets", "average_resolution_time", "tickets"
+    )),
+    "notification_preferences": ("notifications", "notification_data", (
+        "merchant_id", "email_notifications", "whatsapp_notifications", "sms_notifications"
+    )),
+    "dashboard_insights": ("dashboard", "dashboard_data", (
+        "merchant_id", "weekly_trends", "issue_frequency", "performance_metrics"
+    ))
+}
+
+# Event pushed to /api/events subscribers for a change in each change feed domain
+EVENT_TYPES = {
+    "tickets": "ticket_updated",
+    "kyc": "kyc_progress",
+    "payout": "payout_status",
+    "merchant": "merchant_updated",
+    "notifications": "notification_preferences_updated"
+}
+
+# Export position of the first merchant_tickets.json record, after every ticket_data.json position,
+# so cursors into either list stay valid while both grow
+MERCHANT_TICKETS_POSITION = 10 ** 9
+
+# Files the admin merchant records are derived from
+MERCHANT_SOURCE_FILES = ("merchant_data.json", "merchants.json", "kyc_data.json")
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize compact records and snapshot-backed record lists when saving JSON"""
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    if isinstance(value, LazyRecords):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _synchronized(method):
+    """Run a method under the data manager's lock; mutations and index rebuilds must not interleave"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class MerchantDataManager:
     """Manages all merchant data and mock data operations from JSON files"""
     
     def __init__(self):
         """Initialize data manager with data from JSON files"""
-        self.data_folder = "data"
+        self.data_folder = Config.DATA_FOLDER
+        # Held by every mutation, index rebuild and index read; reentrant because mutations nest
+        self.lock = threading.RLock()
+        # Per-domain change counters; the instance token keeps versions from different processes apart
+        self.data_instance = uuid.uuid4().hex[:8]
+        self.data_versions = {domain: 0 for domain in DATA_DOMAINS}
+        self.change_log = ChangeLog(Config.CHANGE_LOG_MAX_ENTRIES)
+        self.events = EventBroker(Config.EVENT_STREAM_MAX_PENDING)
+        self.snapshot = self._open_snapshot()
         self.merchant_data = self._load_data_from_file("merchant_data.json")
         self.ticket_data = self._load_data_from_file("ticket_data.json")
+        self.merchant_tickets = self._load_data_from_file("merchant_tickets.json")
         self.kyc_data = self._load_data_from_file("kyc_data.json")
         self.payout_data = self._load_data_from_file("payout_data.json")
         self.transaction_data = self._load_data_from_file("transaction_data.json")
         self.notification_data = self._load_data_from_file("notification_data.json")
         self.dashboard_data = self._load_data_from_file("dashboard_data.json")
+        self.shared_cache = self._attach_shared_cache()
+        self.merchant_directory = self._load_directory_file()
+        self._compact_records()
+        self._build_indexes()
+        self.audit = self._open_audit_log()
+    
+    def _open_snapshot(self) -> Optional[DataSnapshot]:
+        """Open the compact data snapshot when configured"""
+        if not Config.DATA_SNAPSHOT_PATH:
+            return None
+        try:
+            return DataSnapshot(Config.DATA_SNAPSHOT_PATH)
+        except Exception as e:
+            print(f"⚠️  Warning: Data snapshot unavailable ({str(e)}). Loading JSON files.")
+            return None
+    
+    def _open_audit_log(self) -> Optional[AuditLog]:
+        """Open the audit log when enabled, recording the loaded state the first time"""
+        if not Config.AUDIT_LOG_ENABLED:
+            return None
+        try:
+            audit = open_audit_log(Config.AUDIT_LOG_DIR, Config.AUDIT_SNAPSHOT_EVERY)
+            if not audit.has_state(self.merchant_data["merchant_id"]):
+                audit.record_state(self.merchant_data["merchant_id"], self._audited_state())
+            return audit
+        except Exception as e:
+            print(f"⚠️  Warning: Audit log unavailable ({str(e)}). Changes will not be audited.")
+            return None
+    
+    def _audited_state(self) -> Dict[str, Dict[str, Any]]:
+        """Primary merchant's audited records as loaded, keyed as the change feed keys them"""
+        merchant_id = self.merchant_data["merchant_id"]
+        state = {}
+        for domain, record in (
+            ("merchant", self.get_merchant_info()),
+            ("kyc", self.get_kyc_status()),
+            ("limits", self.get_transaction_limits()),
+            ("notifications", self.get_notification_preferences())
+        ):
+            state[domain] = {record.get("merchant_id") or merchant_id: record}
+        state["tickets"] = {
+            ticket["ticket_id"]: ticket for ticket in self.get_support_tickets()["tickets"]
+            if (ticket.get("merchant_id") or merchant_id) == merchant_id
+        }
+        return state
+    
+    def _attach_shared_cache(self) -> Optional[SharedMerchantCache]:
+        """Attach to the host-wide merchant record snapshot when enabled"""
+        if not Config.SHARED_CACHE_ENABLED:
+            return None
+        try:
+            return SharedMerchantCache(Config.SHARED_CACHE_PATH, check_interval=Config.SHARED_CACHE_CHECK_INTERVAL)
+        except Exception as e:
+            print(f"⚠️  Warning: Shared merchant cache unavailable ({str(e)}). Using per-process records.")
+            return None
+    
+    def _load_directory_file(self) -> Optional[Dict[str, Any]]:
+        """Load merchants.json, or leave it unread while the shared cache serves merchant reads"""
+        if self.shared_cache:
+            # Parsed on first use by a directory change or export, not by every worker
+            return None
+        return self._load_data_from_file("merchants.json")
+    
+    def _merchant_source_stamp(self) -> int:
+        """Fingerprint of the files merchant records are built from"""
+        digest = hashlib.blake2b(digest_size=8)
+        for filename in MERCHANT_SOURCE_FILES:
+            try:
+                stat = os.stat(os.path.join(self.data_folder, filename))
+                digest.update(f"{filename}:{stat.st_mtime_ns}:{stat.st_size};".encode("utf-8"))
+            except OSError:
+                digest.update(f"{filename}:missing;".encode("utf-8"))
+        return int.from_bytes(digest.digest(), "little")
+    
+    def _compact_records(self) -> None:
+        """Hold tickets, payouts and transactions as slotted records instead of dicts"""
+        for data, key, record_type in (
+            (self.ticket_data, "tickets", Ticket),
+            (self.merchant_tickets, "tickets", Ticket),
+            (self.payout_data, "payout_history", Payout),
+            (self.transaction_data, "recent_transactions", Transaction),
+        ):
+            if key in data:
+                data[key] = [record_type.from_dict(record) for record in data[key]]
+    
+    def _build_indexes(self) -> None:
+        """Rebuild the indexes for the primary merchant; directory indexes are built on first use"""
+        self._build_notification_routes()
+        self._build_kyc_workflow()
+        self._build_ticket_index()
+        self._build_sla_engine()
+        self._apply_resolution_metrics()
+        self.ticket_sequence = self._highest_ticket_number()
+        self.directory_loaded = False
+        self.merchant_query: Optional[MerchantQueryEngine] = None
+        # Shared cache position the merchant query index has caught up to
+        self.merchant_index_mark = None
+    
+    @_synchronized
+    def _ensure_directory(self) -> None:
+        """Load the merchant directory into the KYC workflow and secondary indexes on first use"""
+        if self.directory_loaded:
+            return
+        if self.merchant_directory is None:
+            self.merchant_directory = self._load_data_from_file("merchants.json")
+        primary_id = self.kyc_data["merchant_id"]
+        for record in self.merchant_directory.get("merchants", []):
+            # The primary merchant's KYC state comes from kyc_data
+            if record["merchant_id"] != primary_id:
+                self.kyc_workflow.load_merchant(record["merchant_id"], record)
+        self._build_merchant_index()
+        # Only once the indexes exist, so no caller sees a half-built directory
+        self.directory_loaded = True
+    
+    def _unload_directory(self) -> None:
+        """Drop the decoded directory and its KYC state; the shared cache serves merchant reads until a change needs them"""
+        self.merchant_directory = None
+        self.merchants = {}
+        self._build_kyc_workflow()
+        self.directory_loaded = False
+    
+    @_synchronized
+    def _ensure_merchant_index(self) -> MerchantQueryEngine:
+        """
+        Get the merchant query index, building it on first use
+        
+        With the shared cache the index is built from the shared snapshot rather than the directory,
+        and delta log entries from every worker are applied to it before each query, so filters
+        match the records the cache returns.
+        """
+        if not self.shared_cache:
+            self._ensure_directory()
+            return self.merchant_query
+        if self.merchant_query is None and not self.directory_loaded \
+                and not self.shared_cache.is_current(self._merchant_source_stamp()):
+            # Nothing published from the current files yet: publish them without keeping the directory
+            self._ensure_directory()
+            self._unload_directory()
+        
+        mark, changed = self.shared_cache.changes_since(self.merchant_index_mark)
+        if changed is None or self.merchant_query is None:
+            self.merchant_query = MerchantQueryEngine()
+            self.merchant_query.bulk_load(self.shared_cache.items())
+        else:
+            for merchant_id in changed:
+                record = self.shared_cache.get(merchant_id)
+                if record is None:
+                    self.merchant_query.remove(merchant_id)
+                else:
+                    self.merchant_query.upsert(merchant_id, record)
+        self.merchant_index_mark = mark
+        return self.merchant_query
+    
+    def _merchant_known(self, merchant_id: str) -> bool:
+        """Whether a merchant exists in the directory or is the primary merchant"""
+        if self.shared_cache:
+            self._ensure_merchant_index()
+            return self.shared_cache.get(merchant_id) is not None
+        self._ensure_directory()
+        return merchant_id in self.merchants
+    
+    def _all_tickets(self) -> Iterator[Ticket]:
+        """Primary merchant's tickets followed by tickets raised on behalf of directory merchants"""
+        yield from self.ticket_data["tickets"]
+        yield from self.merchant_tickets["tickets"]
+    
+    def _highest_ticket_number(self) -> int:
+        """Highest number used by a ticket ID, never below the primary merchant's ticket count"""
+        highest = self.ticket_data.get("total_tickets", 0)
+        for ticket in self._all_tickets():
+            digits = ticket.ticket_id[3:]
+            if digits.isdigit():
+                highest = max(highest, int(digits))
+        return highest
+    
+    def _build_ticket_index(self) -> None:
+        """Index resolved tickets for similar-case retrieval"""
+        self.ticket_index = TicketRetrievalIndex()
+        for ticket in self._all_tickets():
+            if ticket.status in RESOLVED_TICKET_STATUSES:
+                self.ticket_index.add(ticket)
+    
+    def _build_sla_engine(self) -> None:
+        """Seed the resolution-time statistics and open ticket SLA clocks; later changes update them one ticket at a time"""
+        self.sla = SLAEngine(Config.SLA_TARGET_HOURS, Config.SLA_WARNING_FRACTION)
+        for ticket in self._all_tickets():
+            self.sla.observe(ticket)
+    
+    def _apply_resolution_metrics(self) -> bool:
+        """
+        Set the resolution figures of the ticket and dashboard data from the SLA statistics
+        
+        Returns:
+            Whether the dashboard figures changed
+        """
+        overall = self.sla.overall()
+        if overall is None:
+            return False
+        self.ticket_data["average_resolution_time"] = f"{round(overall['mean_hours'], 1):g} hours"
+        metrics = self.dashboard_data.setdefault("performance_metrics", {})
+        previous = dict(metrics)
+        metrics["average_resolution_time"] = self.ticket_data["average_resolution_time"]
+        metrics["p90_resolution_time"] = f"{round(overall['p90_hours'], 1):g} hours"
+        metrics["resolved_within_sla_pct"] = overall["within_sla_pct"]
+        return metrics != previous
+    
+    def _build_kyc_workflow(self) -> None:
+        """Load the primary merchant's KYC documents into the workflow state machine"""
+        self.kyc_workflow = KYCWorkflow()
+        self.kyc_workflow.load_merchant(self.kyc_data["merchant_id"], self.kyc_data)
+        self._sync_kyc_data()
+    
+    def _build_merchant_index(self) -> None:
+        """Index directory merchants and the primary merchant by merchant_id"""
+        self.merchants: Dict[str, Dict[str, Any]] = {}
+        for record in self.merchant_directory.get("merchants", []):
+            self.merchants[record["merchant_id"]] = record
+        self.merchants[self.merchant_data["merchant_id"]] = self.merchant_data
+        
+        records = {merchant_id: self._build_merchant_record(merchant_id) for merchant_id in self.merchants}
+        if self.shared_cache:
+            # The first worker to load these files writes the snapshot; the rest attach to it.
+            # Queries use an index over the shared records (_ensure_merchant_index), not these.
+            try:
+                self.shared_cache.publish(records, self._merchant_source_stamp())
+            except Exception as e:
+                print(f"⚠️  Warning: Could not publish merchant snapshot: {str(e)}")
+            return
+        self.merchant_query = MerchantQueryEngine()
+        self.merchant_query.bulk_load(records.items())
+    
+    def _reindex_merchant(self, merchant_id: str) -> None:
+        """Refresh one merchant's entries in the secondary indexes and the shared cache"""
+        # The indexes are built from current data on first use. Directory merchants only change
+        # once the directory is loaded, and the primary merchant's record needs no directory.
+        if not self.directory_loaded and (not self.shared_cache or merchant_id != self.merchant_data["merchant_id"]):
+            return
+        record = self._build_merchant_record(merchant_id)
+        if self.shared_cache:
+            # Every worker's query index, this one's included, picks the change up from the delta log
+            try:
+                self.shared_cache.put(merchant_id, record)
+            except Exception as e:
+                print(f"⚠️  Warning: Could not update shared merchant cache: {str(e)}")
+        else:
+            self.merchant_query.upsert(merchant_id, record)
+    
+    def _sync_kyc_data(self) -> None:
+        """Write workflow state back into the kyc_data document lists"""
+        merchant_id = self.kyc_data["merchant_id"]
+        self.kyc_data.update(self.kyc_workflow.to_lists(merchant_id))
+        self.kyc_data["verification_progress"] = self.kyc_workflow.get_progress(merchant_id)
+        self.kyc_data["kyc_status"] = self.kyc_workflow.get_kyc_status(merchant_id)
+    
+    def _build_notification_routes(self) -> None:
+        """Compile notification preferences into the routing index"""
+        self.notification_router = NotificationRouter()
+        self.notification_router.update_merchant(
+            self.notification_data.get("merchant_id", "MERCH123456"),
+            self.notification_data
+        )
     
     def _load_data_from_file(self, filename: str) -> Dict[str, Any]:
-        """Load data from JSON file in data folder"""
+        """Load data from JSON file in data folder, or from the snapshot while it matches the file"""
         file_path = os.path.join(self.data_folder, filename)
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return json.load(file)
+            if self.snapshot:
+                with open(file_path, 'rb') as file:
+                    raw = file.read()
+                if self.snapshot.is_current(filename, raw):
+                    return self.snapshot.load(filename)
+                print(f"⚠️  Warning: Data snapshot is out of date for {filename}. Loading JSON.")
+                return serialization.loads(raw)
+            with open(file_path, 'rb') as file:
+                return serialization.loads(file.read())
         except FileNotFoundError:
             print(f"⚠️  Warning: {filename} not found in data folder. Using default data.")
             return self._get_default_data(filename)
-        except json.JSONDecodeError:
+        except ValueError:
             print(f"⚠️  Warning: Invalid JSON in {filename}. Using default data.")
             return self._get_default_data(filename)
     
@@ -60,6 +428,9 @@ class MerchantDataManager:
                 "average_resolution_time": "24 hours",
                 "tickets": []
             },
+            "merchant_tickets.json": {
+                "tickets": []
+            },
             "kyc_data.json": {
                 "merchant_id": "MERCH123456",
                 "kyc_status": "pending",
@@ -67,6 +438,7 @@ class MerchantDataManager:
                 "verification_progress": 0,
                 "pending_documents": [],
                 "uploaded_documents": [],
+                "verified_documents": [],
                 "rejected_documents": [],
                 "kyc_history": []
             },
@@ -150,6 +522,9 @@ class MerchantDataManager:
                     "total_tickets": 0,
                     "resolved_tickets": 0
                 }
+            },
+            "merchants.json": {
+                "merchants": []
             }
         }
         return defaults.get(filename, {})
@@ -161,92 +536,191 @@ class MerchantDataManager:
             os.makedirs(self.data_folder, exist_ok=True)
             
             file_path = os.path.join(self.data_folder, filename)
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=2, ensure_ascii=False)
+            # Encoded before the file is opened, so a failure never leaves it truncated
+            body = serialization.dumps(data, Config.DATA_FILES_PRETTY, _json_default)
+            with open(file_path, 'wb') as file:
+                file.write(body)
+            self._touch(*FILE_DOMAINS.get(filename, ()))
+            if self.shared_cache and filename in MERCHANT_SOURCE_FILES:
+                # The change was published before saving; workers starting from this file can attach
+                try:
+                    self.shared_cache.set_source_stamp(self._merchant_source_stamp())
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not update shared merchant cache: {str(e)}")
             return True
         except Exception as e:
             print(f"❌ Error saving {filename}: {str(e)}")
             return False
     
+    def _touch(self, *domains: str) -> None:
+        """Mark data domains as changed"""
+        for domain in domains:
+            self.data_versions[domain] += 1
+    
+    def get_data_version(self, domain: str) -> str:
+        """
+        Version tag of a data domain, changing whenever its data changes
+        
+        Args:
+            domain: One of DATA_DOMAINS, or "summary" for all of them
+        """
+        if domain == "summary":
+            # Every change bumps one counter, so the total identifies the combined state
+            version = sum(self.data_versions.values())
+        else:
+            version = self.data_versions[domain]
+        return f"{domain}-{self.data_instance}-{version}"
+    
+    def _record_change(self, domain: str, key: str, record: Optional[Dict[str, Any]]) -> None:
+        """Add a record's new state to the change feed and push it to the merchant's subscribers"""
+        seq = self.change_log.append(domain, key, record)
+        self.events.publish(self._event_topic(key, record), EVENT_TYPES[domain], record, f"{self.data_instance}-{seq}", seq)
+        if self.audit:
+            try:
+                self.audit.append(self._event_topic(key, record), domain, key, record)
+            except Exception as e:
+                print(f"⚠️  Warning: Could not write audit log: {str(e)}")
+    
+    @staticmethod
+    def _event_topic(key: str, record: Optional[Dict[str, Any]]) -> str:
+        """Merchant whose subscribers receive a change"""
+        return (record or {}).get("merchant_id") or key
+    
+    def get_change_cursor(self) -> str:
+        """Change feed position matching the data currently loaded"""
+        return f"{self.data_instance}-{self.change_log.sequence}"
+    
+    def get_audit_state(self, merchant_id: str, at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild a merchant's audited records as they were at a point in time
+        
+        Args:
+            merchant_id: Merchant to rebuild
+            at: ISO date or timestamp; now if None
+            
+        Returns:
+            Dictionary with the state by domain and key, or None if nothing was recorded by then
+            
+        Raises:
+            ValueError: If at is not an ISO date or timestamp
+        """
+        if not self.audit:
+            return None
+        return self.audit.state_at(merchant_id, at)
+    
+    def get_audit_events(self, merchant_id: str, since: Optional[str] = None, until: Optional[str] = None,
+                         limit: int = 100) -> List[Dict[str, Any]]:
+        """Get a merchant's audited changes in a time range, oldest first"""
+        if not self.audit:
+            return []
+        return self.audit.history(merchant_id, since, until, limit)
+    
+    def get_changes(self, since: str, domains: Optional[List[str]] = None, limit: int = 500) -> Dict[str, Any]:
+        """
+        Get records changed after a change feed cursor
+        
+        Args:
+            since: Cursor from an earlier call or from a /api/data/* response
+            domains: Limit to these domains (tickets, kyc, merchant, notifications)
+            limit: Maximum changes to return
+            
+        Returns:
+            Dictionary with the changes, the next cursor, has_more, and reset=True when the
+            cursor is unknown or too old and the client must reload the full data
+        """
+        instance, _, seq = since.rpartition("-")
+        if instance != self.data_instance or not seq.isdigit():
+            return {"changes": [], "cursor": self.get_change_cursor(), "has_more": False, "reset": True}
+        
+        page = self.change_log.since(int(seq), domains, limit)
+        return {
+            "changes": page["changes"],
+            "cursor": f"{self.data_instance}-{page['seq']}",
+            "has_more": page["has_more"],
+            "reset": page["reset"]
+        }
+    
     def get_merchant_info(self, merchant_id: Optional[str] = None) -> Dict[str, Any]:
         """Get merchant information"""
         if merchant_id and merchant_id != self.merchant_data["merchant_id"]:
             return {"error": "Merchant not found"}
-        return self.merchant_data.copy()
+        return self._build_section("merchant_info")
     
     def get_account_status(self) -> Dict[str, Any]:
         """Get account status information"""
-        return {
-            "merchant_id": self.merchant_data["merchant_id"],
-            "account_status": self.merchant_data["account_status"],
-            "compliance_status": self.merchant_data["compliance_status"],
-            "risk_score": self.merchant_data["risk_score"],
-            "last_activity": self.merchant_data["last_activity"]
-        }
+        return self._build_section("account_status")
     
     def get_kyc_status(self) -> Dict[str, Any]:
         """Get KYC status and details"""
-        return {
-            "merchant_id": self.kyc_data["merchant_id"],
-            "kyc_status": self.kyc_data["kyc_status"],
-            "kyc_level": self.kyc_data["kyc_level"],
-            "verification_progress": self.kyc_data["verification_progress"],
-            "pending_documents": self.kyc_data["pending_documents"],
-            "uploaded_documents": self.kyc_data["uploaded_documents"],
-            "rejected_documents": self.kyc_data["rejected_documents"]
-        }
+        return self._build_section("kyc_status")
     
     def get_payout_info(self) -> Dict[str, Any]:
         """Get payout and settlement information"""
-        return {
-            "merchant_id": self.payout_data["merchant_id"],
-            "last_payout": self.payout_data["last_payout"],
-            "next_settlement": self.payout_data["next_settlement"],
-            "payout_schedule": self.payout_data["payout_schedule"],
-            "total_payouts": self.payout_data["total_payouts"],
-            "payout_amount": self.payout_data["payout_amount"],
-            "pending_payouts": self.payout_data["pending_payouts"]
-        }
+        return self._build_section("payout_info")
     
     def get_transaction_limits(self) -> Dict[str, Any]:
         """Get transaction limit information"""
-        return {
-            "merchant_id": self.transaction_data["merchant_id"],
-            "transaction_limit": self.transaction_data["transaction_limit"],
-            "daily_limit": self.transaction_data["daily_limit"],
-            "monthly_limit": self.transaction_data["monthly_limit"],
-            "current_usage": self.transaction_data["current_usage"],
-            "limit_utilization": self.transaction_data["limit_utilization"]
-        }
+        return self._build_section("transaction_limits")
     
     def get_support_tickets(self) -> Dict[str, Any]:
         """Get support ticket information"""
-        return {
-            "merchant_id": self.ticket_data.get("merchant_id", "MERCH123456"),
-            "open_tickets": self.ticket_data["open_tickets"],
-            "total_tickets": self.ticket_data["total_tickets"],
-            "resolved_tickets": self.ticket_data["resolved_tickets"],
-            "average_resolution_time": self.ticket_data["average_resolution_time"],
-            "tickets": self.ticket_data["tickets"]
-        }
+        return self._build_section("support_tickets")
     
     def get_notification_preferences(self) -> Dict[str, Any]:
         """Get notification preferences"""
+        return self._build_section("notification_preferences")
+    
+    @_synchronized
+    def update_notification_preference(self, channel: str, event_type: str, enabled: bool) -> bool:
+        """Update a single notification preference, patch the routing index and save to file"""
+        section = f"{channel}_notifications"
+        if section not in CHANNEL_SECTIONS:
+            return False
+        self.notification_data.setdefault(section, {})[event_type] = bool(enabled)
+        self.notification_router.set_preference(
+            self.notification_data["merchant_id"], channel, event_type, bool(enabled)
+        )
+        self._record_change("notifications", self.notification_data.get("merchant_id", "MERCH123456"), self.get_notification_preferences())
+        return self._save_data_to_file("notification_data.json", self.notification_data)
+    
+    @_synchronized
+    def get_notification_recipients(self, event_type: str, channel: Optional[str] = None) -> Dict[str, Any]:
+        """Get merchants to notify for an event type, per channel"""
+        if channel:
+            return {
+                "event_type": event_type,
+                "recipients": {channel: sorted(self.notification_router.get_recipients(event_type, channel))}
+            }
         return {
-            "merchant_id": self.notification_data["merchant_id"],
-            "email_notifications": self.notification_data["email_notifications"],
-            "whatsapp_notifications": self.notification_data["whatsapp_notifications"],
-            "sms_notifications": self.notification_data["sms_notifications"]
+            "event_type": event_type,
+            "recipients": self.notification_router.fan_out(event_type)
         }
     
     def get_dashboard_insights(self) -> Dict[str, Any]:
         """Get dashboard analytics and insights"""
-        return {
-            "merchant_id": self.dashboard_data["merchant_id"],
-            "weekly_trends": self.dashboard_data["weekly_trends"],
-            "issue_frequency": self.dashboard_data["issue_frequency"],
-            "performance_metrics": self.dashboard_data["performance_metrics"]
-        }
+        return self._build_section("dashboard_insights")
+    
+    def _build_section(self, section: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Build a summary section, or only some of its fields, straight from the loaded data
+        
+        Args:
+            section: Key of SUMMARY_SECTIONS
+            fields: Fields to include, in order; every exposed field if None
+        """
+        _, source_name, exposed = SUMMARY_SECTIONS[section]
+        source = getattr(self, source_name)
+        result = {}
+        for name in fields if fields is not None else (exposed or list(source)):
+            if name == "merchant_id":
+                value = source.get("merchant_id", "MERCH123456")
+            elif name == "tickets":
+                # Copies, so callers never hold the live records
+                value = [ticket.to_dict() for ticket in source["tickets"]]
+            else:
+                value = source[name]
+            result[name] = value
+        return result
     
     def get_relevant_data_for_query(self, query: str) -> Dict[str, Any]:
         """Get relevant data based on query keywords"""
@@ -284,96 +758,647 @@ class MerchantDataManager:
         else:
             return {"merchant_id": self.merchant_data["merchant_id"]}
     
+    @_synchronized
     def update_merchant_data(self, field: str, value: Any) -> bool:
         """Update merchant data and save to file"""
         if field in self.merchant_data:
             self.merchant_data[field] = value
+            self._reindex_merchant(self.merchant_data["merchant_id"])
+            self._record_change("merchant", self.merchant_data["merchant_id"], self.get_merchant_info())
             return self._save_data_to_file("merchant_data.json", self.merchant_data)
         return False
     
-    def create_support_ticket(self, subject: str, description: str, priority: str = "medium") -> Dict[str, Any]:
+    @_synchronized
+    def create_support_ticket(self, subject: str, description: str, priority: str = "medium", merchant_id: Optional[str] = None) -> Dict[str, Any]:
         """Create a new support ticket and save to file"""
-        ticket_id = f"TKT{random.randint(100, 999)}"
+        merchant_id = merchant_id or self.merchant_data["merchant_id"]
+        new_ticket = self._append_ticket(subject, description, priority, merchant_id)
+        
+        # Save updated ticket data to file
+        self._save_tickets({merchant_id})
+        
+        return new_ticket
+    
+    def replay_events(self, since: str, merchant_id: str, types: Optional[List[str]] = None,
+                      limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rebuild a merchant's events after a change feed cursor, for a reconnecting stream
+        
+        Args:
+            since: Last event ID the client received
+            merchant_id: Merchant the stream is for
+            types: Only these event types; all types if empty
+            limit: Most changes worth replaying
+            
+        Returns:
+            Events oldest first, or None if the cursor is too old or too far behind and the
+            client must resync through /api/data/changes
+        """
+        domains = [domain for domain, event_type in EVENT_TYPES.items() if not types or event_type in types]
+        page = self.get_changes(since, domains, limit)
+        if page["reset"] or page["has_more"]:
+            return None
+        return [{
+            "id": f"{self.data_instance}-{change['seq']}",
+            "seq": change["seq"],
+            "type": EVENT_TYPES[change["domain"]],
+            "data": change["record"]
+        } for change in page["changes"] if self._event_topic(change["key"], change["record"]) == merchant_id]
+    
+    def _ticket_store(self, merchant_id: str) -> Tuple[str, Dict[str, Any]]:
+        """File and data holding a merchant's tickets; only the primary merchant's count towards its ticket totals"""
+        if merchant_id == self.merchant_data["merchant_id"]:
+            return "ticket_data.json", self.ticket_data
+        return "merchant_tickets.json", self.merchant_tickets
+    
+    def _save_tickets(self, merchant_ids: Set[str]) -> None:
+        """Save the ticket files holding these merchants' tickets"""
+        for filename, data in dict(self._ticket_store(merchant_id) for merchant_id in merchant_ids).items():
+            self._save_data_to_file(filename, data)
+    
+    def _append_ticket(self, subject: str, description: str, priority: str, merchant_id: str) -> Dict[str, Any]:
+        """Append a new open ticket to the merchant's ticket store without saving"""
+        self.ticket_sequence += 1
         new_ticket = {
-            "ticket_id": ticket_id,
+            "ticket_id": f"TKT{self.ticket_sequence:03d}",
             "subject": subject,
             "description": description,
             "status": "open",
             "priority": priority,
             "created_date": datetime.now().isoformat(),
             "last_updated": datetime.now().isoformat(),
-            "merchant_id": self.merchant_data["merchant_id"]
+            "merchant_id": merchant_id
         }
         
-        self.ticket_data["tickets"].append(new_ticket)
-        self.ticket_data["open_tickets"] += 1
-        self.ticket_data["total_tickets"] += 1
-        
-        # Save updated ticket data to file
-        self._save_data_to_file("ticket_data.json", self.ticket_data)
-        
+        _, store = self._ticket_store(merchant_id)
+        store["tickets"].append(Ticket.from_dict(new_ticket))
+        if store is self.ticket_data:
+            self.ticket_data["open_tickets"] += 1
+            self.ticket_data["total_tickets"] += 1
+        self.sla.observe(new_ticket)
+        self._record_change("tickets", new_ticket["ticket_id"], dict(new_ticket))
         return new_ticket
     
-    def update_ticket_status(self, ticket_id: str, status: str) -> bool:
+    @_synchronized
+    def update_ticket_status(self, ticket_id: str, status: str, resolution: Optional[str] = None) -> bool:
         """Update ticket status and save to file"""
-        for ticket in self.ticket_data["tickets"]:
-            if ticket["ticket_id"] == ticket_id:
+        for ticket in self._all_tickets():
+            if ticket.ticket_id == ticket_id:
                 ticket["status"] = status
                 ticket["last_updated"] = datetime.now().isoformat()
+                if resolution:
+                    ticket["resolution"] = resolution
                 
-                if status == "resolved":
+                filename, store = self._ticket_store(ticket.get("merchant_id") or self.merchant_data["merchant_id"])
+                if status == "resolved" and store is self.ticket_data:
                     self.ticket_data["open_tickets"] = max(0, self.ticket_data["open_tickets"] - 1)
                     self.ticket_data["resolved_tickets"] += 1
                 
-                self._save_data_to_file("ticket_data.json", self.ticket_data)
+                if status in RESOLVED_TICKET_STATUSES:
+                    self.ticket_index.add(ticket)
+                else:
+                    self.ticket_index.remove(ticket_id)
+                self.sla.observe(ticket)
+                if self._apply_resolution_metrics():
+                    self._touch("dashboard")
+                self._record_change("tickets", ticket_id, ticket.to_dict())
+                
+                self._save_data_to_file(filename, store)
                 return True
         return False
     
+    @_synchronized
+    def get_sla_report(self) -> Dict[str, Any]:
+        """Get resolution-time statistics per priority and category, and open ticket SLA counts"""
+        return self.sla.report()
+    
+    @_synchronized
+    def get_sla_at_risk(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get open tickets close to or past their SLA target, most overdue first"""
+        return self.sla.at_risk(limit=limit)
+    
+    @_synchronized
+    def find_similar_tickets(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Find resolved tickets most similar to a query"""
+        return self.ticket_index.search(query, k)
+    
+    @_synchronized
     def add_kyc_document(self, document_type: str, status: str = "pending") -> bool:
         """Add KYC document and save to file"""
-        if document_type not in self.kyc_data["uploaded_documents"]:
-            self.kyc_data["uploaded_documents"].append(document_type)
+        merchant_id = self.kyc_data["merchant_id"]
+        if self.kyc_workflow.transition(merchant_id, document_type, "uploaded"):
+            return False
+        
+        self._record_kyc_history(f"Document uploaded: {document_type}", status, document_type)
+        self._sync_kyc_data()
+        self._reindex_merchant(merchant_id)
+        self._record_kyc_change(merchant_id)
+        
+        self._save_data_to_file("kyc_data.json", self.kyc_data)
+        return True
+    
+    @_synchronized
+    def update_kyc_document_status(self, document_type: str, status: str) -> Optional[str]:
+        """Move a KYC document to a new status and save to file, returning an error if refused"""
+        merchant_id = self.kyc_data["merchant_id"]
+        error = self.kyc_workflow.transition(merchant_id, document_type, status)
+        if error:
+            return error
+        
+        self._record_kyc_history(f"Document {status}: {document_type}", status, document_type)
+        self._sync_kyc_data()
+        self._reindex_merchant(merchant_id)
+        self._record_kyc_change(merchant_id)
+        
+        self._save_data_to_file("kyc_data.json", self.kyc_data)
+        return None
+    
+    @_synchronized
+    def bulk_update_kyc_documents(self, verdicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply many KYC document verdicts in one pass and save once"""
+        merchant_id = self.kyc_data["merchant_id"]
+        for verdict in verdicts:
+            verdict.setdefault("merchant_id", merchant_id)
+        if any(verdict["merchant_id"] != merchant_id for verdict in verdicts):
+            self._ensure_directory()
+        
+        result = self.kyc_workflow.bulk_transition(verdicts)
+        directory_changes = set()
+        primary_changed = False
+        for verdict in result["applied"]:
+            if verdict["merchant_id"] == merchant_id:
+                primary_changed = True
+                self._record_kyc_history(
+                    f"Document {verdict['status']}: {verdict['document_type']}",
+                    verdict["status"],
+                    verdict["document_type"]
+                )
+            else:
+                directory_changes.add(verdict["merchant_id"])
+        
+        if primary_changed:
+            self._sync_kyc_data()
+            self._reindex_merchant(merchant_id)
+            self._record_kyc_change(merchant_id)
+            self._save_data_to_file("kyc_data.json", self.kyc_data)
+        if directory_changes:
+            for changed_id in directory_changes:
+                self.merchants[changed_id].update(self.kyc_workflow.to_lists(changed_id))
+                self._reindex_merchant(changed_id)
+                self._record_kyc_change(changed_id)
+            self._save_data_to_file("merchants.json", self.merchant_directory)
+        
+        return {
+            "applied": len(result["applied"]),
+            "failed": result["failed"],
+            "verification_progress": self.kyc_data["verification_progress"]
+        }
+    
+    def _record_kyc_change(self, merchant_id: str) -> None:
+        """Add a merchant's KYC state to the change feed"""
+        if merchant_id == self.kyc_data["merchant_id"]:
+            record = self.get_kyc_status()
+        else:
+            record = {
+                "merchant_id": merchant_id,
+                **self.kyc_workflow.to_lists(merchant_id),
+                "verification_progress": self.kyc_workflow.get_progress(merchant_id),
+                "kyc_status": self.kyc_workflow.get_kyc_status(merchant_id)
+            }
+        self._record_change("kyc", merchant_id, record)
+    
+    def _record_kyc_history(self, action: str, status: str, document_type: str) -> None:
+        """Append an entry to the KYC history"""
+        self.kyc_data["kyc_history"].append({
+            "date": datetime.now().strftime("%Y-%m-%d"),
+            "action": action,
+            "status": status,
+            "document_type": document_type
+        })
+    
+    @_synchronized
+    def get_merchant_record(self, merchant_id: str) -> Optional[Dict[str, Any]]:
+        """Get the admin view of any known merchant, including updates made by other workers"""
+        if self.shared_cache:
+            # Publishes the current files first when no worker has yet
+            self._ensure_merchant_index()
+            return self.shared_cache.get(merchant_id)
+        self._ensure_directory()
+        return self._build_merchant_record(merchant_id)
+    
+    @_synchronized
+    def get_data_for_merchant(self, source: str, merchant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Data a merchant-facing accessor (get_kyc_status, get_account_status, ...) returns for one merchant
+        
+        Args:
+            source: Name of the accessor
+            merchant_id: Merchant asking; the primary merchant if None
             
-            # Update KYC history
-            history_entry = {
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "action": f"Document uploaded: {document_type}",
-                "status": status,
-                "document_type": document_type
+        Returns:
+            The merchant's own data, or None when it is unknown or the directory holds nothing for
+            that accessor (payouts, limits and notification preferences exist only for the primary merchant)
+        """
+        if merchant_id is None or merchant_id == self.merchant_data["merchant_id"]:
+            return getattr(self, source)()
+        if not self._merchant_known(merchant_id):
+            return None
+        if source == "get_account_status":
+            record = self.get_merchant_record(merchant_id)
+            return {field: record.get(field) for field in SUMMARY_SECTIONS["account_status"][2]}
+        if source == "get_kyc_status":
+            self._ensure_directory()
+            record = self.merchants.get(merchant_id, {})
+            kyc = {
+                "merchant_id": merchant_id,
+                "kyc_status": self.kyc_workflow.get_kyc_status(merchant_id),
+                "verification_progress": self.kyc_workflow.get_progress(merchant_id),
+                **self.kyc_workflow.to_lists(merchant_id)
+            }
+            if "kyc_level" in record:
+                kyc["kyc_level"] = record["kyc_level"]
+            return kyc
+        if source == "get_support_tickets":
+            tickets = [ticket.to_dict() for ticket in self.merchant_tickets["tickets"] if ticket.merchant_id == merchant_id]
+            resolved = sum(1 for ticket in tickets if ticket["status"] in RESOLVED_TICKET_STATUSES)
+            return {
+                "merchant_id": merchant_id,
+                "open_tickets": len(tickets) - resolved,
+                "total_tickets": len(tickets),
+                "resolved_tickets": resolved,
+                "tickets": tickets
             }
-            self.kyc_data["kyc_history"].append(history_entry)
+        return None
+    
+    def get_shared_cache_stats(self) -> Dict[str, Any]:
+        """Get shared merchant cache stats for this process"""
+        if not self.shared_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.shared_cache.get_stats()}
+    
+    def _build_merchant_record(self, merchant_id: str) -> Optional[Dict[str, Any]]:
+        """Build the admin view of a merchant; directory merchants need the directory loaded"""
+        if merchant_id == self.merchant_data["merchant_id"]:
+            record = self.merchant_data
+        else:
+            record = self.merchants.get(merchant_id)
+        if record is None:
+            return None
+        return {
+            "merchant_id": merchant_id,
+            "business_name": record.get("business_name"),
+            "account_status": record.get("account_status"),
+            "compliance_status": record.get("compliance_status"),
+            "risk_score": record.get("risk_score"),
+            "last_activity": record.get("last_activity"),
+            "pending_kyc_documents": self.kyc_workflow.get_pending_count(merchant_id)
+            if self.kyc_workflow.has_merchant(merchant_id) else 0
+        }
+    
+    @_synchronized
+    def get_directory_merchants(self, merchant_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get directory merchant records held by this node, with their current KYC document lists,
+        for moving them to another shard
+        
+        Args:
+            merchant_ids: Only these merchants; every directory merchant if None
+        """
+        self._ensure_directory()
+        primary_id = self.merchant_data["merchant_id"]
+        if merchant_ids is None:
+            merchant_ids = [merchant_id for merchant_id in self.merchants if merchant_id != primary_id]
+        return [
+            {**self.merchants[merchant_id], **self.kyc_workflow.to_lists(merchant_id)}
+            for merchant_id in merchant_ids
+            if merchant_id != primary_id and merchant_id in self.merchants
+        ]
+    
+    @_synchronized
+    def get_merchant_tickets(self, merchant_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get the tickets raised on behalf of these directory merchants, for moving them with the merchants"""
+        wanted = set(merchant_ids)
+        return [ticket.to_dict() for ticket in self.merchant_tickets["tickets"] if ticket.merchant_id in wanted]
+    
+    @_synchronized
+    def put_merchant_tickets(self, tickets: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add or replace tickets of directory merchants moved here from another shard, and save once
+        
+        Each node numbers its own tickets, so a moved ticket whose ID this node already uses
+        for another merchant's ticket is given the next free number.
+        
+        Returns:
+            Dictionary with the count stored and the renumbered tickets (merchant_id, ticket_id, previous_ticket_id)
+        """
+        primary_id = self.merchant_data["merchant_id"]
+        positions = {ticket.ticket_id: index for index, ticket in enumerate(self.merchant_tickets["tickets"])}
+        used = {ticket.ticket_id for ticket in self.ticket_data["tickets"]}
+        stored = 0
+        renumbered = []
+        for record in tickets:
+            merchant_id = record.get("merchant_id")
+            ticket_id = record.get("ticket_id")
+            if not merchant_id or merchant_id == primary_id or not ticket_id:
+                continue
+            ticket = Ticket.from_dict(record)
+            position = positions.get(ticket_id)
+            if position is not None and self.merchant_tickets["tickets"][position].merchant_id == merchant_id:
+                # Copied before, e.g. by an interrupted move
+                self.merchant_tickets["tickets"][position] = ticket
+            else:
+                if position is not None or ticket_id in used:
+                    self.ticket_sequence += 1
+                    ticket["ticket_id"] = f"TKT{self.ticket_sequence:03d}"
+                    renumbered.append({
+                        "merchant_id": merchant_id,
+                        "ticket_id": ticket.ticket_id,
+                        "previous_ticket_id": ticket_id
+                    })
+                positions[ticket.ticket_id] = len(self.merchant_tickets["tickets"])
+                self.merchant_tickets["tickets"].append(ticket)
+            digits = ticket.ticket_id[3:]
+            if digits.isdigit():
+                self.ticket_sequence = max(self.ticket_sequence, int(digits))
+            stored += 1
+        if stored:
+            self._build_ticket_index()
+            self._build_sla_engine()
+            if self._apply_resolution_metrics():
+                self._touch("dashboard")
+            self._save_data_to_file("merchant_tickets.json", self.merchant_tickets)
+        return {"stored": stored, "renumbered": renumbered}
+    
+    @_synchronized
+    def put_directory_merchants(self, records: List[Dict[str, Any]]) -> int:
+        """Add or replace directory merchants, e.g. ones moved here from another shard, and save once"""
+        self._ensure_directory()
+        merchants = self._mutable_directory()
+        primary_id = self.merchant_data["merchant_id"]
+        stored = 0
+        for record in records:
+            merchant_id = record.get("merchant_id")
+            if not merchant_id or merchant_id == primary_id:
+                continue
+            existing = self.merchants.get(merchant_id)
+            if existing is not None:
+                # Same dict object as the directory list entry, so the list stays in step
+                existing.clear()
+                existing.update(record)
+            else:
+                existing = dict(record)
+                merchants.append(existing)
+                self.merchants[merchant_id] = existing
+            self.kyc_workflow.load_merchant(merchant_id, existing)
+            self._reindex_merchant(merchant_id)
+            stored += 1
+        if stored:
+            self._save_data_to_file("merchants.json", self.merchant_directory)
+        return stored
+    
+    @_synchronized
+    def remove_directory_merchants(self, merchant_ids: List[str]) -> int:
+        """Drop directory merchants that now belong to another shard, with their tickets, and save once"""
+        self._ensure_directory()
+        removing = set(merchant_ids) - {self.merchant_data["merchant_id"]}
+        tickets = self.merchant_tickets["tickets"]
+        kept_tickets = [ticket for ticket in tickets if ticket.merchant_id not in removing]
+        if len(kept_tickets) < len(tickets):
+            self.merchant_tickets["tickets"] = kept_tickets
+            self._build_ticket_index()
+            self._build_sla_engine()
+            if self._apply_resolution_metrics():
+                self._touch("dashboard")
+            self._save_data_to_file("merchant_tickets.json", self.merchant_tickets)
+        
+        merchants = self._mutable_directory()
+        kept = [record for record in merchants if record["merchant_id"] not in removing]
+        removed = len(merchants) - len(kept)
+        if not removed:
+            return 0
+        self.merchant_directory["merchants"] = kept
+        for merchant_id in removing:
+            if self.merchants.pop(merchant_id, None) is None:
+                continue
+            if self.shared_cache:
+                try:
+                    self.shared_cache.put(merchant_id, None)
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not update shared merchant cache: {str(e)}")
+            else:
+                self.merchant_query.remove(merchant_id)
+        self._save_data_to_file("merchants.json", self.merchant_directory)
+        return removed
+    
+    def _mutable_directory(self) -> List[Dict[str, Any]]:
+        """Directory merchant list as a plain list, decoding a snapshot-backed one"""
+        merchants = self.merchant_directory.get("merchants", [])
+        if not isinstance(merchants, list):
+            # Decoded records are the same dicts the indexes already hold
+            merchants = list(merchants)
+        self.merchant_directory["merchants"] = merchants
+        return merchants
+    
+    @_synchronized
+    def find_merchants(self, filters: Dict[str, Any]) -> List[str]:
+        """Find every merchant ID matching admin filter predicates"""
+        return self._ensure_merchant_index().query(filters)["merchant_ids"]
+    
+    @_synchronized
+    def query_merchants(self, filters: Dict[str, Any], limit: int = 100, cursor: int = 0) -> Dict[str, Any]:
+        """
+        Query merchants through the secondary indexes, one page at a time
+        
+        Args:
+            filters: Equality filters (account_status, compliance_status, risk_score, pending_kyc)
+                and range filters (risk_score_min, risk_score_max, last_activity_after,
+                last_activity_before, inactive_days)
+            limit: Page size
+            cursor: next_cursor from the previous page
             
-            # Update verification progress
-            total_docs = len(self.kyc_data["pending_documents"]) + len(self.kyc_data["uploaded_documents"])
-            self.kyc_data["verification_progress"] = int((len(self.kyc_data["uploaded_documents"]) / total_docs) * 100)
+        Returns:
+            Dictionary with the page of merchant records, total matches and next_cursor
+        """
+        page = self._ensure_merchant_index().query(filters, limit=limit, cursor=cursor)
+        return {
+            "merchants": [self.get_merchant_record(merchant_id) for merchant_id in page["merchant_ids"]],
+            "count": len(page["merchant_ids"]),
+            "total": page["total"],
+            "next_cursor": page["next_cursor"]
+        }
+    
+    @_synchronized
+    def create_tickets_on_behalf(self, merchant_ids: List[str], subject: str, description: str, priority: str = "medium") -> Dict[str, Any]:
+        """Create one ticket per merchant and save once"""
+        succeeded = []
+        failed = []
+        for merchant_id in merchant_ids:
+            if not self._merchant_known(merchant_id):
+                failed.append({"merchant_id": merchant_id, "error": "Merchant not found"})
+                continue
+            ticket = self._append_ticket(subject, description, priority, merchant_id)
+            succeeded.append({"merchant_id": merchant_id, "ticket_id": ticket["ticket_id"]})
+        
+        if succeeded:
+            self._save_tickets({entry["merchant_id"] for entry in succeeded})
+        return {"succeeded": succeeded, "failed": failed}
+    
+    @_synchronized
+    def send_compliance_reminders(self, merchant_ids: List[str], message: str) -> Dict[str, Any]:
+        """Record a compliance reminder for each merchant and save once"""
+        self._ensure_directory()
+        succeeded = []
+        failed = []
+        sent_at = datetime.now().isoformat()
+        primary_id = self.merchant_data["merchant_id"]
+        for merchant_id in merchant_ids:
+            record = self.merchants.get(merchant_id)
+            if record is None:
+                failed.append({"merchant_id": merchant_id, "error": "Merchant not found"})
+                continue
+            channels = self.notification_router.get_channels(merchant_id, "kyc_updates") or ["email"]
+            record["last_compliance_reminder"] = sent_at
+            if merchant_id == primary_id:
+                for channel in channels:
+                    self.notification_data["notification_history"].append({
+                        "date": sent_at,
+                        "type": "compliance_reminder",
+                        "message": message,
+                        "channel": channel
+                    })
+            succeeded.append({"merchant_id": merchant_id, "channels": channels})
+        
+        if any(item["merchant_id"] == primary_id for item in succeeded):
+            self._save_data_to_file("merchant_data.json", self.merchant_data)
+            self._save_data_to_file("notification_data.json", self.notification_data)
+        if any(item["merchant_id"] != primary_id for item in succeeded):
+            self._save_data_to_file("merchants.json", self.merchant_directory)
+        return {"succeeded": succeeded, "failed": failed}
+    
+    def get_all_data_summary(self, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get a comprehensive summary of all merchant data, or a projection of it
+        
+        Args:
+            fields: Section names ("kyc_status") or section fields ("support_tickets.open_tickets");
+                sections and fields that are not requested are never built
             
-            self._save_data_to_file("kyc_data.json", self.kyc_data)
-            return True
-        return False
+        Returns:
+            Requested sections in summary order, each whole or limited to its requested fields
+        """
+        projection = self.parse_summary_fields(fields) if fields else dict.fromkeys(SUMMARY_SECTIONS)
+        return {section: self._build_section(section, names) for section, names in projection.items()}
+    
+    def parse_summary_fields(self, fields: List[str]) -> Dict[str, Optional[List[str]]]:
+        """
+        Validate summary field names and group them by section
+        
+        Returns:
+            section -> requested fields, or None for the whole section, in summary order
+            
+        Raises:
+            ValueError: For an unknown section or a field the section does not expose
+        """
+        requested: Dict[str, Optional[List[str]]] = {}
+        for field in fields:
+            section, _, name = field.strip().partition(".")
+            if section not in SUMMARY_SECTIONS:
+                raise ValueError(f"Unknown summary section: {section}")
+            if not name:
+                requested[section] = None
+                continue
+            _, source_name, exposed = SUMMARY_SECTIONS[section]
+            if name not in (exposed or getattr(self, source_name)):
+                raise ValueError(f"Unknown field for {section}: {name}")
+            if section not in requested:
+                requested[section] = []
+            names = requested[section]
+            if names is not None and name not in names:
+                names.append(name)
+        return {section: requested[section] for section in SUMMARY_SECTIONS if section in requested}
+    
+    def get_summary_version(self, sections: List[str]) -> str:
+        """Version tag of a summary projection, which changes only with the domains of its sections"""
+        version = sum(self.data_versions[SUMMARY_SECTIONS[section][0]] for section in sections)
+        return f"summary-{self.data_instance}-{version}"
+    
+    def iter_export_rows(self, entity: str, start: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (position, row) for an export entity from a source position on
+        
+        Rows are built one at a time from the loaded data, and snapshot-backed merchants are
+        read without being kept decoded, so a full export never holds a second copy.
+        """
+        if entity == "tickets":
+            # The same sources as _all_tickets(), each from its own base position
+            sources = [
+                (0, self.ticket_data["tickets"], self.merchant_data["merchant_id"]),
+                (MERCHANT_TICKETS_POSITION, self.merchant_tickets["tickets"], None)
+            ]
+            for index, (base, records, merchant_id) in enumerate(sources):
+                if index + 1 < len(sources) and start >= sources[index + 1][0]:
+                    continue
+                yield from self._iter_record_rows(records, merchant_id, base, max(0, start - base))
+            return
+        if entity == "kyc_history":
+            records, merchant_id = self.kyc_data["kyc_history"], self.kyc_data["merchant_id"]
+        elif entity == "transactions":
+            records, merchant_id = self.transaction_data.get("recent_transactions", []), self.transaction_data["merchant_id"]
+        elif entity == "payouts":
+            records, merchant_id = self.payout_data.get("payout_history", []), self.payout_data["merchant_id"]
+        elif entity == "merchants":
+            # Read for this export only when the shared cache left the directory unparsed
+            directory = self.merchant_directory
+            if directory is None:
+                directory = self._load_data_from_file("merchants.json")
+            records, merchant_id = directory.get("merchants", []), None
+        else:
+            raise ValueError(f"Unknown export entity: {entity}")
+        yield from self._iter_record_rows(records, merchant_id, 0, start)
+    
+    @staticmethod
+    def _iter_record_rows(records, merchant_id: Optional[str], base: int,
+                          position: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (base + position, row) for one record list from a position on"""
+        # Re-read the length so rows appended during the export are included
+        while position < len(records):
+            record = records.peek(position) if isinstance(records, LazyRecords) else records[position]
+            row = record.to_dict() if isinstance(record, CompactRecord) else dict(record)
+            if merchant_id and not row.get("merchant_id"):
+                row["merchant_id"] = merchant_id
+            yield base + position, row
+            position += 1
     
-    def get_all_data_summary(self) -> Dict[str, Any]:
-        """Get a comprehensive summary of all merchant data"""
+    @_synchronized
+    def rebuild_indexes(self) -> Dict[str, int]:
+        """Rebuild the in-memory indexes from the loaded data and report their sizes"""
+        self._build_indexes()
         return {
-            "merchant_info": self.get_merchant_info(),
-            "account_status": self.get_account_status(),
-            "kyc_status": self.get_kyc_status(),
-            "payout_info": self.get_payout_info(),
-            "transaction_limits": self.get_transaction_limits(),
-            "support_tickets": self.get_support_tickets(),
-            "notification_preferences": self.get_notification_preferences(),
-            "dashboard_insights": self.get_dashboard_insights()
+            "merchants": len(self._ensure_merchant_index()),
+            "resolved_tickets": len(self.ticket_index)
         }
     
+    @_synchronized
     def reload_data(self) -> bool:
         """Reload all data from JSON files"""
         try:
+            self.snapshot = self._open_snapshot()
             self.merchant_data = self._load_data_from_file("merchant_data.json")
             self.ticket_data = self._load_data_from_file("ticket_data.json")
+            self.merchant_tickets = self._load_data_from_file("merchant_tickets.json")
             self.kyc_data = self._load_data_from_file("kyc_data.json")
             self.payout_data = self._load_data_from_file("payout_data.json")
             self.transaction_data = self._load_data_from_file("transaction_data.json")
             self.notification_data = self._load_data_from_file("notification_data.json")
             self.dashboard_data = self._load_data_from_file("dashboard_data.json")
+            self.merchant_directory = self._load_directory_file()
+            self._compact_records()
+            self._build_indexes()
+            self._touch(*DATA_DOMAINS)
+            self.change_log.reset()
+            if self.audit:
+                # Files may have been edited outside the app; record what was loaded
+                self.audit.record_state(self.merchant_data["merchant_id"], self._audited_state())
             return True
         except Exception as e:
             print(f"❌ Error reloading data: {str(e)}")
@@ -0,0 +1,285 @@
+"""
+Data Snapshot for Cashfree AI Support Assistant
+Compact binary container for the JSON data files, with per-record offsets for lazy loading
+
+Usage:
+    python data_snapshot.py [data_folder] [snapshot_path]
+    python data_snapshot.py --benchmark [merchant_count]
+"""
+from typing import Dict, List, Any, Optional, Iterator
+from collections.abc import Sequence
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import serialization
+
+MAGIC = b"CFDS"
+FORMAT_VERSION = 1
+# magic, format version, section count
+HEADER = struct.Struct("<4sII")
+# name length, kind, source digest, offset, length
+SECTION = struct.Struct("<HB16sQQ")
+# record offset (relative to the section), record length
+RECORD_ENTRY = struct.Struct("<QI")
+COUNT = struct.Struct("<I")
+
+DOCUMENT_SECTION = 0
+RECORDS_SECTION = 1
+
+DATA_FILES = (
+    "merchant_data.json", "ticket_data.json", "merchant_tickets.json", "kyc_data.json", "payout_data.json",
+    "transaction_data.json", "notification_data.json", "dashboard_data.json", "merchants.json"
+)
+
+# Files holding one list of independent records, stored record by record: filename -> list key
+RECORD_FILES = {"merchants.json": "merchants"}
+
+
+def _digest(raw: bytes) -> bytes:
+    """Content digest used to tell whether a section still matches its JSON file"""
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _encode(value: Any) -> bytes:
+    """Serialize without the indentation and spacing of the source files"""
+    return serialization.dumps(value)
+
+
+class LazyRecords(Sequence):
+    """Records of one section, each decoded on first access and kept for later reads and edits"""
+
+    def __init__(self, buffer, base: int, count: int):
+        """
+        Wrap a records section
+
+        Args:
+            buffer: Mapped snapshot
+            base: Offset of the section
+            count: Number of records
+        """
+        self.buffer = buffer
+        self.base = base
+        self.count = count
+        self.decoded: List[Optional[Dict[str, Any]]] = [None] * count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("record index out of range")
+        record = self.decoded[index]
+        if record is None:
+            record = self._decode(index)
+            self.decoded[index] = record
+        return record
+
+    def _decode(self, index: int) -> Dict[str, Any]:
+        """Decode one record from the mapping"""
+        offset, length = RECORD_ENTRY.unpack_from(self.buffer, self.base + COUNT.size + index * RECORD_ENTRY.size)
+        start = self.base + offset
+        return serialization.loads(self.buffer[start:start + length])
+
+    def peek(self, index: int) -> Dict[str, Any]:
+        """Read a record without keeping it decoded, for one-pass scans such as exports"""
+        record = self.decoded[index]
+        return record if record is not None else self._decode(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.count):
+            yield self[index]
+
+    def decoded_count(self) -> int:
+        """Number of records decoded so far"""
+        return sum(1 for record in self.decoded if record is not None)
+
+
+class DataSnapshot:
+    """Read-only view of a snapshot file; sections are decoded only when loaded"""
+
+    def __init__(self, path: str):
+        """Map a snapshot file and read its section table"""
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, section_count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a data snapshot: {path}")
+
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        position = HEADER.size
+        for _ in range(section_count):
+            name_length, kind, digest, offset, length = SECTION.unpack_from(self.buffer, position)
+            position += SECTION.size
+            name = self.buffer[position:position + name_length].decode("utf-8")
+            position += name_length
+            self.sections[name] = {"kind": kind, "digest": digest, "offset": offset, "length": length}
+
+    def is_current(self, filename: str, raw: bytes) -> bool:
+        """Whether the snapshot holds a section built from exactly this file content"""
+        section = self.sections.get(filename)
+        return section is not None and section["digest"] == _digest(raw)
+
+    def load(self, filename: str) -> Dict[str, Any]:
+        """Load one file's data; list records of record files stay undecoded until accessed"""
+        section = self.sections[filename]
+        start = section["offset"]
+        if section["kind"] == DOCUMENT_SECTION:
+            return serialization.loads(self.buffer[start:start + section["length"]])
+        # The rest of the document is stored after the record index and blobs
+        (count,) = COUNT.unpack_from(self.buffer, start)
+        (rest_length,) = COUNT.unpack_from(self.buffer, start + section["length"] - COUNT.size)
+        rest_start = start + section["length"] - COUNT.size - rest_length
+        document = serialization.loads(self.buffer[rest_start:rest_start + rest_length])
+        document[RECORD_FILES[filename]] = LazyRecords(self.buffer, start, count)
+        return document
+
+
+def _records_section(document: Dict[str, Any], key: str) -> bytes:
+    """Encode a record file: count, offset index, record blobs, then the remaining document"""
+    blobs = [_encode(record) for record in document.get(key, [])]
+    rest = _encode({name: value for name, value in document.items() if name != key})
+    offset = COUNT.size + len(blobs) * RECORD_ENTRY.size
+    parts = [COUNT.pack(len(blobs))]
+    for blob in blobs:
+        parts.append(RECORD_ENTRY.pack(offset, len(blob)))
+        offset += len(blob)
+    parts.extend(blobs)
+    parts.append(rest)
+    parts.append(COUNT.pack(len(rest)))
+    return b"".join(parts)
+
+
+def convert(data_folder: str = "data", snapshot_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Convert the JSON data files into one snapshot file
+
+    Args:
+        data_folder: Folder holding the JSON files
+        snapshot_path: Output file, defaults to data.snapshot in the data folder
+
+    Returns:
+        Dictionary with the snapshot path, its size and the converted files
+    """
+    snapshot_path = snapshot_path or os.path.join(data_folder, "data.snapshot")
+    sections = []
+    for filename in DATA_FILES:
+        file_path = os.path.join(data_folder, filename)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        document = serialization.loads(raw)
+        if filename in RECORD_FILES:
+            body = _records_section(document, RECORD_FILES[filename])
+            kind = RECORDS_SECTION
+        else:
+            body = _encode(document)
+            kind = DOCUMENT_SECTION
+        sections.append((filename, kind, _digest(raw), body))
+
+    table_size = HEADER.size + sum(SECTION.size + len(name.encode("utf-8")) for name, _, _, _ in sections)
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        offset = table_size
+        for name, kind, digest, body in sections:
+            encoded_name = name.encode("utf-8")
+            f.write(SECTION.pack(len(encoded_name), kind, digest, offset, len(body)))
+            f.write(encoded_name)
+            offset += len(body)
+        for _, _, _, body in sections:
+            f.write(body)
+    os.replace(temp_path, snapshot_path)
+    return {
+        "snapshot_path": snapshot_path,
+        "bytes": os.path.getsize(snapshot_path),
+        "files": [name for name, _, _, _ in sections]
+    }
+
+
+def benchmark(merchant_count: int = 100000) -> Dict[str, Any]:
+    """
+    Compare cold-load time and resident memory of the JSON files and the snapshot
+
+    Writes a synthetic merchant directory of merchant_count records to a temporary data folder,
+    then loads it in fresh interpreters both ways.
+    """
+    import subprocess
+    import tempfile
+
+    folder = tempfile.mkdtemp(prefix="cashfree_snapshot_")
+    statuses = ["active", "on_hold", "frozen", "suspended"]
+    merchants = [{
+        "merchant_id": f"MERCH{index:09d}",
+        "business_name": f"Merchant {index} Pvt Ltd",
+        "account_status": statuses[index % len(statuses)],
+        "compliance_status": "pending" if index % 3 else "verified",
+        "risk_score": ["low", "medium", "high"][index % 3],
+        "last_activity": f"2024-01-{index % 28 + 1:02d}T10:30:00Z",
+        "pending_documents": ["PAN Card"] if index % 2 else [],
+        "uploaded_documents": ["GST Certificate"],
+        "rejected_documents": []
+    } for index in range(merchant_count)]
+    with open(os.path.join(folder, "merchants.json"), "w", encoding="utf-8") as f:
+        json.dump({"merchants": merchants}, f, indent=2, ensure_ascii=False)
+    del merchants
+    snapshot = convert(folder)
+
+    # Each measurement runs in a fresh interpreter so parse time and peak memory are cold
+    probe = (
+        "import json, resource, sys, time\n"
+        "sys.path.insert(0, {root!r})\n"
+        "from data_snapshot import DataSnapshot\n"
+        "started = time.perf_counter()\n"
+        "if {mode!r} == 'json':\n"
+        "    data = json.load(open({json_path!r}, encoding='utf-8'))\n"
+        "else:\n"
+        "    raw = open({json_path!r}, 'rb').read()\n"
+        "    snapshot = DataSnapshot({snapshot_path!r})\n"
+        "    assert snapshot.is_current('merchants.json', raw)\n"
+        "    del raw\n"
+        "    data = snapshot.load('merchants.json')\n"
+        "load_ms = (time.perf_counter() - started) * 1000\n"
+        "first = data['merchants'][{last}]['merchant_id']\n"
+        "try:\n"
+        "    rss_kb = int(next(line for line in open('/proc/self/status') if line.startswith('VmRSS')).split()[1])\n"
+        "except OSError:\n"
+        "    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(json.dumps({{'load_ms': load_ms, 'rss_kb': rss_kb}}))\n"
+    )
+    results = {}
+    for mode in ("json", "snapshot"):
+        code = probe.format(
+            root=os.path.dirname(os.path.abspath(__file__)),
+            mode=mode,
+            json_path=os.path.join(folder, "merchants.json"),
+            snapshot_path=snapshot["snapshot_path"],
+            last=merchant_count - 1
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        results[mode] = json.loads(output.stdout)
+
+    return {
+        "merchants": merchant_count,
+        "json_bytes": os.path.getsize(os.path.join(folder, "merchants.json")),
+        "snapshot_bytes": snapshot["bytes"],
+        "json": {key: round(value, 1) for key, value in results["json"].items()},
+        "snapshot": {key: round(value, 1) for key, value in results["snapshot"].items()},
+        "data_folder": folder
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        print(json.dumps(benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000), indent=2))
+    else:
+        result = convert(*sys.argv[1:3])
+        print(f"✅ Wrote {result['snapshot_path']} ({result['bytes']} bytes) from {', '.join(result['files'])}")
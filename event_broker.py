@@ -0,0 +1,144 @@
+"""
+Event Broker for Cashfree AI Support Assistant
+Per-merchant fan-out of typed update events to server-sent event streams
+"""
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+from collections import deque
+import threading
+
+# Events buffered per stream before a slow client is told to resync instead
+DEFAULT_MAX_PENDING = 100
+
+
+class Subscription:
+    """One open stream: a bounded buffer of events for a merchant, optionally limited to some types"""
+
+    def __init__(self, merchant_id: str, types: Optional[Set[str]], max_pending: int):
+        """Create an empty subscription"""
+        self.merchant_id = merchant_id
+        self.types = types
+        self.max_pending = max_pending
+        self.pending: deque = deque()
+        self.lagged = False
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """
+        Buffer an event without ever blocking the publisher
+
+        Returns:
+            False if the buffer was full; the buffer is then dropped and the stream marked lagged
+        """
+        with self.condition:
+            if len(self.pending) >= self.max_pending:
+                # The client resyncs from the change feed, so the backlog is no longer needed
+                self.pending.clear()
+                self.lagged = True
+                self.condition.notify()
+                return False
+            if not self.lagged:
+                self.pending.append(event)
+                self.condition.notify()
+            return True
+
+    def wait(self, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Wait up to timeout seconds for events
+
+        Returns:
+            Tuple of the buffered events and whether events were dropped since the last call
+        """
+        with self.condition:
+            if not self.pending and not self.lagged and not self.closed:
+                self.condition.wait(timeout)
+            events = list(self.pending)
+            self.pending.clear()
+            lagged, self.lagged = self.lagged, False
+            return events, lagged
+
+    def close(self) -> None:
+        """Wake the stream so it can finish"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+
+class EventBroker:
+    """
+    Topic per merchant; publishing copies the event into each subscriber's buffer
+
+    Publishers never wait on a stream. A stream whose buffer fills up loses its backlog
+    and is flagged, so one slow client costs at most max_pending events of memory.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        """Create a broker with no subscribers"""
+        self.max_pending = max(1, max_pending)
+        self.lock = threading.Lock()
+        self.topics: Dict[str, Set[Subscription]] = {}
+        self.stats = {"published": 0, "delivered": 0, "lagged": 0}
+
+    def subscribe(self, merchant_id: str, types: Optional[Iterable[str]] = None) -> Subscription:
+        """
+        Open a subscription to a merchant's events
+
+        Args:
+            merchant_id: Merchant whose events to receive
+            types: Only receive these event types; all types if empty
+        """
+        subscription = Subscription(merchant_id, set(types) if types else None, self.max_pending)
+        with self.lock:
+            self.topics.setdefault(merchant_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription and wake its stream"""
+        with self.lock:
+            subscribers = self.topics.get(subscription.merchant_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.topics[subscription.merchant_id]
+        subscription.close()
+
+    def publish(self, merchant_id: str, event_type: str, data: Any, event_id: str, seq: int) -> int:
+        """
+        Send an event to every subscriber of a merchant
+
+        Args:
+            merchant_id: Topic to publish to
+            event_type: Event name, e.g. ticket_updated
+            data: JSON-serializable payload
+            event_id: Change feed cursor just after this event
+            seq: Change feed sequence of this event
+
+        Returns:
+            Number of subscriptions the event was buffered for
+        """
+        with self.lock:
+            subscribers = list(self.topics.get(merchant_id, ()))
+            self.stats["published"] += 1
+        event = {"id": event_id, "seq": seq, "type": event_type, "data": data}
+        delivered = lagged = 0
+        for subscription in subscribers:
+            if subscription.types is not None and event_type not in subscription.types:
+                continue
+            if subscription.offer(event):
+                delivered += 1
+            else:
+                lagged += 1
+        with self.lock:
+            self.stats["delivered"] += delivered
+            self.stats["lagged"] += lagged
+        return delivered
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get open subscriptions, topics and delivery counts"""
+        with self.lock:
+            return {
+                "subscriptions": sum(len(subscribers) for subscribers in self.topics.values()),
+                "topics": len(self.topics),
+                "max_pending": self.max_pending,
+                **self.stats
+            }
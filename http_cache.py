@@ -0,0 +1,107 @@
+"""
+HTTP Response Cache for Cashfree AI Support Assistant
+Serialized, compressed response bodies reused until the data version behind them changes
+"""
+from typing import Dict, Any, Optional, Callable, Tuple
+import gzip
+import threading
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+# Smallest body worth compressing; below this the headers cost more than the savings
+DEFAULT_MIN_COMPRESS_BYTES = 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Returns:
+        "br" when brotli is installed and accepted, otherwise "gzip" if accepted, else None
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token.strip().lower()] = quality
+
+    def allowed(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with a negotiated encoding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    # Level 6 is the usual size/CPU balance for dynamic responses
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class ResponseCache:
+    """Latest serialized body per endpoint, with one compressed copy per encoding"""
+
+    def __init__(self, min_compress_bytes: int = DEFAULT_MIN_COMPRESS_BYTES):
+        """Create an empty cache"""
+        self.min_compress_bytes = min_compress_bytes
+        self.lock = threading.Lock()
+        # key -> (etag, {encoding or "identity": body})
+        self.entries: Dict[str, Tuple[str, Dict[str, bytes]]] = {}
+        self.stats = {"hits": 0, "builds": 0, "not_modified": 0}
+
+    def get_body(self, key: str, etag: str, encoding: Optional[str], build: Callable[[], bytes]) -> Tuple[bytes, Optional[str]]:
+        """
+        Get the body for an endpoint at a data version, building it only once per version
+
+        Args:
+            key: Endpoint name
+            etag: Data version the body must match
+            encoding: Negotiated content encoding, None for identity
+            build: Serializes the current data
+
+        Returns:
+            Tuple of the body and the content encoding actually applied
+        """
+        with self.lock:
+            cached = self.entries.get(key)
+            bodies = dict(cached[1]) if cached and cached[0] == etag else None
+
+        if bodies is None:
+            bodies = {"identity": build()}
+            self.stats["builds"] += 1
+        elif encoding is None or encoding in bodies or len(bodies["identity"]) < self.min_compress_bytes:
+            self.stats["hits"] += 1
+
+        applied = encoding if encoding and len(bodies["identity"]) >= self.min_compress_bytes else None
+        variant = applied or "identity"
+        if variant not in bodies:
+            bodies[variant] = compress(bodies["identity"], variant)
+        with self.lock:
+            # Only the latest version of each endpoint is kept
+            self.entries[key] = (etag, bodies)
+        return bodies[variant], applied
+
+    def record_not_modified(self) -> None:
+        """Count a conditional request answered with 304"""
+        with self.lock:
+            self.stats["not_modified"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit, build and 304 counts"""
+        with self.lock:
+            return {**self.stats, "entries": len(self.entries)}
@@ -0,0 +1,152 @@
+"""
+Background Job Queue for Cashfree AI Support Assistant
+Runs slow operations on worker threads and keeps pollable job status on local disk
+"""
+from typing import Dict, List, Any, Optional, Callable
+from datetime import datetime
+import json
+import os
+import queue
+import threading
+import uuid
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+# Finished jobs kept in memory; older records are still served from disk
+MAX_FINISHED_JOBS = 1000
+
+
+class JobQueue:
+    """In-process job queue with worker threads; job records are mirrored to a local directory"""
+
+    def __init__(self, workers: int = 2, store_dir: Optional[str] = None):
+        """
+        Start the worker threads
+
+        Args:
+            workers: Number of worker threads
+            store_dir: Directory for job records so any worker process on the host can report
+                status, None keeps records in memory only
+        """
+        self.store_dir = store_dir
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.finished: List[str] = []
+        self.tasks: "queue.Queue" = queue.Queue()
+        self.workers = []
+        for index in range(max(1, workers)):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def submit(self, job_type: str, fn: Callable[[Callable[[Dict[str, Any]], None]], Any],
+               params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Queue a job and return its record immediately
+
+        Args:
+            job_type: Name of the operation, reported back in the job record
+            fn: Work to run; called with a report(progress) callback and returns the job result
+            params: Request parameters, stored with the job for reference
+
+        Returns:
+            The queued job record
+        """
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "type": job_type,
+            "status": "queued",
+            "params": params or {},
+            "progress": None,
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+        with self.lock:
+            self.jobs[job["job_id"]] = job
+            self._persist(job)
+            snapshot = dict(job)
+        self.tasks.put((job["job_id"], fn))
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record by ID, from memory or the job store"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        return self._load(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List recent jobs held by this process, newest first"""
+        with self.lock:
+            jobs = [dict(job) for job in self.jobs.values() if status is None or job["status"] == status]
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        return jobs[:limit]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get job counts by status and the queue depth"""
+        with self.lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self.jobs.values():
+                counts[job["status"]] += 1
+        counts["queue_depth"] = self.tasks.qsize()
+        counts["workers"] = len(self.workers)
+        return counts
+
+    def _work(self) -> None:
+        """Worker loop: run queued jobs one at a time"""
+        while True:
+            job_id, fn = self.tasks.get()
+            self._update(job_id, status="running", started_at=datetime.now().isoformat())
+            try:
+                result = fn(lambda progress: self._update(job_id, progress=progress))
+                self._update(job_id, status="completed", result=result, finished_at=datetime.now().isoformat())
+            except Exception as e:
+                self._update(job_id, status="failed", error=str(e), finished_at=datetime.now().isoformat())
+            finally:
+                self.tasks.task_done()
+
+    def _update(self, job_id: str, **fields) -> None:
+        """Update a job record and mirror it to the job store"""
+        with self.lock:
+            job = self.jobs[job_id]
+            job.update(fields)
+            self._persist(job)
+            if job["status"] in ("completed", "failed"):
+                self.finished.append(job_id)
+                if len(self.finished) > MAX_FINISHED_JOBS:
+                    self.jobs.pop(self.finished.pop(0), None)
+
+    def _path(self, job_id: str) -> str:
+        """Path of a job record in the job store"""
+        return os.path.join(self.store_dir, f"{job_id}.json")
+
+    def _persist(self, job: Dict[str, Any]) -> None:
+        """Write a job record to the job store, replacing the previous version atomically"""
+        if not self.store_dir:
+            return
+        try:
+            temp_path = self._path(job["job_id"]) + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False, default=str)
+            os.replace(temp_path, self._path(job["job_id"]))
+        except Exception as e:
+            print(f"⚠️  Warning: Could not save job {job['job_id']}: {str(e)}")
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Read a job record from the job store"""
+        if not self.store_dir or not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Warning: Could not read job {job_id}: {str(e)}")
+            return None
@@ -0,0 +1,235 @@
+"""
+Knowledge Base for Cashfree AI Support Assistant
+Curated FAQ answers filled in with live merchant data, served without calling the model
+"""
+from typing import Dict, List, Any, Optional
+import math
+from ticket_index import tokenize
+
+# Each entry is matched against its example questions and answered from one data accessor
+KB_ENTRIES = [
+    {
+        "id": "kyc_upload",
+        "category": "kyc_compliance",
+        "questions": [
+            "how do I upload kyc documents",
+            "how to submit documents for kyc verification",
+            "where do I upload pan card address proof business proof"
+        ],
+        "source": "get_kyc_status",
+        "template": """📤 **Uploading KYC Documents**
+
+Your verification is {verification_progress}% complete.
+- Still needed: {pending_documents}
+- Already uploaded: {uploaded_documents}
+
+**Steps:**
+1. Open the merchant portal and go to Account Settings → KYC
+2. Select the document type and upload a clear colour scan (PDF/JPG, under 2 MB)
+3. Submit and wait for the review, usually 3-5 business days
+4. Re-upload any rejected document from the same page"""
+    },
+    {
+        "id": "kyc_status",
+        "category": "kyc_compliance",
+        "questions": [
+            "what is my kyc status",
+            "check kyc verification progress",
+            "which kyc documents are pending rejected"
+        ],
+        "source": "get_kyc_status",
+        "template": """🪪 **KYC Status**
+
+- KYC status: {kyc_status} ({kyc_level} level)
+- Verification progress: {verification_progress}%
+- Pending documents: {pending_documents}
+- Verified documents: {verified_documents}
+- Rejected documents: {rejected_documents}
+
+Upload pending or rejected documents from Account Settings → KYC to continue verification."""
+    },
+    {
+        "id": "payout_schedule",
+        "category": "payout_issue",
+        "questions": [
+            "when is my next settlement",
+            "what is my payout schedule",
+            "when was my last payout"
+        ],
+        "source": "get_payout_info",
+        "template": """💸 **Payout Schedule**
+
+- Schedule: {payout_schedule}
+- Last payout: {last_payout}
+- Next settlement: {next_settlement}
+- Pending payouts: {pending_payouts}
+
+Settlements follow your {payout_schedule} cycle on business days. If a payout is late by more than one business day, verify your bank details and raise a ticket."""
+    },
+    {
+        "id": "transaction_limits",
+        "category": "transaction_limit",
+        "questions": [
+            "what is my transaction limit",
+            "show my daily monthly limit and usage",
+            "how much of my limit have I used"
+        ],
+        "source": "get_transaction_limits",
+        "template": """📈 **Transaction Limits**
+
+- Per-transaction limit: ₹{transaction_limit}
+- Daily limit: ₹{daily_limit}
+- Monthly limit: ₹{monthly_limit}
+- Current usage: ₹{current_usage} ({limit_utilization}% utilised)
+
+To raise a limit, submit a limit increase request with recent business proof from the merchant portal."""
+    },
+    {
+        "id": "open_tickets",
+        "category": "support_ticket",
+        "questions": [
+            "show my open tickets",
+            "how many support tickets do I have",
+            "list my ticket status"
+        ],
+        "source": "get_support_tickets",
+        "template": """🧾 **Support Tickets**
+
+- Open tickets: {open_tickets}
+- Resolved tickets: {resolved_tickets}
+- Total tickets: {total_tickets}
+- Average resolution time: {average_resolution_time}
+
+Track or update any ticket from the support portal."""
+    },
+    {
+        "id": "notification_settings",
+        "category": "notification",
+        "questions": [
+            "how do I change notification preferences",
+            "enable email whatsapp sms alerts",
+            "turn on notification settings"
+        ],
+        "source": "get_notification_preferences",
+        "template": """📩 **Notification Preferences**
+
+Go to Account Settings → Notifications and toggle each alert per channel (email, WhatsApp, SMS). Changes apply immediately.
+
+Current email alerts: {email_notifications}
+Current WhatsApp alerts: {whatsapp_notifications}
+Current SMS alerts: {sms_notifications}"""
+    },
+    {
+        "id": "account_status",
+        "category": "account_hold",
+        "questions": [
+            "what is my account status",
+            "check my account compliance status",
+            "is my account active"
+        ],
+        "source": "get_account_status",
+        "template": """🔐 **Account Status**
+
+- Account status: {account_status}
+- Compliance status: {compliance_status}
+- Risk score: {risk_score}
+- Last activity: {last_activity}
+
+If your account is on hold, complete pending compliance items and contact support with merchant ID {merchant_id}."""
+    }
+]
+
+
+def _format_value(value: Any) -> str:
+    """Render a merchant data value for an answer template"""
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value) or "none"
+    if isinstance(value, dict):
+        enabled = [key.replace("_", " ") for key, flag in value.items() if flag]
+        return ", ".join(enabled) or "none"
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"{value:,}"
+    return str(value)
+
+
+class _DefaultDict(dict):
+    """Template context that renders missing fields as n/a"""
+
+    def __missing__(self, key: str) -> str:
+        return "n/a"
+
+
+class KnowledgeBase:
+    """Matches FAQ-style queries to curated answers using idf-weighted term coverage"""
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None):
+        """Index the example questions of every entry"""
+        self.entries = entries if entries is not None else KB_ENTRIES
+        self.entry_terms = [
+            set(tokenize(" ".join(entry["questions"]))) for entry in self.entries
+        ]
+        document_frequency: Dict[str, int] = {}
+        for terms in self.entry_terms:
+            for term in terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        count = len(self.entries)
+        self.idf = {term: math.log(1 + count / frequency) for term, frequency in document_frequency.items()}
+        # Words no entry knows about weigh as much as the rarest known word
+        self.unknown_idf = math.log(1 + count)
+
+    def match(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the best entry for a query
+
+        Returns:
+            Dictionary with the entry and its confidence (0-1), or None when nothing matches
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return None
+        total_weight = sum(self.idf.get(term, self.unknown_idf) for term in terms)
+
+        scored = []
+        for entry, entry_terms in zip(self.entries, self.entry_terms):
+            matched = sum(self.idf[term] for term in terms & entry_terms)
+            if matched:
+                scored.append((matched / total_weight, entry))
+        if not scored:
+            return None
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        confidence, entry = scored[0]
+        # A near tie between entries is ambiguous
+        if len(scored) > 1 and scored[1][0] >= confidence * 0.9:
+            confidence *= 0.5
+        return {"entry": entry, "confidence": round(confidence, 3)}
+
+    def answer(self, query: str, data_manager, threshold: float,
+               merchant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Answer a query locally when the best match clears the confidence threshold
+
+        Args:
+            query: Merchant query
+            data_manager: The MerchantDataManager the API updates; templates are filled from it
+                on every call, so answers follow uploads and ticket changes immediately
+            threshold: Minimum confidence to answer
+            merchant_id: Merchant asking, whose own records fill the template; the primary merchant if None.
+                No answer is given when the data manager holds none of that merchant's data for the entry
+        """
+        match = self.match(query)
+        if match is None or match["confidence"] < threshold:
+            return None
+
+        entry = match["entry"]
+        merchant_data = data_manager.get_data_for_merchant(entry["source"], merchant_id)
+        if merchant_data is None:
+            return None
+        context = {key: _format_value(value) for key, value in merchant_data.items()}
+        return {
+            "kb_id": entry["id"],
+            "category": entry["category"],
+            "confidence": match["confidence"],
+            "response": entry["template"].format_map(_DefaultDict(context)),
+            "merchant_data": merchant_data
+        }
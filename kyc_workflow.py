@@ -0,0 +1,136 @@
+"""
+KYC Workflow for Cashfree AI Support Assistant
+Tracks each KYC document as a state machine with incrementally maintained progress
+"""
+from typing import Dict, List, Any, Optional, Set
+
+# Document states and the transitions allowed between them
+DOCUMENT_STATES = ("pending", "uploaded", "verified", "rejected")
+ALLOWED_TRANSITIONS = {
+    "pending": {"uploaded"},
+    "uploaded": {"verified", "rejected"},
+    "rejected": {"uploaded"},
+    "verified": set()
+}
+
+# kyc_data.json list field for each state
+STATE_FIELDS = {
+    "pending": "pending_documents",
+    "uploaded": "uploaded_documents",
+    "verified": "verified_documents",
+    "rejected": "rejected_documents"
+}
+
+
+class KYCWorkflow:
+    """Per-merchant KYC document state machines with O(1) membership and progress"""
+
+    def __init__(self):
+        """Initialize an empty workflow"""
+        # merchant_id -> document_type -> state (insertion ordered)
+        self.documents: Dict[str, Dict[str, str]] = {}
+        # merchant_id -> state -> document types in that state
+        self.state_sets: Dict[str, Dict[str, Set[str]]] = {}
+
+    def load_merchant(self, merchant_id: str, kyc_data: Dict[str, Any]) -> None:
+        """Load a merchant's documents from the kyc_data.json list fields"""
+        self.documents[merchant_id] = {}
+        self.state_sets[merchant_id] = {state: set() for state in DOCUMENT_STATES}
+        # Later states win when a document appears in more than one list
+        for state in DOCUMENT_STATES:
+            for document_type in kyc_data.get(STATE_FIELDS[state], []):
+                self._set_state(merchant_id, document_type, state)
+
+    def has_merchant(self, merchant_id: str) -> bool:
+        """Check whether a merchant is tracked"""
+        return merchant_id in self.documents
+
+    def _set_state(self, merchant_id: str, document_type: str, state: str) -> None:
+        """Move a document into a state, keeping the state sets in sync"""
+        documents = self.documents[merchant_id]
+        old_state = documents.get(document_type)
+        if old_state is not None:
+            self.state_sets[merchant_id][old_state].discard(document_type)
+        documents[document_type] = state
+        self.state_sets[merchant_id][state].add(document_type)
+
+    def get_state(self, merchant_id: str, document_type: str) -> Optional[str]:
+        """Get the current state of a document"""
+        return self.documents.get(merchant_id, {}).get(document_type)
+
+    def require_document(self, merchant_id: str, document_type: str) -> bool:
+        """Add a new required document in the pending state"""
+        if document_type in self.documents[merchant_id]:
+            return False
+        self._set_state(merchant_id, document_type, "pending")
+        return True
+
+    def transition(self, merchant_id: str, document_type: str, new_state: str) -> Optional[str]:
+        """
+        Move a document to a new state
+
+        Args:
+            merchant_id: Merchant owning the document
+            document_type: Document name, e.g. "PAN Card"
+            new_state: Target state
+
+        Returns:
+            None on success, otherwise the reason the transition was refused
+        """
+        if merchant_id not in self.documents:
+            return "Merchant not found"
+        if new_state not in ALLOWED_TRANSITIONS:
+            return f"Unknown document status: {new_state}"
+        old_state = self.documents[merchant_id].get(document_type)
+        # Documents that were never requested can still be uploaded directly
+        if old_state is None and new_state == "uploaded":
+            self._set_state(merchant_id, document_type, new_state)
+            return None
+        if old_state is None:
+            return f"Document not found: {document_type}"
+        if new_state not in ALLOWED_TRANSITIONS[old_state]:
+            return f"Cannot move {document_type} from {old_state} to {new_state}"
+        self._set_state(merchant_id, document_type, new_state)
+        return None
+
+    def bulk_transition(self, verdicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply many document verdicts, collecting failures instead of stopping"""
+        applied = []
+        failed = []
+        for verdict in verdicts:
+            merchant_id = verdict.get("merchant_id")
+            document_type = verdict.get("document_type")
+            status = verdict.get("status")
+            error = self.transition(merchant_id, document_type, status)
+            if error:
+                failed.append({**verdict, "error": error})
+            else:
+                applied.append(verdict)
+        return {"applied": applied, "failed": failed}
+
+    def get_progress(self, merchant_id: str) -> int:
+        """Percentage of documents submitted (uploaded or verified)"""
+        states = self.state_sets[merchant_id]
+        total = len(self.documents[merchant_id])
+        if not total:
+            return 0
+        return int(((len(states["uploaded"]) + len(states["verified"])) / total) * 100)
+
+    def get_kyc_status(self, merchant_id: str) -> str:
+        """Derived overall KYC status for a merchant"""
+        documents = self.documents[merchant_id]
+        if documents and len(self.state_sets[merchant_id]["verified"]) == len(documents):
+            return "verified"
+        return "pending"
+
+    def get_pending_count(self, merchant_id: str) -> int:
+        """Number of documents still to be uploaded, including rejected ones"""
+        states = self.state_sets[merchant_id]
+        return len(states["pending"]) + len(states["rejected"])
+
+    def to_lists(self, merchant_id: str) -> Dict[str, List[str]]:
+        """Export a merchant's documents as kyc_data.json list fields"""
+        lists: Dict[str, List[str]] = {field: [] for field in STATE_FIELDS.values()}
+        for document_type, state in self.documents[merchant_id].items():
+            lists[STATE_FIELDS[state]].append(document_type)
+        return lists
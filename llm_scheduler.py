@@ -0,0 +1,161 @@
+"""
+LLM Scheduler for Cashfree AI Support Assistant
+Priority-aware, weighted fair queueing of model calls across merchants
+"""
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+import heapq
+import itertools
+import threading
+import time
+
+# Served strictly in this order; merchants share each level by weighted fair queueing
+PRIORITIES = ("high", "medium", "low")
+
+
+class SchedulerBusy(Exception):
+    """Raised when deferrable work could not get a model call slot in time"""
+
+
+class FairScheduler:
+    """Limits concurrent model calls and grants free slots by priority, then in weighted fair order"""
+
+    def __init__(self, max_concurrency: int, reserved_high: int = 0):
+        """
+        Create a scheduler with a fixed number of model call slots
+
+        Args:
+            max_concurrency: Total model calls allowed at once
+            reserved_high: Slots only high-priority calls may use, so escalations never wait
+                behind routine queries
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_high = min(max(0, reserved_high), self.max_concurrency - 1)
+        self.condition = threading.Condition()
+        self.active = 0
+        # Virtual clock: advances to the finish tag of each granted request
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        # Per priority: (finish tag, arrival order, ticket) of requests waiting for a slot
+        self.waiting: Dict[str, list] = {priority: [] for priority in PRIORITIES}
+        self.arrivals = itertools.count()
+        self.granted = 0
+        self.queued = 0
+        self.priority_stats: Dict[str, Dict[str, float]] = {
+            priority: {"waiting": 0, "granted": 0, "queued": 0, "degraded": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+            for priority in PRIORITIES
+        }
+
+    def _finish_tag(self, merchant_id: str, weight: float) -> float:
+        """Virtual finish time of a new request; heavy users drift later"""
+        start = max(self.virtual_time, self.last_finish.get(merchant_id, 0.0))
+        finish = start + 1.0 / weight
+        self.last_finish[merchant_id] = finish
+        if len(self.last_finish) > 10000:
+            # Merchants behind the virtual clock start from it anyway
+            self.last_finish = {
+                key: value for key, value in self.last_finish.items() if value > self.virtual_time
+            }
+        return finish
+
+    def _has_free_slot(self, priority: str) -> bool:
+        """Whether a call of this priority may start now; reserved slots are kept for high priority"""
+        limit = self.max_concurrency if priority == "high" else self.max_concurrency - self.reserved_high
+        return self.active < limit
+
+    def _has_waiting(self, priority: str) -> bool:
+        """Whether calls of this priority or a more urgent one are queued"""
+        return any(self.priority_stats[level]["waiting"] for level in PRIORITIES[:PRIORITIES.index(priority) + 1])
+
+    @contextmanager
+    def slot(self, merchant_id: str, weight: float = 1.0, priority: str = "medium", max_wait: Optional[float] = None):
+        """
+        Hold one model call slot for the duration of the block
+
+        Args:
+            merchant_id: Merchant the call is made for
+            weight: Relative share of model concurrency for this merchant
+            priority: "high", "medium" or "low"
+            max_wait: Seconds to wait for a slot before giving up with SchedulerBusy,
+                None waits indefinitely
+
+        Raises:
+            SchedulerBusy: No slot became free within max_wait
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        stats = self.priority_stats[priority]
+        requested = time.perf_counter()
+        with self.condition:
+            ticket = {"granted": False, "cancelled": False}
+            if self._has_free_slot(priority) and not self._has_waiting(priority):
+                finish = self._finish_tag(merchant_id, weight)
+                self.active += 1
+                self.virtual_time = max(self.virtual_time, finish)
+            elif max_wait is not None and max_wait <= 0:
+                stats["degraded"] += 1
+                raise SchedulerBusy(f"No model slot free for {priority} priority work")
+            else:
+                finish = self._finish_tag(merchant_id, weight)
+                self.queued += 1
+                stats["queued"] += 1
+                stats["waiting"] += 1
+                heapq.heappush(self.waiting[priority], (finish, next(self.arrivals), ticket))
+                deadline = None if max_wait is None else requested + max_wait
+                while not ticket["granted"]:
+                    remaining = None if deadline is None else deadline - time.perf_counter()
+                    if remaining is not None and remaining <= 0:
+                        # Left in the heap and skipped when popped
+                        ticket["cancelled"] = True
+                        stats["waiting"] -= 1
+                        stats["degraded"] += 1
+                        raise SchedulerBusy(f"No model slot free for {priority} priority work within {max_wait}s")
+                    self.condition.wait(remaining)
+            self.granted += 1
+            wait_ms = (time.perf_counter() - requested) * 1000
+            stats["granted"] += 1
+            stats["total_wait_ms"] += wait_ms
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self._grant_next()
+
+    def _grant_next(self) -> None:
+        """Hand free slots to waiting requests, most urgent priority first, smallest finish tag within it"""
+        for priority in PRIORITIES:
+            queue = self.waiting[priority]
+            while queue and self._has_free_slot(priority):
+                finish, _, ticket = heapq.heappop(queue)
+                if ticket["cancelled"]:
+                    continue
+                ticket["granted"] = True
+                self.priority_stats[priority]["waiting"] -= 1
+                self.active += 1
+                self.virtual_time = max(self.virtual_time, finish)
+        self.condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current concurrency, queue depth and per-priority queue metrics"""
+        with self.condition:
+            priorities = {}
+            for priority, stats in self.priority_stats.items():
+                priorities[priority] = {
+                    "waiting": stats["waiting"],
+                    "granted": stats["granted"],
+                    "queued": stats["queued"],
+                    "degraded": stats["degraded"],
+                    "avg_wait_ms": round(stats["total_wait_ms"] / stats["granted"], 2) if stats["granted"] else 0.0,
+                    "max_wait_ms": round(stats["max_wait_ms"], 2)
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "reserved_high": self.reserved_high,
+                "active": self.active,
+                "waiting": sum(stats["waiting"] for stats in self.priority_stats.values()),
+                "granted": self.granted,
+                "queued": self.queued,
+                "priorities": priorities
+            }
@@ -0,0 +1,258 @@
+"""
+Merchant Query Engine for Cashfree AI Support Assistant
+Bitmap and sorted secondary indexes over merchant attributes for admin filtering
+"""
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+from datetime import datetime, timedelta, timezone
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+import math
+
+# Ordinal ranking used for risk_score range filters
+RISK_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+# Attributes indexed for equality filters
+BITMAP_FIELDS = ("account_status", "compliance_status", "risk_score", "pending_kyc")
+
+# Maps every non-zero byte to 1 so bytes.find can skip empty regions at C speed
+_NONZERO_BYTES = bytes([0] + [1] * 255)
+
+
+def parse_timestamp(value: Optional[str]) -> int:
+    """Convert an ISO timestamp or date to epoch seconds (0 when missing)"""
+    if not value:
+        return 0
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+class BitmapIndex:
+    """Equality index: one bitmap of row ids per distinct value"""
+
+    def __init__(self):
+        """Initialize an empty bitmap index"""
+        self.bitmaps: Dict[Any, bytearray] = {}
+
+    def add(self, row_id: int, value: Any) -> None:
+        """Set the row's bit in the value's bitmap"""
+        bitmap = self.bitmaps.setdefault(value, bytearray())
+        byte = row_id >> 3
+        if byte >= len(bitmap):
+            bitmap.extend(bytes(max(byte + 1 - len(bitmap), len(bitmap))))
+        bitmap[byte] |= 1 << (row_id & 7)
+
+    def remove(self, row_id: int, value: Any) -> None:
+        """Clear the row's bit in the value's bitmap"""
+        bitmap = self.bitmaps.get(value)
+        if bitmap is not None and (row_id >> 3) < len(bitmap):
+            bitmap[row_id >> 3] &= ~(1 << (row_id & 7)) & 0xFF
+
+    def lookup(self, values: List[Any]) -> int:
+        """Bitmap (as an int) of rows matching any of the values"""
+        result = 0
+        for value in values:
+            bitmap = self.bitmaps.get(value)
+            if bitmap:
+                result |= int.from_bytes(bitmap, "little")
+        return result
+
+
+class SortedIndex:
+    """Range index: (key, row_id) entries kept in sorted order"""
+
+    def __init__(self):
+        """Initialize an empty sorted index"""
+        self.entries: List[Tuple[Any, int]] = []
+
+    def load(self, entries: List[Tuple[Any, int]]) -> None:
+        """Bulk load (key, row_id) pairs with a single sort"""
+        self.entries.extend(entries)
+        self.entries.sort()
+
+    def add(self, row_id: int, key: Any) -> None:
+        """Insert a row under its key"""
+        insort(self.entries, (key, row_id))
+
+    def remove(self, row_id: int, key: Any) -> None:
+        """Remove a row from under its key"""
+        position = bisect_left(self.entries, (key, row_id))
+        if position < len(self.entries) and self.entries[position] == (key, row_id):
+            del self.entries[position]
+
+    def range(self, low: Any = None, high: Any = None, universe: int = 0) -> int:
+        """
+        Bitmap (as an int) of rows with low <= key <= high
+
+        When the range covers most of the index and the bitmap of all rows is given,
+        the rows outside the range are collected instead and subtracted from it.
+        """
+        start = 0 if low is None else bisect_left(self.entries, (low, -1))
+        end = len(self.entries) if high is None else bisect_right(self.entries, (high, math.inf))
+        if start >= end:
+            return 0
+        if universe and (end - start) * 2 > len(self.entries):
+            outside = self._to_bitmap(islice(self.entries, 0, start))
+            outside |= self._to_bitmap(islice(self.entries, end, None))
+            return universe & ~outside
+        return self._to_bitmap(islice(self.entries, start, end))
+
+    @staticmethod
+    def _to_bitmap(entries) -> int:
+        """Set one bit per entry's row id"""
+        bitmap = bytearray()
+        for _, row_id in entries:
+            byte = row_id >> 3
+            if byte >= len(bitmap):
+                bitmap.extend(bytes(byte + 1 - len(bitmap)))
+            bitmap[byte] |= 1 << (row_id & 7)
+        return int.from_bytes(bitmap, "little")
+
+
+class MerchantQueryEngine:
+    """Secondary indexes over merchant records with equality, range and paginated queries"""
+
+    def __init__(self):
+        """Initialize empty indexes"""
+        self.row_merchants: List[Optional[str]] = []
+        self.merchant_rows: Dict[str, int] = {}
+        # row id -> indexed values, so an update can remove its old entries
+        self.row_values: Dict[int, Tuple[Dict[str, Any], int, int]] = {}
+        self.live = BitmapIndex()
+        self.bitmaps = {field: BitmapIndex() for field in BITMAP_FIELDS}
+        self.risk_index = SortedIndex()
+        self.activity_index = SortedIndex()
+
+    def __len__(self) -> int:
+        """Number of indexed merchants"""
+        return len(self.merchant_rows)
+
+    def upsert(self, merchant_id: str, record: Dict[str, Any]) -> None:
+        """Index a merchant record, replacing any previous entries for it"""
+        row_id, risk, activity = self._index_row(merchant_id, record)
+        self.risk_index.add(row_id, risk)
+        self.activity_index.add(row_id, activity)
+
+    def bulk_load(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Index many new merchant records, sorting each range index once"""
+        risk_entries = []
+        activity_entries = []
+        for merchant_id, record in records:
+            if merchant_id in self.merchant_rows:
+                self.upsert(merchant_id, record)
+                continue
+            row_id, risk, activity = self._index_row(merchant_id, record)
+            risk_entries.append((risk, row_id))
+            activity_entries.append((activity, row_id))
+        self.risk_index.load(risk_entries)
+        self.activity_index.load(activity_entries)
+
+    def _index_row(self, merchant_id: str, record: Dict[str, Any]) -> Tuple[int, int, int]:
+        """Assign a row and update the bitmap indexes, returning the range keys"""
+        row_id = self.merchant_rows.get(merchant_id)
+        if row_id is None:
+            row_id = len(self.row_merchants)
+            self.row_merchants.append(merchant_id)
+            self.merchant_rows[merchant_id] = row_id
+            self.live.add(row_id, True)
+        else:
+            self._unindex(row_id)
+
+        values = {
+            "account_status": record.get("account_status"),
+            "compliance_status": record.get("compliance_status"),
+            "risk_score": record.get("risk_score"),
+            "pending_kyc": record.get("pending_kyc_documents", 0) > 0
+        }
+        risk = RISK_LEVELS.get(record.get("risk_score"), -1)
+        activity = parse_timestamp(record.get("last_activity"))
+
+        for field, value in values.items():
+            self.bitmaps[field].add(row_id, value)
+        self.row_values[row_id] = (values, risk, activity)
+        return row_id, risk, activity
+
+    def remove(self, merchant_id: str) -> None:
+        """Drop a merchant from every index"""
+        row_id = self.merchant_rows.pop(merchant_id, None)
+        if row_id is None:
+            return
+        self._unindex(row_id)
+        del self.row_values[row_id]
+        self.live.remove(row_id, True)
+        self.row_merchants[row_id] = None
+
+    def _unindex(self, row_id: int) -> None:
+        """Remove a row's current values from the attribute indexes"""
+        values, risk, activity = self.row_values[row_id]
+        for field, value in values.items():
+            self.bitmaps[field].remove(row_id, value)
+        self.risk_index.remove(row_id, risk)
+        self.activity_index.remove(row_id, activity)
+
+    def _filter_bitmap(self, filters: Dict[str, Any]) -> int:
+        """AND together the bitmaps for every filter predicate"""
+        live = self.live.lookup([True])
+        result = live
+        for field, wanted in filters.items():
+            if wanted is None:
+                continue
+            if field in ("account_status", "compliance_status", "risk_score"):
+                result &= self.bitmaps[field].lookup(wanted if isinstance(wanted, list) else [wanted])
+            elif field == "pending_kyc":
+                result &= self.bitmaps["pending_kyc"].lookup([bool(wanted)])
+            elif field == "risk_score_min":
+                result &= self.risk_index.range(low=RISK_LEVELS[wanted], universe=live)
+            elif field == "risk_score_max":
+                result &= self.risk_index.range(high=RISK_LEVELS[wanted], universe=live)
+            elif field == "last_activity_after":
+                result &= self.activity_index.range(low=parse_timestamp(wanted), universe=live)
+            elif field == "last_activity_before":
+                result &= self.activity_index.range(high=parse_timestamp(wanted), universe=live)
+            elif field == "inactive_days":
+                cutoff = datetime.now(timezone.utc) - timedelta(days=int(wanted))
+                result &= self.activity_index.range(high=int(cutoff.timestamp()), universe=live)
+            else:
+                raise ValueError(f"Unknown filter: {field}")
+            if not result:
+                break
+        return result
+
+    def query(self, filters: Dict[str, Any], limit: Optional[int] = None, cursor: int = 0) -> Dict[str, Any]:
+        """
+        Find merchants matching all filters
+
+        Args:
+            filters: Equality filters (account_status, compliance_status, risk_score, pending_kyc;
+                a value or list of values) and range filters (risk_score_min, risk_score_max,
+                last_activity_after, last_activity_before, inactive_days)
+            limit: Page size, or None for every match
+            cursor: Row position to resume from, taken from a previous page's next_cursor
+
+        Returns:
+            Dictionary with merchant_ids for the page, total matches and next_cursor
+        """
+        result = self._filter_bitmap(filters)
+        total = result.bit_count()
+        if cursor:
+            result &= ~((1 << cursor) - 1)
+
+        data = result.to_bytes((result.bit_length() + 7) // 8, "little")
+        nonzero = data.translate(_NONZERO_BYTES)
+        merchant_ids: List[str] = []
+        next_cursor = None
+        position = nonzero.find(1)
+        while position != -1:
+            byte = data[position]
+            for bit in range(8):
+                if byte & (1 << bit):
+                    if limit is not None and len(merchant_ids) >= limit:
+                        next_cursor = position * 8 + bit
+                        break
+                    merchant_ids.append(self.row_merchants[position * 8 + bit])
+            if next_cursor is not None:
+                break
+            position = nonzero.find(1, position + 1)
+
+        return {"merchant_ids": merchant_ids, "total": total, "next_cursor": next_cursor}
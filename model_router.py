@@ -0,0 +1,258 @@
+"""
+Model Router for Cashfree AI Support Assistant
+Picks the model, token budget and temperature of each call: triage stays local or on a small model, answers go to the main model
+
+Usage:
+    python model_router.py --benchmark [--live] [--time-scale 0.1]
+"""
+from typing import Dict, List, Any, Optional, Callable, Tuple
+import threading
+from config import Config
+
+TRIAGE_MODES = ("local", "model", "main")
+
+# Rough characters per token, for estimating usage of calls whose responses carry no token counts
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """USD cost of a call at MODEL_PRICES, 0 for unpriced models"""
+    input_price, output_price = Config.MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1e6
+
+
+class ModelRouter:
+    """Resolves per-category profiles to model clients and accounts calls, latency and cost per route"""
+
+    def __init__(self, create_model: Callable[[Dict[str, Any]], Any],
+                 profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+                 triage_mode: Optional[str] = None, triage_profile: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            create_model: Builds a chat model from a profile (model, max_tokens, temperature)
+            profiles: Category -> profile overrides, with a "default" profile; Config.MODEL_PROFILES if None
+            triage_mode: "local", "model" or "main"; Config.TRIAGE_MODE if None
+            triage_profile: Profile of the triage model; Config.TRIAGE_PROFILE if None
+        """
+        self.create_model = create_model
+        self.profiles = profiles if profiles is not None else Config.MODEL_PROFILES
+        self.triage_mode = triage_mode or Config.TRIAGE_MODE
+        if self.triage_mode not in TRIAGE_MODES:
+            print(f"⚠️  Warning: Unknown triage mode {self.triage_mode}. Using local.")
+            self.triage_mode = "local"
+        self._triage_profile = triage_profile or Config.TRIAGE_PROFILE
+        self.lock = threading.Lock()
+        # (model, max_tokens, temperature, schema) -> client, created on first use
+        self.models: Dict[Tuple, Any] = {}
+        self.routes: Dict[str, Dict[str, Any]] = {}
+
+    def profile(self, category: Optional[str] = None) -> Dict[str, Any]:
+        """Answer profile of a category: the default profile with the category's overrides"""
+        return {**self.profiles["default"], **self.profiles.get(category or "", {})}
+
+    def triage_profile(self) -> Optional[Dict[str, Any]]:
+        """Profile triage calls use, or None when triage runs locally"""
+        if self.triage_mode == "local":
+            return None
+        if self.triage_mode == "main":
+            return self.profile()
+        return {**self.profiles["default"], **self._triage_profile}
+
+    def model(self, profile: Dict[str, Any], schema: Optional[type] = None) -> Any:
+        """Chat model client for a profile, constrained to a schema if given"""
+        key = (profile["model"], profile["max_tokens"], profile["temperature"], schema.__name__ if schema else None)
+        with self.lock:
+            client = self.models.get(key)
+        if client is None:
+            client = self.create_model(profile)
+            if schema is not None:
+                client = client.with_structured_output(schema)
+            with self.lock:
+                client = self.models.setdefault(key, client)
+        return client
+
+    def record(self, route: str, profile: Optional[Dict[str, Any]], seconds: float,
+               prompt: str = "", output: str = "") -> None:
+        """
+        Account one triage or answer, made locally when profile is None
+
+        Args:
+            route: "triage", "answer", "answer_with_analysis", "scenario" or "summary"
+            profile: Profile of the model called
+            seconds: Time the call took
+            prompt: Text sent, for the token estimate
+            output: Text received, for the token estimate
+        """
+        model = profile["model"] if profile else "local"
+        input_tokens = estimate_tokens(prompt) if profile else 0
+        output_tokens = estimate_tokens(output) if profile else 0
+        with self.lock:
+            stats = self.routes.setdefault(route, {}).setdefault(model, {
+                "calls": 0, "total_seconds": 0.0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0
+            })
+            stats["calls"] += 1
+            stats["total_seconds"] += seconds
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["cost_usd"] += estimate_cost(model, input_tokens, output_tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calls, average latency, estimated tokens and cost per route and model"""
+        with self.lock:
+            routes = {
+                route: {
+                    model: {
+                        "calls": stats["calls"],
+                        "avg_latency_ms": round(stats["total_seconds"] / stats["calls"] * 1000, 2),
+                        "input_tokens": stats["input_tokens"],
+                        "output_tokens": stats["output_tokens"],
+                        "cost_usd": round(stats["cost_usd"], 6)
+                    } for model, stats in models.items()
+                } for route, models in self.routes.items()
+            }
+        return {
+            "triage_mode": self.triage_mode,
+            "triage_model": (self.triage_profile() or {}).get("model", "local"),
+            "answer_models": sorted({self.profile(category)["model"] for category in self.profiles}),
+            "routes": routes
+        }
+
+
+# Queries replayed by the benchmark, one or two per category; none is answered by the knowledge base
+BENCHMARK_QUERIES = [
+    "My account has been on hold since yesterday after a spike in volume, what do I do?",
+    "Why was my PAN card rejected during verification and how do I fix it?",
+    "The settlement for last week's sales has not reached my bank account",
+    "Can you raise my per-transaction threshold for a big order next month?",
+    "I want WhatsApp alerts for refunds but not for every payment",
+    "Give me an analysis of this week's performance trends",
+    "How do I simulate a failed webhook in the sandbox for testing?",
+    "What are your support hours on public holidays?",
+    "Payments are failing with an error at checkout, this is urgent",
+    "Please escalate my open support ticket about the delayed payout"
+]
+
+# Assumed (seconds to first token, output tokens per second) of each simulated model, and output length per call kind
+SIMULATED_MODELS = {
+    "gemini-1.5-flash": (0.45, 160.0),
+    "gemini-1.5-flash-8b": (0.25, 280.0)
+}
+SIMULATED_OUTPUT_TOKENS = {"QueryAnalysis": 120, "SupportAnswer": 520, None: 420}
+
+
+class SimulatedModel:
+    """Stand-in chat model for the offline benchmark: sleeps as long as the model would take, scaled down"""
+
+    def __init__(self, profile: Dict[str, Any], time_scale: float, schema: Optional[type] = None):
+        self.profile = profile
+        self.time_scale = time_scale
+        self.schema = schema
+
+    def with_structured_output(self, schema: type) -> "SimulatedModel":
+        return SimulatedModel(self.profile, self.time_scale, schema)
+
+    def invoke(self, messages: List) -> Any:
+        """Wait for the simulated generation time and return output of the simulated length"""
+        import time
+        from langchain.schema import AIMessage
+
+        first_token, tokens_per_second = SIMULATED_MODELS.get(self.profile["model"], SIMULATED_MODELS[Config.MODEL_NAME])
+        tokens = min(self.profile["max_tokens"], SIMULATED_OUTPUT_TOKENS[self.schema.__name__ if self.schema else None])
+        time.sleep((first_token + tokens / tokens_per_second) * self.time_scale)
+        text = "x" * (tokens * CHARS_PER_TOKEN)
+        if self.schema is None:
+            return AIMessage(content=text)
+        fields = {"category": "self_help", "priority": "medium", "suggested_actions": [text]}
+        if "response" in self.schema.model_fields:
+            fields["response"] = text[:400 * CHARS_PER_TOKEN]
+            fields["suggested_actions"] = [text[400 * CHARS_PER_TOKEN:]]
+        return self.schema(**fields)
+
+
+def benchmark(live: bool = False, time_scale: float = 0.1) -> Dict[str, Any]:
+    """
+    Replay BENCHMARK_QUERIES through analyze_query and generate_response, before and after routing
+
+    "before" triages on the answer model and answers every category with the default profile,
+    as the assistant did before routing; "after" uses TRIAGE_MODE and MODEL_PROFILES.
+
+    Args:
+        live: Call the real models (needs GEMINI_API_KEY); otherwise simulate their latency
+        time_scale: Simulated model time multiplier, to keep offline runs short; latencies are reported unscaled
+
+    Returns:
+        Per configuration: average latency and estimated cost per query, plus the per-route breakdown
+    """
+    import time
+    from support_ai import CashfreeSupportAI
+
+    scale = 1.0 if live else time_scale
+    configurations = {
+        "before": {"profiles": {"default": Config.MODEL_PROFILES["default"]}, "triage_mode": "main"},
+        "after": {"profiles": Config.MODEL_PROFILES, "triage_mode": Config.TRIAGE_MODE}
+    }
+    results = {}
+    for name, options in configurations.items():
+        assistant = CashfreeSupportAI()
+        if live:
+            if assistant.demo_mode:
+                raise RuntimeError("GEMINI_API_KEY is not configured; run without --live to simulate")
+            create_model = assistant._create_llm_for_profile
+        else:
+            assistant.demo_mode = False
+            assistant.prompt_cache_name = None
+            create_model = lambda profile: SimulatedModel(profile, scale)
+        assistant.router = ModelRouter(create_model, **options)
+        assistant.llm = assistant.router.model(assistant.router.profile())
+
+        latencies = []
+        for query in BENCHMARK_QUERIES:
+            started = time.perf_counter()
+            assistant.analyze_query(query)
+            assistant.generate_response(query, include_analysis=True)
+            latencies.append((time.perf_counter() - started) / scale)
+        stats = assistant.router.get_stats()
+        for models in stats["routes"].values():
+            for model in models.values():
+                model["avg_latency_ms"] = round(model["avg_latency_ms"] / scale, 2)
+        cost = sum(model["cost_usd"] for models in stats["routes"].values() for model in models.values())
+        model_calls = sum(
+            model["calls"] for models in stats["routes"].values()
+            for model_name, model in models.items() if model_name != "local"
+        )
+        results[name] = {
+            "avg_latency_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+            "max_latency_ms": round(max(latencies) * 1000, 1),
+            "model_calls_per_query": round(model_calls / len(BENCHMARK_QUERIES), 2),
+            "cost_per_query_usd": round(cost / len(BENCHMARK_QUERIES), 7),
+            "routes": stats["routes"]
+        }
+    before, after = results["before"], results["after"]
+    return {
+        "mode": "live" if live else "simulated",
+        "queries": len(BENCHMARK_QUERIES),
+        "latency_reduction_pct": round(100 * (1 - after["avg_latency_ms"] / before["avg_latency_ms"]), 1),
+        "cost_reduction_pct": round(100 * (1 - after["cost_per_query_usd"] / before["cost_per_query_usd"]), 1)
+        if before["cost_per_query_usd"] else None,
+        **results
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Compare latency and cost per query before and after model routing")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--live", action="store_true", help="Call the real models (needs GEMINI_API_KEY)")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Simulated model time multiplier")
+    args = parser.parse_args()
+    if args.benchmark:
+        print(json.dumps(benchmark(args.live, args.time_scale), indent=2))
+    else:
+        print(__doc__)
@@ -0,0 +1,111 @@
+"""
+Notification Router for Cashfree AI Support Assistant
+Compiles merchant notification preferences into a routing index for fast alert fan-out
+"""
+from typing import Dict, List, Any, Optional, Set
+
+# Channel bits used in the per-event routing masks
+CHANNEL_BITS = {
+    "email": 1,
+    "whatsapp": 2,
+    "sms": 4
+}
+
+# Preference sections in notification_data.json mapped to their channel
+CHANNEL_SECTIONS = {
+    "email_notifications": "email",
+    "whatsapp_notifications": "whatsapp",
+    "sms_notifications": "sms"
+}
+
+
+class NotificationRouter:
+    """Routing table of merchant -> event type -> channel bitmask with an inverted index"""
+
+    def __init__(self):
+        """Initialize an empty routing table"""
+        # merchant_id -> event_type -> channel bitmask
+        self.routes: Dict[str, Dict[str, int]] = {}
+        # event_type -> channel -> merchant ids subscribed on that channel
+        self.subscribers: Dict[str, Dict[str, Set[str]]] = {}
+
+    @staticmethod
+    def compile_preferences(preferences: Dict[str, Any]) -> Dict[str, int]:
+        """Compile nested channel preference dicts into event type -> bitmask"""
+        masks: Dict[str, int] = {}
+        for section, channel in CHANNEL_SECTIONS.items():
+            for event_type, enabled in (preferences.get(section) or {}).items():
+                mask = masks.get(event_type, 0)
+                if enabled:
+                    mask |= CHANNEL_BITS[channel]
+                masks[event_type] = mask
+        return masks
+
+    def update_merchant(self, merchant_id: str, preferences: Dict[str, Any]) -> None:
+        """Recompile one merchant's preferences and patch the inverted index by diff"""
+        self.set_routes(merchant_id, self.compile_preferences(preferences))
+
+    def set_routes(self, merchant_id: str, masks: Dict[str, int]) -> None:
+        """Replace one merchant's compiled masks, touching only the changed bits"""
+        old_masks = self.routes.get(merchant_id, {})
+        for event_type in set(old_masks) | set(masks):
+            old_mask = old_masks.get(event_type, 0)
+            new_mask = masks.get(event_type, 0)
+            changed = old_mask ^ new_mask
+            if not changed:
+                continue
+            channels = self.subscribers.setdefault(event_type, {})
+            for channel, bit in CHANNEL_BITS.items():
+                if not changed & bit:
+                    continue
+                if new_mask & bit:
+                    channels.setdefault(channel, set()).add(merchant_id)
+                else:
+                    members = channels.get(channel)
+                    if members is not None:
+                        members.discard(merchant_id)
+                        if not members:
+                            del channels[channel]
+            if not channels:
+                del self.subscribers[event_type]
+        self.routes[merchant_id] = dict(masks)
+
+    def set_preference(self, merchant_id: str, channel: str, event_type: str, enabled: bool) -> None:
+        """Flip a single channel bit for one merchant and event type"""
+        bit = CHANNEL_BITS[channel]
+        masks = dict(self.routes.get(merchant_id, {}))
+        mask = masks.get(event_type, 0)
+        masks[event_type] = mask | bit if enabled else mask & ~bit
+        self.set_routes(merchant_id, masks)
+
+    def remove_merchant(self, merchant_id: str) -> None:
+        """Drop a merchant from the routing table"""
+        if merchant_id in self.routes:
+            self.set_routes(merchant_id, {})
+            del self.routes[merchant_id]
+
+    def get_mask(self, merchant_id: str, event_type: str) -> int:
+        """Get the channel bitmask for one merchant and event type"""
+        return self.routes.get(merchant_id, {}).get(event_type, 0)
+
+    def get_channels(self, merchant_id: str, event_type: str) -> List[str]:
+        """Get the channels a merchant receives an event type on"""
+        mask = self.get_mask(merchant_id, event_type)
+        return [channel for channel, bit in CHANNEL_BITS.items() if mask & bit]
+
+    def get_recipients(self, event_type: str, channel: Optional[str] = None) -> Set[str]:
+        """Get merchants subscribed to an event type, on one channel or any channel"""
+        channels = self.subscribers.get(event_type, {})
+        if channel is not None:
+            return channels.get(channel, set())
+        recipients: Set[str] = set()
+        for members in channels.values():
+            recipients |= members
+        return recipients
+
+    def fan_out(self, event_type: str) -> Dict[str, List[str]]:
+        """Get the recipient list per channel for a system-wide event"""
+        return {
+            channel: sorted(members)
+            for channel, members in self.subscribers.get(event_type, {}).items()
+        }
@@ -0,0 +1,207 @@
+"""
+Rate Limiter for Cashfree AI Support Assistant
+Token buckets keyed by merchant, client and globally, with in-process or SQLite-backed state
+"""
+from typing import Dict, List, Tuple
+from collections import OrderedDict
+import sqlite3
+import threading
+import time
+
+# (bucket key, refill rate in tokens per second, capacity)
+BucketSpec = Tuple[str, float, float]
+
+# Most buckets a backend holds; merchant and client keys come from requests
+DEFAULT_MAX_BUCKETS = 100000
+
+# Seconds between prunes of the SQLite bucket table, per process
+PRUNE_INTERVAL = 60.0
+
+
+def _refill(tokens: float, updated: float, rate: float, capacity: float, now: float) -> float:
+    """Tokens in a bucket after refilling since its last update"""
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _take(states: List[Tuple[float, float]], buckets: List[BucketSpec], cost: float, now: float) -> Tuple[float, List[float]]:
+    """
+    Try to take cost tokens from every bucket at once
+
+    Returns:
+        Tuple of seconds to wait (0 when allowed) and the new token counts
+    """
+    remaining = []
+    retry_after = 0.0
+    for (tokens, updated), (_, rate, capacity) in zip(states, buckets):
+        available = _refill(tokens, updated, rate, capacity, now)
+        if available < cost:
+            retry_after = max(retry_after, (cost - available) / rate)
+        remaining.append(available)
+    if retry_after:
+        return retry_after, remaining
+    return 0.0, [available - cost for available in remaining]
+
+
+class MemoryBackend:
+    """
+    Bucket state in this process only
+
+    Buckets are kept least recently used first. A bucket that has refilled to capacity behaves
+    exactly like a missing one, so it is dropped; past max_buckets the least recently used go too.
+    """
+
+    def __init__(self, max_buckets: int = DEFAULT_MAX_BUCKETS):
+        """Initialize empty bucket state"""
+        self.lock = threading.Lock()
+        self.max_buckets = max(1, max_buckets)
+        # key -> (tokens, last update, time the bucket is full again)
+        self.buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+
+    def consume(self, buckets: List[BucketSpec], cost: float = 1.0) -> float:
+        """Atomically take tokens from all buckets, returning seconds to wait if refused"""
+        now = time.time()
+        with self.lock:
+            states = [self.buckets.get(key, (capacity, now, now))[:2] for key, _, capacity in buckets]
+            retry_after, remaining = _take(states, buckets, cost, now)
+            for (key, rate, capacity), tokens in zip(buckets, remaining):
+                self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+                self.buckets.move_to_end(key)
+            self._evict(now)
+        return retry_after
+
+    def _evict(self, now: float) -> None:
+        """Drop refilled buckets from the least recently used end, and any beyond max_buckets"""
+        while self.buckets:
+            key, (_, _, full_at) = next(iter(self.buckets.items()))
+            if full_at > now and len(self.buckets) <= self.max_buckets:
+                break
+            del self.buckets[key]
+
+
+class SQLiteBackend:
+    """
+    Bucket state in a local SQLite file shared by every worker process on the machine
+
+    Like the memory backend, buckets idle long enough to have refilled are deleted, and past
+    max_buckets the least recently updated go too; each process prunes every PRUNE_INTERVAL seconds.
+    """
+
+    def __init__(self, path: str, max_buckets: int = DEFAULT_MAX_BUCKETS):
+        """Open (or create) the bucket database"""
+        self.path = path
+        self.max_buckets = max(1, max_buckets)
+        self.local = threading.local()
+        self.prune_lock = threading.Lock()
+        self.last_prune = time.time()
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, in autocommit mode so transactions are explicit"""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+        return connection
+
+    def consume(self, buckets: List[BucketSpec], cost: float = 1.0) -> float:
+        """Atomically take tokens from all buckets, returning seconds to wait if refused"""
+        connection = self._connection()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so workers cannot interleave updates
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            states = []
+            for key, _, capacity in buckets:
+                row = connection.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                states.append(row if row else (capacity, now))
+            retry_after, remaining = _take(states, buckets, cost, now)
+            connection.executemany(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                [(key, tokens, now) for (key, _, _), tokens in zip(buckets, remaining)]
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if now - self.last_prune >= PRUNE_INTERVAL:
+            self._prune(buckets, now)
+        return retry_after
+
+    def _prune(self, buckets: List[BucketSpec], now: float) -> None:
+        """Delete buckets idle for longer than any bucket takes to refill, then the oldest beyond max_buckets"""
+        if not self.prune_lock.acquire(blocking=False):
+            return
+        try:
+            self.last_prune = now
+            refill_seconds = max(capacity / rate for _, rate, capacity in buckets)
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM buckets WHERE updated < ?", (now - refill_seconds,))
+                (count,) = connection.execute("SELECT COUNT(*) FROM buckets").fetchone()
+                if count > self.max_buckets:
+                    connection.execute(
+                        "DELETE FROM buckets WHERE key IN (SELECT key FROM buckets ORDER BY updated LIMIT ?)",
+                        (count - self.max_buckets,)
+                    )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            self.prune_lock.release()
+
+
+class RateLimiter:
+    """Per-merchant, per-client and global token buckets for the AI endpoints"""
+
+    def __init__(self, backend, limits: Dict[str, Tuple[float, float]]):
+        """
+        Create a rate limiter
+
+        Args:
+            backend: MemoryBackend or SQLiteBackend
+            limits: Scope ("merchant", "client", "global") -> (requests per minute, burst size);
+                0 requests per minute leaves a scope unlimited
+        """
+        self.backend = backend
+        self.limits = {}
+        for scope, (per_minute, burst) in limits.items():
+            if per_minute <= 0:
+                print(f"⚠️  Warning: Rate limit for {scope} is {per_minute} per minute. Not limiting {scope}.")
+                continue
+            if burst < 1:
+                print(f"⚠️  Warning: Rate limit burst for {scope} is {burst}. Using 1.")
+                burst = 1
+            self.limits[scope] = (per_minute, burst)
+        self.allowed = 0
+        self.limited = 0
+
+    def check(self, merchant_id: str, client_id: str, cost: float = 1.0) -> float:
+        """
+        Take one request's tokens for a merchant and client
+
+        Returns:
+            0 when allowed, otherwise seconds until the request would be allowed
+        """
+        keys = {"merchant": f"merchant:{merchant_id}", "client": f"client:{client_id}", "global": "global"}
+        buckets = [
+            (keys[scope], per_minute / 60.0, burst)
+            for scope, (per_minute, burst) in self.limits.items()
+        ]
+        retry_after = self.backend.consume(buckets, cost) if buckets else 0.0
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get counts of allowed and limited requests in this process"""
+        return {"allowed": self.allowed, "limited": self.limited}
@@ -0,0 +1,174 @@
+"""
+Compact Records for Cashfree AI Support Assistant
+Slotted record types for tickets, payouts and transactions with interned enums and integer timestamps
+"""
+from typing import Dict, Any, Optional, Tuple, Union
+from datetime import datetime, timedelta
+import calendar
+import re
+import sys
+
+# Field kinds
+VALUE = "value"  # stored as is
+ENUM = "enum"    # small vocabulary (status, priority, ...): interned so every record shares one string
+TIME = "time"    # ISO timestamp: packed into an int that compares in time order
+
+# Timestamp layouts found in the data files; the code is kept so values are written back unchanged
+_UTC_SECONDS = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ$")
+_DATE_ONLY = re.compile(r"\d{4}-\d\d-\d\d$")
+UTC_SECONDS, NAIVE_ISO, DATE_ONLY = 0, 1, 2
+EPOCH = datetime(1970, 1, 1)
+
+# Marks a field the source dict did not have, so to_dict leaves it out
+_MISSING = object()
+
+
+def pack_timestamp(value: Any) -> Union[int, Any]:
+    """
+    Pack an ISO timestamp into epoch microseconds * 4 + layout code
+
+    Values that are not timestamps in a known layout are returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        if _UTC_SECONDS.match(value):
+            parsed, layout = datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ"), UTC_SECONDS
+        elif _DATE_ONLY.match(value):
+            parsed, layout = datetime.strptime(value, "%Y-%m-%d"), DATE_ONLY
+        else:
+            parsed, layout = datetime.fromisoformat(value), NAIVE_ISO
+            if parsed.tzinfo is not None or parsed.isoformat() != value:
+                return value
+    except ValueError:
+        return value
+    micros = calendar.timegm(parsed.timetuple()) * 1000000 + parsed.microsecond
+    return micros * 4 + layout
+
+
+def unpack_timestamp(value: Any) -> Any:
+    """Turn a packed timestamp back into the exact string it was packed from"""
+    if not isinstance(value, int) or isinstance(value, bool):
+        return value
+    micros, layout = divmod(value, 4)
+    parsed = EPOCH + timedelta(microseconds=micros)
+    if layout == UTC_SECONDS:
+        return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if layout == DATE_ONLY:
+        return parsed.strftime("%Y-%m-%d")
+    return parsed.isoformat()
+
+
+class CompactRecord:
+    """
+    Base for slotted records that still read like the dicts they replace
+
+    Subclasses list their fields in FIELDS; keys outside FIELDS are kept in extra.
+    Item access (record["status"], record.get("resolution")) returns the original
+    string forms, attribute access returns the stored forms.
+    """
+
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    KINDS: Dict[str, str] = {}
+    __slots__ = ("extra",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.KINDS = dict(cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactRecord":
+        """Build a record from its dict form"""
+        record = cls.__new__(cls)
+        for name, kind in cls.FIELDS:
+            setattr(record, name, cls._pack(kind, data.get(name, _MISSING)))
+        record.extra = {key: value for key, value in data.items() if key not in cls.KINDS} or None
+        return record
+
+    @staticmethod
+    def _pack(kind: str, value: Any) -> Any:
+        """Convert a dict value to its stored form"""
+        if value is _MISSING or value is None:
+            return value
+        if kind == ENUM and isinstance(value, str):
+            return sys.intern(value)
+        if kind == TIME:
+            return pack_timestamp(value)
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict form, with fields in their original representation and order"""
+        result = {}
+        for name, kind in self.FIELDS:
+            value = getattr(self, name)
+            if value is _MISSING:
+                continue
+            result[name] = unpack_timestamp(value) if kind == TIME else value
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    def __getitem__(self, key: str) -> Any:
+        kind = self.KINDS.get(key)
+        if kind is None:
+            if self.extra and key in self.extra:
+                return self.extra[key]
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return unpack_timestamp(value) if kind == TIME else value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        kind = self.KINDS.get(key)
+        if kind is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        else:
+            setattr(self, key, self._pack(kind, value))
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """Dict-style get"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Ticket(CompactRecord):
+    """Support ticket"""
+
+    FIELDS = (
+        ("ticket_id", VALUE), ("subject", VALUE), ("description", VALUE), ("status", ENUM),
+        ("priority", ENUM), ("created_date", TIME), ("last_updated", TIME), ("merchant_id", ENUM),
+        ("resolution", VALUE)
+    )
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class Payout(CompactRecord):
+    """Payout history entry"""
+
+    FIELDS = (("date", TIME), ("amount", VALUE), ("status", ENUM), ("transaction_id", VALUE))
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+
+class Transaction(CompactRecord):
+    """Recent transaction"""
+
+    FIELDS = (
+        ("transaction_id", VALUE), ("amount", VALUE), ("status", ENUM), ("date", TIME),
+        ("payment_method", ENUM)
+    )
+    __slots__ = tuple(name for name, _ in FIELDS)
@@ -0,0 +1,51 @@
+"""
+Structured output schemas for Cashfree AI Support Assistant
+Pydantic models the model fills in, so callers receive parsed, validated fields
+"""
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+IssueCategory = Literal[
+    "account_hold", "kyc_compliance", "payout_issue", "transaction_limit", "support_ticket",
+    "self_help", "notification", "dashboard_insight", "admin_function", "testing"
+]
+
+Priority = Literal["high", "medium", "low"]
+
+# Keyword rules for categorizing queries and tickets without the model; first match wins
+CATEGORY_KEYWORDS = [
+    ("account_hold", ["hold", "freeze", "frozen", "account", "unlock"]),
+    ("kyc_compliance", ["kyc", "verification", "document", "pan", "address", "compliance"]),
+    ("payout_issue", ["payout", "settlement", "payment", "delay"]),
+    ("transaction_limit", ["limit", "threshold", "transaction", "increase"]),
+    ("support_ticket", ["ticket", "support", "escalate", "create"]),
+    ("notification", ["alert", "notification", "email", "whatsapp", "preference"]),
+    ("dashboard_insight", ["dashboard", "trend", "analysis", "performance", "summary"]),
+    ("admin_function", ["admin", "list", "bulk", "manager"]),
+    ("testing", ["test", "debug", "simulate", "dry-run"]),
+]
+
+
+def categorize(text: str) -> str:
+    """Issue category of a query or ticket text by keyword rules, self_help when none match"""
+    text_lower = text.lower()
+    return next(
+        (name for name, words in CATEGORY_KEYWORDS if any(word in text_lower for word in words)),
+        "self_help"
+    )
+
+
+class QueryAnalysis(BaseModel):
+    """Categorization of a merchant query"""
+
+    category: IssueCategory = Field(description="Issue category")
+    priority: Priority = Field(description="Priority level")
+    key_concerns: List[str] = Field(default_factory=list, description="Key concerns identified")
+    suggested_actions: List[str] = Field(default_factory=list, description="Suggested immediate actions")
+    required_tools: List[str] = Field(default_factory=list, description="Tools or functions to invoke")
+
+
+class SupportAnswer(QueryAnalysis):
+    """Categorization plus the merchant-facing answer, produced in a single model call"""
+
+    response: str = Field(description="Complete merchant-facing answer")
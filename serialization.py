@@ -0,0 +1,220 @@
+"""
+Serialization for Cashfree AI Support Assistant
+JSON encoding for API responses and data files, using orjson or msgspec when installed
+
+Usage:
+    python serialization.py --benchmark [ticket_count]
+"""
+from typing import Dict, Any, Optional, Callable, Union
+from datetime import date, datetime
+import json
+import os
+import sys
+import time
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # Optional; the standard library encoder is always available
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional
+    msgspec = None
+
+# Called for values the encoder does not know; returns a serializable replacement or raises TypeError
+Default = Optional[Callable[[Any], Any]]
+
+
+def _iso_dates(default: Default) -> Callable[[Any], Any]:
+    """Wrap a default hook so dates become ISO 8601 strings, as orjson and msgspec write them"""
+    def hook(value: Any) -> Any:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if default is None:
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+        return default(value)
+    return hook
+
+
+class StdlibBackend:
+    """The json module"""
+
+    name = "json"
+
+    def dumps(self, value: Any, pretty: bool = False, default: Default = None) -> bytes:
+        """Encode to UTF-8 JSON, indented by two spaces when pretty"""
+        if pretty:
+            text = json.dumps(value, indent=2, ensure_ascii=False, default=_iso_dates(default))
+        else:
+            text = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_iso_dates(default))
+        return text.encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON"""
+        return json.loads(data)
+
+
+class OrjsonBackend:
+    """orjson: compiled encoder writing UTF-8 bytes directly"""
+
+    name = "orjson"
+
+    def dumps(self, value: Any, pretty: bool = False, default: Default = None) -> bytes:
+        """Encode to UTF-8 JSON, indented by two spaces when pretty"""
+        # Non-string keys are written as strings, as the json module does
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(value, default=default, option=option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON"""
+        return orjson.loads(data)
+
+
+class MsgspecBackend:
+    """msgspec: compiled encoder, reused across calls"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        """Create the decoder; encoders depend on the default hook and are made per call"""
+        self.decoder = msgspec.json.Decoder()
+
+    def dumps(self, value: Any, pretty: bool = False, default: Default = None) -> bytes:
+        """Encode to UTF-8 JSON, indented by two spaces when pretty"""
+        try:
+            encoded = msgspec.json.encode(value, enc_hook=default)
+        except msgspec.EncodeError as e:
+            raise TypeError(str(e)) from e
+        return msgspec.json.format(encoded, indent=2) if pretty else encoded
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON"""
+        try:
+            return self.decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # Same error family as the other backends
+            raise ValueError(str(e)) from e
+
+
+def available_backends() -> Dict[str, Any]:
+    """Installed backends by name, fastest first"""
+    backends = {}
+    if orjson is not None:
+        backends["orjson"] = OrjsonBackend()
+    if msgspec is not None:
+        backends["msgspec"] = MsgspecBackend()
+    backends["json"] = StdlibBackend()
+    return backends
+
+
+def get_backend(name: str = "auto"):
+    """
+    Pick a backend by name, or the fastest installed one for "auto"
+
+    An unknown or missing backend falls back to the fastest installed one with a warning.
+    """
+    backends = available_backends()
+    if name in ("", "auto"):
+        return next(iter(backends.values()))
+    if name not in backends:
+        print(f"⚠️  Warning: JSON backend {name} is not installed. Using {next(iter(backends))}.")
+        return next(iter(backends.values()))
+    return backends[name]
+
+
+# Backend selected by JSON_BACKEND
+backend = get_backend(Config.JSON_BACKEND)
+
+
+def dumps(value: Any, pretty: bool = False, default: Default = None) -> bytes:
+    """
+    Encode a value to UTF-8 JSON with the configured backend
+
+    Args:
+        value: Value to encode
+        pretty: Indent for people reading it; compact otherwise
+        default: Hook for values the backend cannot encode
+
+    Returns:
+        Encoded bytes
+    """
+    return backend.dumps(value, pretty, default)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON with the configured backend, raising ValueError for invalid input"""
+    return backend.loads(data)
+
+
+def _payloads(ticket_count: int) -> Dict[str, Any]:
+    """Payload shapes the API and data files carry: the summary, a ticket list, a merchant directory"""
+    statuses = ["open", "in_progress", "resolved", "closed"]
+    tickets = [{
+        "ticket_id": f"TKT{index:06d}",
+        "subject": f"Payout delay for settlement batch {index}",
+        "description": "My payout has been delayed for 3 days and the dashboard still shows it as pending",
+        "status": statuses[index % len(statuses)],
+        "priority": ["low", "medium", "high"][index % 3],
+        "created_date": f"2024-01-{index % 28 + 1:02d}T09:00:00Z",
+        "last_updated": f"2024-01-{index % 28 + 1:02d}T12:30:00.123456",
+        "merchant_id": f"MERCH{index % 500:06d}",
+        "resolution": "Settlement released after bank confirmation" if index % 4 > 1 else None
+    } for index in range(ticket_count)]
+    merchants = [{
+        "merchant_id": f"MERCH{index:06d}",
+        "business_name": f"Merchant {index} Pvt Ltd – ₹ payments",
+        "account_status": ["active", "on_hold", "frozen"][index % 3],
+        "risk_score": ["low", "medium", "high"][index % 3],
+        "pending_documents": ["PAN Card", "Address Proof"][:index % 3],
+        "verification_progress": index % 101,
+        "contact_info": {"email": f"ops{index}@example.com", "phone": "+91-9876543210"}
+    } for index in range(ticket_count)]
+
+    summary = {}
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    for filename in sorted(os.listdir(folder)) if os.path.isdir(folder) else []:
+        if filename.endswith(".json") and filename != "merchants.json":
+            with open(os.path.join(folder, filename), "rb") as f:
+                summary[filename[:-len(".json")]] = json.loads(f.read())
+    return {
+        "summary": summary,
+        "ticket_list": {"total_tickets": ticket_count, "tickets": tickets},
+        "merchant_directory": {"merchants": merchants}
+    }
+
+
+def benchmark(ticket_count: int = 5000, min_seconds: float = 0.5) -> Dict[str, Any]:
+    """
+    Compare encode and decode throughput of every installed backend on the payload shapes
+
+    Returns:
+        payload -> backend -> encode/decode operations per second and MB/s, plus encoded size
+    """
+    results: Dict[str, Any] = {}
+    for payload_name, payload in _payloads(ticket_count).items():
+        results[payload_name] = {}
+        for name, candidate in available_backends().items():
+            encoded = candidate.dumps(payload)
+            row = {"bytes": len(encoded)}
+            for operation, run in (("encode", lambda: candidate.dumps(payload)), ("decode", lambda: candidate.loads(encoded))):
+                count, started = 0, time.perf_counter()
+                while True:
+                    run()
+                    count += 1
+                    elapsed = time.perf_counter() - started
+                    if elapsed >= min_seconds:
+                        break
+                row[f"{operation}_per_sec"] = round(count / elapsed, 1)
+                row[f"{operation}_mb_per_sec"] = round(len(encoded) * count / elapsed / 1e6, 1)
+            results[payload_name][name] = row
+    return {"ticket_count": ticket_count, "active_backend": backend.name, "results": results}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        report = benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
+        print(dumps(report, pretty=True).decode("utf-8"))
+    else:
+        print(__doc__)
@@ -0,0 +1,433 @@
+"""
+Shard Router for Cashfree AI Support Assistant
+Consistent-hash partitioning of merchants across data nodes, and a thin router forwarding calls to the owner
+
+Usage:
+    python shard_router.py split <data_folder> <output_folder> <node_url>[,<node_url>...]
+    python shard_router.py serve [--nodes <node_url>[,<node_url>...]] [--port 5000]
+"""
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from bisect import bisect_right
+from flask import Flask, request, jsonify, Response
+from functools import wraps
+from config import Config
+import hashlib
+import hmac
+import os
+import shutil
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import serialization
+
+DEFAULT_VNODES = 128
+
+# Call prefixes forwarded to the node owning the merchant
+ROUTED_PREFIXES = ("data", "ticket", "kyc")
+
+# Forwarded methods that change a merchant's data; held while the merchant moves between nodes
+WRITE_METHODS = ("POST", "PUT", "DELETE")
+
+# Merchants copied per shard API call during a rebalance
+MOVE_BATCH_SIZE = 200
+
+# Seconds a rebalance waits for writes already forwarded to the merchants it moves
+WRITE_DRAIN_TIMEOUT = 30.0
+
+# Headers that describe one connection and are not forwarded
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "host", "upgrade"}
+
+# Header carrying SHARD_ADMIN_TOKEN on calls that move merchant data
+ADMIN_TOKEN_HEADER = "X-Shard-Admin-Token"
+
+
+def shard_admin_required(view):
+    """Allow a call only with SHARD_ADMIN_TOKEN; the call is disabled (403) while no token is configured"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.SHARD_ADMIN_TOKEN:
+            return jsonify({"error": "Shard admin calls are disabled; set SHARD_ADMIN_TOKEN to enable them"}), 403
+        token = request.headers.get(ADMIN_TOKEN_HEADER, "")
+        if not hmac.compare_digest(token.encode("utf-8"), Config.SHARD_ADMIN_TOKEN.encode("utf-8")):
+            return jsonify({"error": f"Missing or invalid {ADMIN_TOKEN_HEADER}"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _point(value: str) -> int:
+    """Position of a value on the ring"""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes
+
+    Each node owns vnodes points; a merchant belongs to the first point at or after its hash.
+    Adding a node takes roughly 1/N of the merchants from the existing nodes and moves nothing else.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        """Build a ring over the given nodes"""
+        self.vnodes = max(1, vnodes)
+        self.nodes: List[str] = []
+        self.points: List[int] = []
+        self.owners: List[str] = []
+        for node in nodes:
+            if node not in self.nodes:
+                self.nodes.append(node)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Lay out every node's virtual points in ring order"""
+        ring = sorted((_point(f"{node}#{index}"), node) for node in self.nodes for index in range(self.vnodes))
+        self.points = [point for point, _ in ring]
+        self.owners = [node for _, node in ring]
+
+    def with_node(self, node: str) -> "HashRing":
+        """Copy of the ring with a node added"""
+        return HashRing(self.nodes + [node], self.vnodes)
+
+    def without_node(self, node: str) -> "HashRing":
+        """Copy of the ring with a node removed"""
+        return HashRing([existing for existing in self.nodes if existing != node], self.vnodes)
+
+    def owner(self, merchant_id: str) -> Optional[str]:
+        """Node owning a merchant, None for an empty ring"""
+        if not self.points:
+            return None
+        index = bisect_right(self.points, _point(merchant_id))
+        return self.owners[index % len(self.owners)]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+class ShardRouter:
+    """Forwards merchant calls to their owning data node and moves merchants when nodes join or leave"""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = DEFAULT_VNODES, timeout: float = 10.0,
+                 admin_token: Optional[str] = None):
+        """
+        Create a router
+
+        Args:
+            nodes: Data node base URLs, e.g. http://127.0.0.1:5001
+            vnodes: Virtual points per node
+            timeout: Seconds to wait for a data node
+            admin_token: Token the data nodes' shard API requires; Config.SHARD_ADMIN_TOKEN if None
+        """
+        self.ring = HashRing([node.rstrip("/") for node in nodes], vnodes)
+        self.timeout = timeout
+        self.admin_token = Config.SHARD_ADMIN_TOKEN if admin_token is None else admin_token
+        # One membership change at a time
+        self.rebalance_lock = threading.Lock()
+        self.lock = threading.Lock()
+        # Merchants being copied to a new owner, whose writes are refused until routing switches,
+        # and writes forwarded per merchant that have not returned yet
+        self.moving: set = set()
+        self.writes_in_flight: Dict[str, int] = {}
+        self.writes_done = threading.Condition(self.lock)
+        self.stats = {"forwarded": 0, "node_errors": 0, "rebalances": 0, "merchants_moved": 0, "writes_refused": 0}
+        self.node_requests: Dict[str, int] = {}
+
+    def owner(self, merchant_id: str) -> Optional[str]:
+        """Node owning a merchant"""
+        return self.ring.owner(merchant_id)
+
+    def begin_write(self, merchant_id: str) -> bool:
+        """Count a write about to be forwarded; False while the merchant is being moved"""
+        with self.lock:
+            if merchant_id in self.moving:
+                self.stats["writes_refused"] += 1
+                return False
+            self.writes_in_flight[merchant_id] = self.writes_in_flight.get(merchant_id, 0) + 1
+            return True
+
+    def end_write(self, merchant_id: str) -> None:
+        """Count a forwarded write as finished"""
+        with self.lock:
+            remaining = self.writes_in_flight.get(merchant_id, 0) - 1
+            if remaining > 0:
+                self.writes_in_flight[merchant_id] = remaining
+            else:
+                self.writes_in_flight.pop(merchant_id, None)
+            self.writes_done.notify_all()
+
+    def _hold_writes(self, merchant_ids: List[str]) -> None:
+        """Refuse new writes for these merchants and wait for the ones already forwarded to finish"""
+        deadline = time.monotonic() + WRITE_DRAIN_TIMEOUT
+        with self.lock:
+            self.moving.update(merchant_ids)
+            while any(merchant_id in self.moving for merchant_id in self.writes_in_flight):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Writes to the merchants being moved did not finish")
+                self.writes_done.wait(remaining)
+
+    def _release_writes(self, merchant_ids: List[str]) -> None:
+        """Accept writes for these merchants again, routed by the current ring"""
+        with self.lock:
+            self.moving.difference_update(merchant_ids)
+
+    def forward(self, node: str, method: str, path: str, query: bytes, headers: Dict[str, str],
+                body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """
+        Send a call to a data node
+
+        Returns:
+            Tuple of status, response headers and body; 502 when the node cannot be reached
+        """
+        url = f"{node}{path}" + (f"?{query.decode('latin-1')}" if query else "")
+        forwarded = {name: value for name, value in headers.items() if name.lower() not in HOP_HEADERS}
+        outgoing = urllib.request.Request(url, data=body or None, method=method, headers=forwarded)
+        with self.lock:
+            self.stats["forwarded"] += 1
+            self.node_requests[node] = self.node_requests.get(node, 0) + 1
+        try:
+            with urllib.request.urlopen(outgoing, timeout=self.timeout) as response:
+                return response.status, list(response.headers.items()), response.read()
+        except urllib.error.HTTPError as e:
+            # Error statuses from the node are passed through unchanged
+            return e.code, list(e.headers.items()), e.read()
+        except (urllib.error.URLError, OSError) as e:
+            with self.lock:
+                self.stats["node_errors"] += 1
+            body = serialization.dumps({"error": f"Data node {node} unavailable: {e}"})
+            return 502, [("Content-Type", "application/json")], body
+
+    def _call(self, node: str, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """JSON call to a data node's shard API, raising on any error"""
+        outgoing = urllib.request.Request(
+            f"{node}{path}",
+            data=serialization.dumps(payload) if payload is not None else None,
+            method=method,
+            headers={"Content-Type": "application/json", ADMIN_TOKEN_HEADER: self.admin_token}
+        )
+        with urllib.request.urlopen(outgoing, timeout=self.timeout) as response:
+            return serialization.loads(response.read())
+
+    def add_node(self, node: str) -> Dict[str, Any]:
+        """Add a data node and move the merchants it now owns onto it"""
+        node = node.rstrip("/")
+        with self.rebalance_lock:
+            if node in self.ring.nodes:
+                return {"node": node, "moved": {}}
+            return self._rebalance(self.ring.with_node(node), node)
+
+    def remove_node(self, node: str) -> Dict[str, Any]:
+        """Move a data node's merchants to their new owners, then stop routing to it"""
+        node = node.rstrip("/")
+        with self.rebalance_lock:
+            if node not in self.ring.nodes:
+                raise ValueError(f"Unknown node: {node}")
+            if len(self.ring) == 1:
+                raise ValueError("Cannot remove the last node")
+            return self._rebalance(self.ring.without_node(node), node)
+
+    def _rebalance(self, ring: HashRing, changed: str) -> Dict[str, Any]:
+        """
+        Copy every merchant whose owner differs under the new ring, switch rings, then delete the old copies
+
+        Each moved merchant's tickets and KYC documents travel with its record. Writes for the merchants
+        being moved are refused with 503 from the moment they are held until the switch, and writes already
+        forwarded finish first, so the copy misses none. Reads stay with the old owner until the switch.
+        """
+        plan: Dict[Tuple[str, str], List[str]] = {}
+        for source in self.ring.nodes:
+            for record in self._call(source, "GET", "/api/shard/merchants")["merchants"]:
+                target = ring.owner(record["merchant_id"])
+                if target != source:
+                    plan.setdefault((source, target), []).append(record["merchant_id"])
+        moving = [merchant_id for merchant_ids in plan.values() for merchant_id in merchant_ids]
+
+        moved: Dict[str, int] = {}
+        renumbered: List[Dict[str, str]] = []
+        try:
+            self._hold_writes(moving)
+            for (source, target), merchant_ids in plan.items():
+                for start in range(0, len(merchant_ids), MOVE_BATCH_SIZE):
+                    batch = merchant_ids[start:start + MOVE_BATCH_SIZE]
+                    # Read only now that writes are held, so the copy is final
+                    data = self._call(source, "GET", "/api/shard/merchants?ids=" + urllib.parse.quote(",".join(batch)))
+                    result = self._call(target, "PUT", "/api/shard/merchants", {
+                        "merchants": data["merchants"],
+                        "tickets": data["tickets"]
+                    })
+                    renumbered.extend(result["tickets"]["renumbered"])
+                moved[f"{source} -> {target}"] = len(merchant_ids)
+            self.ring = ring
+        except Exception:
+            # Routing never switched, so the old owners still hold everything; drop partial copies
+            for (source, target), merchant_ids in plan.items():
+                try:
+                    self._call(target, "DELETE", "/api/shard/merchants", {"merchant_ids": merchant_ids})
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not remove partial copies from {target}: {str(e)}")
+            raise
+        finally:
+            self._release_writes(moving)
+
+        for (source, _), merchant_ids in plan.items():
+            try:
+                self._call(source, "DELETE", "/api/shard/merchants", {"merchant_ids": merchant_ids})
+            except Exception as e:
+                # The copies are unreachable through the router; a later rebalance retries
+                print(f"⚠️  Warning: Could not remove moved merchants from {source}: {str(e)}")
+
+        with self.lock:
+            self.stats["rebalances"] += 1
+            self.stats["merchants_moved"] += sum(moved.values())
+        return {"node": changed, "nodes": list(ring.nodes), "moved": moved, "renumbered_tickets": renumbered}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get nodes, forwarded call counts and rebalancing totals"""
+        with self.lock:
+            return {
+                "nodes": list(self.ring.nodes),
+                "vnodes": self.ring.vnodes,
+                "requests_per_node": dict(self.node_requests),
+                **self.stats
+            }
+
+
+def request_merchant_id() -> Optional[str]:
+    """Merchant a routed call is for, from the query string, X-Merchant-ID or the JSON body"""
+    merchant_id = request.args.get("merchant_id") or request.headers.get("X-Merchant-ID")
+    if merchant_id:
+        return merchant_id
+    data = request.get_json(silent=True)
+    return data.get("merchant_id") if isinstance(data, dict) else None
+
+
+def create_app(router: ShardRouter) -> Flask:
+    """Flask app that forwards merchant calls and exposes node membership"""
+    app = Flask(__name__)
+
+    @app.route("/api/<prefix>/<path:rest>", methods=["GET", "POST", "PUT", "DELETE"])
+    def route_call(prefix, rest):
+        """Forward a data, ticket or KYC call to the node owning its merchant"""
+        if prefix not in ROUTED_PREFIXES:
+            return jsonify({"error": "Not found"}), 404
+        merchant_id = request_merchant_id()
+        if not merchant_id:
+            return jsonify({"error": "merchant_id (query, X-Merchant-ID or body) is required to route this call"}), 400
+        writing = request.method in WRITE_METHODS
+        if writing and not router.begin_write(merchant_id):
+            response = jsonify({"error": f"Merchant {merchant_id} is moving to another node; retry shortly"})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        try:
+            # Looked up after the write is counted, so a move waits for it or it sees the new owner
+            node = router.owner(merchant_id)
+            if node is None:
+                return jsonify({"error": "No data nodes configured"}), 503
+            status, headers, body = router.forward(
+                node, request.method, request.path, request.query_string, dict(request.headers), request.get_data()
+            )
+        finally:
+            if writing:
+                router.end_write(merchant_id)
+        response = Response(body, status=status)
+        for name, value in headers:
+            if name.lower() not in HOP_HEADERS:
+                response.headers[name] = value
+        response.headers["X-Shard-Node"] = node
+        return response
+
+    @app.route("/api/router/nodes", methods=["GET"])
+    def get_nodes():
+        """Get nodes and routing stats"""
+        return jsonify(router.get_stats())
+
+    @app.route("/api/router/nodes", methods=["POST"])
+    @shard_admin_required
+    def add_node():
+        """Add a node and move the merchants it now owns"""
+        try:
+            node = (request.get_json() or {}).get("node")
+            if not node:
+                return jsonify({"error": "node is required"}), 400
+            return jsonify(router.add_node(node))
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/router/nodes", methods=["DELETE"])
+    @shard_admin_required
+    def remove_node():
+        """Drain a node into the others and stop routing to it"""
+        try:
+            node = (request.get_json() or {}).get("node")
+            if not node:
+                return jsonify({"error": "node is required"}), 400
+            return jsonify(router.remove_node(node))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/router/owner/<merchant_id>", methods=["GET"])
+    def get_owner(merchant_id):
+        """Get the node owning a merchant"""
+        return jsonify({"merchant_id": merchant_id, "node": router.owner(merchant_id)})
+
+    return app
+
+
+def split(data_folder: str, output_folder: str, nodes: List[str], vnodes: int = DEFAULT_VNODES) -> Dict[str, int]:
+    """
+    Write one data folder per node, each with the directory merchants that node owns and their tickets
+
+    The primary merchant's files are copied to every node, which needs them to start; the router
+    sends that merchant's calls to its owner only. Start each node with DATA_FOLDER set to its folder.
+
+    Returns:
+        Node folder -> merchants written to it
+    """
+    ring = HashRing(nodes, vnodes)
+    with open(os.path.join(data_folder, "merchants.json"), "rb") as f:
+        directory = serialization.loads(f.read())
+    tickets_path = os.path.join(data_folder, "merchant_tickets.json")
+    merchant_tickets = {"tickets": []}
+    if os.path.exists(tickets_path):
+        with open(tickets_path, "rb") as f:
+            merchant_tickets = serialization.loads(f.read())
+    partitioned = ("merchants.json", "merchant_tickets.json")
+    result = {}
+    for index, node in enumerate(ring.nodes):
+        folder = os.path.join(output_folder, f"node{index + 1}")
+        os.makedirs(folder, exist_ok=True)
+        for filename in os.listdir(data_folder):
+            if filename.endswith(".json") and filename not in partitioned:
+                shutil.copyfile(os.path.join(data_folder, filename), os.path.join(folder, filename))
+        owned = [record for record in directory.get("merchants", []) if ring.owner(record["merchant_id"]) == node]
+        with open(os.path.join(folder, "merchants.json"), "wb") as f:
+            f.write(serialization.dumps({**directory, "merchants": owned}, pretty=True))
+        tickets = [ticket for ticket in merchant_tickets.get("tickets", []) if ring.owner(ticket["merchant_id"]) == node]
+        with open(os.path.join(folder, "merchant_tickets.json"), "wb") as f:
+            f.write(serialization.dumps({**merchant_tickets, "tickets": tickets}, pretty=True))
+        result[folder] = len(owned)
+    return result
+
+
+# Router over SHARD_NODES, for gunicorn shard_router:app (one worker, so membership changes are shared)
+app = create_app(ShardRouter(Config.SHARD_NODES, Config.SHARD_VNODES, Config.SHARD_FORWARD_TIMEOUT))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "split":
+        for folder, count in split(sys.argv[2], sys.argv[3], sys.argv[4].split(","), Config.SHARD_VNODES).items():
+            print(f"✅ {folder}: {count} merchants")
+    elif len(sys.argv) > 1 and sys.argv[1] == "serve":
+        import argparse
+        parser = argparse.ArgumentParser(prog="shard_router.py serve")
+        parser.add_argument("--nodes", default=",".join(Config.SHARD_NODES))
+        parser.add_argument("--port", type=int, default=5000)
+        args = parser.parse_args(sys.argv[2:])
+        nodes = [node for node in args.nodes.split(",") if node]
+        create_app(ShardRouter(nodes, Config.SHARD_VNODES, Config.SHARD_FORWARD_TIMEOUT)).run(port=args.port, threaded=True)
+    else:
+        print(__doc__)
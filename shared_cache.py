@@ -0,0 +1,464 @@
+"""
+Shared Merchant Cache for Cashfree AI Support Assistant
+Memory-mapped, versioned snapshot of merchant records shared by every worker process on a host
+
+Usage:
+    python shared_cache.py --benchmark [merchant_count] [workers]
+"""
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import serialization
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writers are then not serialized across processes
+    fcntl = None
+
+MAGIC = b"CFSC"
+FORMAT_VERSION = 1
+# magic, format version, generation, source stamp, record count
+HEADER = struct.Struct("<4sIQQI")
+# merchant key digest, record offset, record length
+INDEX_ENTRY = struct.Struct("<16sQI")
+# length prefix of a delta log entry; an entry holds a merchant's new record or a new source stamp
+DELTA_LENGTH = struct.Struct("<I")
+
+# Decoded records kept per process; everything else stays in the shared mapping
+DEFAULT_DECODED_ENTRIES = 1024
+# Delta log size at which a writer folds it into a new snapshot generation
+DEFAULT_COMPACT_BYTES = 4 * 1024 * 1024
+
+
+def _key(merchant_id: str) -> bytes:
+    """Fixed-width sort key for a merchant ID"""
+    return hashlib.blake2b(merchant_id.encode("utf-8"), digest_size=16).digest()
+
+
+def _encode(record: Optional[Dict[str, Any]]) -> bytes:
+    """Serialize a record compactly"""
+    return serialization.dumps(record, default=str)
+
+
+class SharedMerchantCache:
+    """
+    Read-mostly merchant records in a memory-mapped snapshot file plus an append-only delta log
+
+    Every process maps the same snapshot, so record lookups are read straight from the page cache
+    and see updates made by any worker. An update is appended to the delta log
+    of the current generation; other processes notice the log grew and drop their stale entries.
+    Processes keeping their own index over the records follow the log through changes_since.
+    """
+
+    def __init__(self, path: str, decoded_entries: int = DEFAULT_DECODED_ENTRIES,
+                 compact_bytes: int = DEFAULT_COMPACT_BYTES, check_interval: float = 0.0):
+        """
+        Attach to (or prepare) a shared snapshot
+
+        Args:
+            path: Snapshot file; the delta log and lock file live next to it
+            decoded_entries: Decoded records cached per process
+            compact_bytes: Delta log size that triggers a new snapshot generation
+            check_interval: Minimum seconds between checks for changes made by other processes
+        """
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.decoded_entries = decoded_entries
+        self.compact_bytes = compact_bytes
+        self.check_interval = check_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.map: Optional[mmap.mmap] = None
+        self.snapshot_id: Optional[Tuple[int, int]] = None
+        self.generation = 0
+        self.source_stamp = 0
+        self.count = 0
+        self.delta_offset = 0
+        self.overlay: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Merchant IDs in delta log order for the current generation
+        self.changes: List[str] = []
+        self.decoded: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.last_check = 0.0
+        # Guards this process's mapping and decoded entries across request threads
+        self.lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "remaps": 0, "invalidations": 0}
+        self._check(force=True)
+
+    def _delta_path(self, generation: int) -> str:
+        """Delta log belonging to one snapshot generation"""
+        return f"{self.path}.{generation}.delta"
+
+    def _locked(self):
+        """Exclusive cross-process lock held while writing"""
+        return _FileLock(self.lock_path)
+
+    def _check(self, force: bool = False) -> None:
+        """Pick up a new snapshot generation or delta entries written by any process"""
+        now = time.monotonic()
+        if not force and now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if (stat.st_ino, stat.st_mtime_ns) != self.snapshot_id:
+            self._open_snapshot()
+        self._read_delta()
+
+    def _open_snapshot(self) -> None:
+        """Map the current snapshot file and reset per-generation state"""
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, generation, source_stamp, count = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            mapping.close()
+            raise ValueError(f"Not a merchant cache snapshot: {self.path}")
+        if self.map is not None:
+            self.map.close()
+        self.map = mapping
+        self.snapshot_id = (stat.st_ino, stat.st_mtime_ns)
+        self.generation = generation
+        self.source_stamp = source_stamp
+        self.count = count
+        self.delta_offset = 0
+        self.overlay = {}
+        self.changes = []
+        self.decoded.clear()
+        self.stats["remaps"] += 1
+
+    def _read_delta(self) -> List[str]:
+        """Apply delta entries appended since the last read; returns the merchant IDs they touched"""
+        try:
+            size = os.path.getsize(self._delta_path(self.generation))
+        except FileNotFoundError:
+            return []
+        if size <= self.delta_offset:
+            return []
+        with open(self._delta_path(self.generation), "rb") as f:
+            f.seek(self.delta_offset)
+            data = f.read(size - self.delta_offset)
+
+        changed = []
+        position = 0
+        # A writer may be mid-append; stop at the last complete entry
+        while position + DELTA_LENGTH.size <= len(data):
+            (length,) = DELTA_LENGTH.unpack_from(data, position)
+            end = position + DELTA_LENGTH.size + length
+            if end > len(data):
+                break
+            entry = serialization.loads(data[position + DELTA_LENGTH.size:end])
+            position = end
+            if "source_stamp" in entry:
+                self.source_stamp = entry["source_stamp"]
+                continue
+            merchant_id = entry["merchant_id"]
+            self.overlay[merchant_id] = entry["record"]
+            if self.decoded.pop(merchant_id, None) is not None:
+                self.stats["invalidations"] += 1
+            changed.append(merchant_id)
+        self.changes.extend(changed)
+        self.delta_offset += position
+        return changed
+
+    def _find(self, merchant_id: str) -> Optional[Dict[str, Any]]:
+        """Binary search the mapped index for a merchant's record"""
+        if self.map is None:
+            return None
+        key = _key(merchant_id)
+        low, high = 0, self.count
+        base = HEADER.size
+        while low < high:
+            middle = (low + high) // 2
+            position = base + middle * INDEX_ENTRY.size
+            entry_key = self.map[position:position + 16]
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                _, offset, length = INDEX_ENTRY.unpack_from(self.map, position)
+                record = serialization.loads(self.map[offset:offset + length])
+                return record if record.get("merchant_id") == merchant_id else None
+        return None
+
+    def get(self, merchant_id: str) -> Optional[Dict[str, Any]]:
+        """Get a merchant record, reflecting updates made by any process"""
+        with self.lock:
+            self._check()
+            record = self.decoded.get(merchant_id)
+            if record is not None:
+                self.decoded.move_to_end(merchant_id)
+                self.stats["hits"] += 1
+                return dict(record)
+
+            self.stats["misses"] += 1
+            if merchant_id in self.overlay:
+                record = self.overlay[merchant_id]
+            else:
+                record = self._find(merchant_id)
+            if record is None:
+                return None
+            self.decoded[merchant_id] = record
+            if len(self.decoded) > self.decoded_entries:
+                self.decoded.popitem(last=False)
+            return dict(record)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (merchant_id, record) for every merchant in the current generation
+
+        Records are decoded one at a time and not kept, so building an index over them
+        never holds a second copy of the record set.
+        """
+        with self.lock:
+            self._check()
+            for merchant_id, record in list(self.overlay.items()):
+                if record is not None:
+                    yield merchant_id, record
+            if self.map is None:
+                return
+            for index in range(self.count):
+                _, offset, length = INDEX_ENTRY.unpack_from(self.map, HEADER.size + index * INDEX_ENTRY.size)
+                record = serialization.loads(self.map[offset:offset + length])
+                if record["merchant_id"] not in self.overlay:
+                    yield record["merchant_id"], record
+
+    def merchant_ids(self) -> List[str]:
+        """Every merchant ID in the current generation"""
+        return sorted(merchant_id for merchant_id, _ in self.items())
+
+    def changes_since(self, mark: Optional[Tuple[Any, int]]) -> Tuple[Tuple[Any, int], Optional[List[str]]]:
+        """
+        Merchant IDs updated since a previous call, by this or any other process
+
+        Args:
+            mark: Mark returned by the previous call, or None
+
+        Returns:
+            (new mark, changed merchant IDs), where the IDs are None when the mark is from another
+            generation (or None) and everything must be re-read through items()
+        """
+        with self.lock:
+            self._check()
+            current = (self.snapshot_id, len(self.changes))
+            if mark is None or mark[0] != self.snapshot_id:
+                return current, None
+            return current, self.changes[mark[1]:]
+
+    def is_current(self, source_stamp: int) -> bool:
+        """Whether the published records were built from (or kept in step with) these source files"""
+        with self.lock:
+            self._check()
+            return self.map is not None and self.source_stamp == source_stamp
+
+    def put(self, merchant_id: str, record: Optional[Dict[str, Any]]) -> None:
+        """
+        Publish one merchant's new record (None removes it) to every process
+
+        Args:
+            merchant_id: Merchant to update
+            record: New record, which must include merchant_id
+        """
+        payload = _encode({"merchant_id": merchant_id, "record": record})
+        with self.lock, self._locked():
+            self._check(force=True)
+            if self.map is None:
+                # Nothing published yet: start a generation holding just this record
+                self._write_snapshot({merchant_id: record} if record is not None else {}, self.source_stamp)
+                return
+            self._append(payload)
+
+    def set_source_stamp(self, source_stamp: int) -> None:
+        """
+        Record that the source files were rewritten by a worker whose updates are already published
+
+        Workers starting from those files then attach to this generation instead of rebuilding it.
+        """
+        with self.lock, self._locked():
+            self._check(force=True)
+            if self.map is not None and self.source_stamp != source_stamp:
+                self._append(_encode({"source_stamp": source_stamp}))
+
+    def _append(self, payload: bytes) -> None:
+        """Append one entry to the current delta log, compacting when it is large (caller holds the lock)"""
+        with open(self._delta_path(self.generation), "ab") as f:
+            # One write per entry so readers never see another writer's bytes interleaved
+            f.write(DELTA_LENGTH.pack(len(payload)) + payload)
+            size = f.tell()
+        self._read_delta()
+        if size >= self.compact_bytes:
+            self._compact()
+
+    def publish(self, records: Dict[str, Dict[str, Any]], source_stamp: int) -> bool:
+        """
+        Publish a full record set as a new generation unless one built from the same sources exists
+
+        Args:
+            records: merchant_id -> record
+            source_stamp: Fingerprint of the source data; workers starting from the same files
+                attach to the existing snapshot instead of rewriting it
+
+        Returns:
+            True if a new generation was written
+        """
+        with self.lock, self._locked():
+            self._check(force=True)
+            if self.map is not None and self.source_stamp == source_stamp:
+                return False
+            self._write_snapshot(records, source_stamp)
+            return True
+
+    def _compact(self) -> None:
+        """Fold the delta log into a new snapshot generation"""
+        self._write_snapshot(dict(self.items()), self.source_stamp)
+
+    def _write_snapshot(self, records: Dict[str, Dict[str, Any]], source_stamp: int) -> None:
+        """Write a new generation and atomically replace the snapshot file (caller holds the lock)"""
+        previous = self.generation
+        generation = previous + 1
+        entries = sorted((_key(merchant_id), _encode(record)) for merchant_id, record in records.items())
+        offset = HEADER.size + len(entries) * INDEX_ENTRY.size
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, generation, source_stamp, len(entries)))
+            for key, blob in entries:
+                f.write(INDEX_ENTRY.pack(key, offset, len(blob)))
+                offset += len(blob)
+            for _, blob in entries:
+                f.write(blob)
+        os.replace(temp_path, self.path)
+        try:
+            os.remove(self._delta_path(previous))
+        except FileNotFoundError:
+            pass
+        self._open_snapshot()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot generation, size and lookup counts for this process"""
+        return {
+            "generation": self.generation,
+            "records": self.count,
+            "delta_entries": len(self.overlay),
+            "decoded_entries": len(self.decoded),
+            "snapshot_bytes": len(self.map) if self.map is not None else 0,
+            **self.stats
+        }
+
+
+def benchmark(merchant_count: int = 100000, workers: int = 3) -> Dict[str, Any]:
+    """
+    Compare per-worker resident memory with the shared cache off and on
+
+    Copies the sample data folder with a synthetic directory of merchant_count merchants, then
+    starts fresh worker interpreters one after another. Each loads the data, runs a filtered
+    merchant query and a record lookup, and reports its RSS. With the cache on, the first worker
+    publishes the snapshot and the rest attach to it.
+    """
+    import json
+    import shutil
+    import subprocess
+    import tempfile
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    folder = tempfile.mkdtemp(prefix="cashfree_shared_cache_")
+    data_folder = os.path.join(folder, "data")
+    shutil.copytree(os.path.join(root, "data"), data_folder)
+    statuses = ["active", "on_hold", "frozen", "suspended"]
+    merchants = [{
+        "merchant_id": f"MERCH{index:09d}",
+        "business_name": f"Merchant {index} Pvt Ltd",
+        "account_status": statuses[index % len(statuses)],
+        "compliance_status": "pending" if index % 3 else "verified",
+        "risk_score": ["low", "medium", "high"][index % 3],
+        "last_activity": f"2024-01-{index % 28 + 1:02d}T10:30:00Z",
+        "pending_documents": ["PAN Card"] if index % 2 else [],
+        "uploaded_documents": ["GST Certificate"],
+        "rejected_documents": []
+    } for index in range(merchant_count)]
+    with open(os.path.join(data_folder, "merchants.json"), "w", encoding="utf-8") as f:
+        json.dump({"merchants": merchants}, f, indent=2, ensure_ascii=False)
+    del merchants
+
+    # Each worker is a fresh interpreter so its memory is measured from a cold start
+    probe = (
+        "import json, resource, sys, time\n"
+        "sys.path.insert(0, {root!r})\n"
+        "from data_manager import MerchantDataManager\n"
+        "started = time.perf_counter()\n"
+        "manager = MerchantDataManager()\n"
+        "page = manager.query_merchants({{'risk_score': 'high', 'pending_kyc': True}}, limit=100)\n"
+        "assert manager.get_merchant_record('MERCH000000001')\n"
+        "ready_ms = (time.perf_counter() - started) * 1000\n"
+        "try:\n"
+        "    rss_kb = int(next(line for line in open('/proc/self/status') if line.startswith('VmRSS')).split()[1])\n"
+        "except OSError:\n"
+        "    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(json.dumps({{'ready_ms': round(ready_ms, 1), 'rss_kb': rss_kb, 'matches': page['total']}}))\n"
+    ).format(root=root)
+    results = {}
+    for mode in ("off", "on"):
+        env = dict(
+            os.environ,
+            DATA_FOLDER=data_folder,
+            AUDIT_LOG_ENABLED="False",
+            SHARED_CACHE_ENABLED="True" if mode == "on" else "False",
+            SHARED_CACHE_PATH=os.path.join(folder, "cache", "merchants.snap")
+        )
+        results[mode] = []
+        for _ in range(workers):
+            output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                                    check=True, cwd=folder, env=env)
+            results[mode].append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    return {
+        "merchants": merchant_count,
+        "workers": workers,
+        "shared_cache_off": results["off"],
+        "shared_cache_on": results["on"],
+        "snapshot_bytes": os.path.getsize(os.path.join(folder, "cache", "merchants.snap")),
+        "data_folder": data_folder
+    }
+
+
+class _FileLock:
+    """Exclusive flock on a lock file, a no-op where fcntl is unavailable"""
+
+    def __init__(self, path: str):
+        """Remember the lock file path"""
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        """Acquire the lock"""
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        """Release the lock"""
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+        return False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        import json
+        print(json.dumps(benchmark(
+            int(sys.argv[2]) if len(sys.argv) > 2 else 100000,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 3
+        ), indent=2))
+    else:
+        print(__doc__)
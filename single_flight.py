@@ -0,0 +1,78 @@
+"""
+Single-flight request coalescing for Cashfree AI Support Assistant
+Concurrent callers with the same key share one in-flight call and its result
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self):
+        """Initialize an unfinished call"""
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key"""
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self.lock = threading.Lock()
+        self.calls: Dict[str, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers using the same key
+
+        Args:
+            key: Identity of the work, callers with equal keys share one call
+            fn: Function doing the work
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller's call
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self.calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Later callers start a fresh call; only the ones already waiting share this one
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get counts of executed and coalesced calls"""
+        with self.lock:
+            return {
+                "executed_calls": self.executed,
+                "coalesced_requests": self.coalesced,
+                "in_flight": len(self.calls)
+            }
@@ -0,0 +1,271 @@
+"""
+SLA Engine for Cashfree AI Support Assistant
+Streaming resolution-time statistics per priority and category, and tickets close to breaching their SLA
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from bisect import bisect_right, insort
+from datetime import datetime
+import time
+from schemas import categorize
+
+# Percentiles reported for every statistics group
+REPORTED_PERCENTILES = (50, 90, 95, 99)
+
+# Statuses that end a ticket's SLA clock
+CLOSED_STATUSES = ("resolved", "closed")
+
+# Sorts after every ticket ID, for bisecting (time, ticket_id) pairs by time alone
+_AFTER_ANY_ID = chr(0x10FFFF)
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Epoch seconds of an ISO timestamp; naive ones are server local time"""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class TDigest:
+    """
+    Quantile sketch: sorted centroids, small near the tails and larger in the middle
+
+    Memory stays at a few times compression centroids however many values are added, and tail
+    percentiles stay accurate to a fraction of a percentile.
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.buffer: List[Tuple[float, float]] = []
+        self.count = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """Add a value; values are buffered and merged into the centroids in batches"""
+        self.buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.buffer) >= self.compression * 5:
+            self._compress()
+
+    def _compress(self) -> None:
+        """Merge buffered values into the centroids"""
+        if not self.buffer:
+            return
+        items = sorted(list(zip(self.means, self.weights)) + self.buffer)
+        self.buffer = []
+        means, weights = [], []
+        mean, weight = items[0]
+        cumulative = 0.0
+        for next_mean, next_weight in items[1:]:
+            # A centroid may grow to a size proportional to q(1 - q) at its quantile
+            q = (cumulative + weight + next_weight / 2) / self.count
+            if weight + next_weight <= max(1.0, 4 * self.count * q * (1 - q) / self.compression):
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                cumulative += weight
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0 to 1), None when empty"""
+        self._compress()
+        if not self.means:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+        target = min(max(q, 0.0), 1.0) * self.count
+        # Each centroid's mean sits at the middle of its weight; interpolate between neighbours
+        previous_mean, previous_center = self.min, 0.0
+        cumulative = 0.0
+        for mean, weight in zip(self.means, self.weights):
+            center = cumulative + weight / 2
+            if target <= center:
+                if center == previous_center:
+                    return mean
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / (center - previous_center)
+            previous_mean, previous_center = mean, center
+            cumulative += weight
+        if self.count == previous_center:
+            return self.max
+        return previous_mean + (self.max - previous_mean) * (target - previous_center) / (self.count - previous_center)
+
+
+class ResolutionStats:
+    """Count, mean, SLA hit rate and percentile sketch of resolution times in hours"""
+
+    def __init__(self, compression: int = 100):
+        self.count = 0
+        self.total_hours = 0.0
+        self.within_sla = 0
+        self.digest = TDigest(compression)
+
+    def add(self, hours: float, within_sla: bool) -> None:
+        self.count += 1
+        self.total_hours += hours
+        self.within_sla += 1 if within_sla else 0
+        self.digest.add(hours)
+
+    @property
+    def mean_hours(self) -> Optional[float]:
+        return self.total_hours / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary with hours rounded to two decimals"""
+        result = {
+            "resolved": self.count,
+            "mean_hours": round(self.mean_hours, 2) if self.count else None,
+            "within_sla_pct": round(100.0 * self.within_sla / self.count, 1) if self.count else None
+        }
+        for percentile in REPORTED_PERCENTILES:
+            value = self.digest.quantile(percentile / 100)
+            result[f"p{percentile}_hours"] = round(value, 2) if value is not None else None
+        return result
+
+
+class SLAEngine:
+    """
+    Resolution-time statistics updated one ticket at a time, plus open tickets ordered by warning time
+
+    Each resolution updates its priority, category, priority/category and overall groups.
+    Open tickets are kept sorted by the time they reach warning_fraction of their SLA target,
+    so finding the ones about to breach is a bisect rather than a scan.
+    """
+
+    def __init__(self, targets: Dict[str, float], warning_fraction: float = 0.8,
+                 default_target: float = 24.0, compression: int = 100):
+        """
+        Args:
+            targets: Priority -> resolution target in hours
+            warning_fraction: Share of the target elapsed before an open ticket is at risk
+            default_target: Target for priorities missing from targets
+            compression: t-digest compression; higher is more accurate and larger
+        """
+        self.targets = dict(targets)
+        # Capped at 1 so every breached ticket is also past its warning time
+        self.warning_fraction = min(max(warning_fraction, 0.0), 1.0)
+        self.default_target = default_target
+        self.compression = compression
+        self.groups: Dict[str, Dict[str, ResolutionStats]] = {
+            "overall": {}, "priority": {}, "category": {}, "priority_category": {}
+        }
+        # ticket_id -> open ticket details, and (warning time, ticket_id) sorted ascending
+        self.open: Dict[str, Dict[str, Any]] = {}
+        self.warning_order: List[Tuple[float, str]] = []
+        self.counted: set = set()
+        self.skipped = 0
+
+    def target_hours(self, priority: str) -> float:
+        """Resolution target of a priority"""
+        return self.targets.get(priority, self.default_target)
+
+    def observe(self, ticket: Dict[str, Any]) -> None:
+        """
+        Account for a ticket's current state; call on creation and on every status change
+
+        A resolution is counted once per ticket, even if the ticket is later reopened and resolved again.
+        """
+        ticket_id = ticket.get("ticket_id")
+        created = parse_timestamp(ticket.get("created_date"))
+        if not ticket_id or created is None:
+            self.skipped += 1
+            return
+        priority = ticket.get("priority") or "medium"
+        target = self.target_hours(priority)
+        if ticket.get("status") in CLOSED_STATUSES:
+            self._close(ticket_id)
+            if ticket_id in self.counted:
+                return
+            resolved = parse_timestamp(ticket.get("last_updated"))
+            if resolved is None or resolved < created:
+                self.skipped += 1
+                return
+            self.counted.add(ticket_id)
+            hours = (resolved - created) / 3600
+            category = categorize(f"{ticket.get('subject', '')} {ticket.get('description', '')}")
+            for group, key in (
+                ("overall", "all"), ("priority", priority), ("category", category),
+                ("priority_category", f"{priority}/{category}")
+            ):
+                stats = self.groups[group].get(key)
+                if stats is None:
+                    stats = self.groups[group][key] = ResolutionStats(self.compression)
+                stats.add(hours, hours <= target)
+        elif ticket_id not in self.open:
+            warning_at = created + target * self.warning_fraction * 3600
+            self.open[ticket_id] = {
+                "ticket_id": ticket_id,
+                "merchant_id": ticket.get("merchant_id"),
+                "subject": ticket.get("subject"),
+                "priority": priority,
+                "created": created,
+                "due": created + target * 3600,
+                "warning_at": warning_at
+            }
+            insort(self.warning_order, (warning_at, ticket_id))
+
+    def _close(self, ticket_id: str) -> None:
+        """Stop tracking an open ticket"""
+        entry = self.open.pop(ticket_id, None)
+        if entry is None:
+            return
+        index = bisect_right(self.warning_order, (entry["warning_at"], ticket_id)) - 1
+        if index >= 0 and self.warning_order[index] == (entry["warning_at"], ticket_id):
+            del self.warning_order[index]
+
+    def at_risk(self, now: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Open tickets past their warning time, most overdue first
+
+        Args:
+            now: Epoch seconds to evaluate at; current time if None
+            limit: Most tickets to return
+
+        Returns:
+            Tickets with their SLA target, due time, hours remaining (negative once breached) and breached flag
+        """
+        now = time.time() if now is None else now
+        end = bisect_right(self.warning_order, (now, _AFTER_ANY_ID))
+        result = []
+        for _, ticket_id in self.warning_order[:min(end, max(0, limit))]:
+            entry = self.open[ticket_id]
+            result.append({
+                "ticket_id": ticket_id,
+                "merchant_id": entry["merchant_id"],
+                "subject": entry["subject"],
+                "priority": entry["priority"],
+                "target_hours": self.target_hours(entry["priority"]),
+                "due": datetime.fromtimestamp(entry["due"]).isoformat(),
+                "hours_remaining": round((entry["due"] - now) / 3600, 2),
+                "breached": entry["due"] <= now
+            })
+        return result
+
+    def overall(self) -> Optional[Dict[str, Any]]:
+        """Statistics over every counted ticket, as in report()["overall"]; None before the first resolution"""
+        stats = self.groups["overall"].get("all")
+        return stats.to_dict() if stats else None
+
+    def report(self) -> Dict[str, Any]:
+        """Targets, statistics for every group and open ticket counts"""
+        now = time.time()
+        at_risk = self.warning_order[:bisect_right(self.warning_order, (now, _AFTER_ANY_ID))]
+        return {
+            "targets_hours": self.targets,
+            "warning_fraction": self.warning_fraction,
+            "open_tickets": len(self.open),
+            "at_risk": len(at_risk),
+            "breached": sum(1 for _, ticket_id in at_risk if self.open[ticket_id]["due"] <= now),
+            "skipped_tickets": self.skipped,
+            **{group: {key: stats.to_dict() for key, stats in sorted(groups.items())}
+               for group, groups in self.groups.items()}
+        }
@@ -8,162 +8,211 @@ from langchain.prompts import ChatPromptTemplate
 from langchain.schema import HumanMessage, SystemMessage
 from config import Config
 from data_manager import MerchantDataManager
+from knowledge_base import KnowledgeBase
+from schemas import QueryAnalysis, SupportAnswer, categorize
+from prompts import SYSTEM_PROMPT, SUMMARY_SYSTEM_PROMPT, COMBINED_ANALYSIS_INSTRUCTION
+from single_flight import SingleFlight
+from llm_scheduler import FairScheduler, SchedulerBusy
+from model_router import ModelRouter
 import json
 from datetime import datetime, timedelta
 import random
+import time
+import hashlib
+import re
 
 class CashfreeSupportAI:
     """AI-powered customer support assistant for Cashfree merchants"""
     
-    def __init__(self):
-        """Initialize the AI support assistant with Google Gemini model"""
+    def __init__(self, data_manager: Optional[MerchantDataManager] = None):
+        """
+        Initialize the AI support assistant with Google Gemini model
+        
+        Args:
+            data_manager: Data manager the API serves and updates, so prompts and knowledge base
+                answers read the same tickets and KYC state; a new one is loaded if None
+        """
         # Check if we have a valid API key
         self.demo_mode = not Config.GEMINI_API_KEY or Config.GEMINI_API_KEY == 'your_gemini_api_key_here' or 'demo' in Config.GEMINI_API_KEY.lower()
         
+        # Static system prompt, assembled once from versioned segments
+        self.system_prompt = SYSTEM_PROMPT["text"]
+        self.prompt_version = SYSTEM_PROMPT["version"]
+        self.prompt_cache_name: Optional[str] = None
+        
+        # Triage and per-category answer profiles; model clients are created on first use
+        self.router = ModelRouter(self._create_llm_for_profile)
+        
         if not self.demo_mode:
-            # Initialize Google Gemini chat model
-            self.llm = ChatGoogleGenerativeAI(
-                model=Config.MODEL_NAME,
-                google_api_key=Config.GEMINI_API_KEY,
-                max_output_tokens=Config.MAX_TOKENS,
-                temperature=0.7  # Balanced creativity and accuracy
-            )
+            # Serve the static prefix from provider-side context caching when enabled
+            if Config.PROMPT_CACHE_ENABLED:
+                self.prompt_cache_name = self._get_prompt_cache()
+            
+            # Initialize Google Gemini chat model with the default profile
+            self.llm = self.router.model(self.router.profile())
+            # The summarizer uses its own system prompt, so it cannot share the cached prefix
+            self.summary_llm = self._create_llm() if self.prompt_cache_name else self.llm
         else:
             self.llm = None
+            self.summary_llm = None
         
-        # Initialize data manager
-        self.data_manager = MerchantDataManager()
-        
-        # Define comprehensive system prompt for all merchant scenarios
-        self.system_prompt = """
-        You are an expert Cashfree merchant support assistant. Your role is to help merchants resolve ALL types of issues.
-        
-        You handle these categories:
-        
-        🔐 ACCOUNT STATUS & HOLDS:
-        - Account freezes and limit holds
-        - Account reactivation requests
-        - Account suspension reasons
-        - Account status checks
-        
-        🪪 KYC & COMPLIANCE:
-        - KYC completion guidance
-        - Document upload instructions
-        - KYC status checks
-        - Document requirements
-        - KYC rejection reasons
-        - Pending KYC tasks
-        
-        💸 PAYOUT ISSUES:
-        - Payout delays and status
-        - Instant payout enablement
-        - Payout scheduling
-        - Settlement schedules
-        - Payout summaries
-        
-        📈 TRANSACTION & LIMITS:
-        - Transaction limit queries
-        - Limit increase requests
-        - Limit reduction explanations
-        - Settlement cap applications
-        
-        🧾 SUPPORT TICKETS:
-        - Ticket creation
-        - Ticket escalation
-        - Ticket updates
-        - Ticket closure
-        - Ticket summaries
-        - Open ticket lists
-        
-        🧠 SELF-HELP & ACTION GUIDES:
-        - Step-by-step troubleshooting
-        - Process explanations
-        - Document verification guides
-        - Compliance error explanations
-        
-        📩 NOTIFICATIONS & PREFERENCES:
-        - Alert configurations
-        - Notification settings
-        - Email/WhatsApp preferences
-        - Summary settings
-        
-        📊 DASHBOARD INSIGHTS:
-        - Trend analysis
-        - Issue frequency analysis
-        - Performance visualization
-        - Dashboard summaries
-        
-        🛠️ ADMIN FUNCTIONS:
-        - Merchant lists
-        - Bulk operations
-        - Ticket creation on behalf
-        - Compliance reminders
-        
-        Always provide:
-        1. Clear step-by-step solutions
-        2. Relevant documentation links
-        3. Escalation paths when needed
-        4. Preventive measures for future
-        5. Specific action items
-        
-        Be professional, empathetic, and solution-focused.
-        """
+        # Share the caller's data manager rather than holding a second, stale copy
+        self.data_manager = data_manager if data_manager is not None else MerchantDataManager()
         
         # Initialize conversation history
         self.conversation_history: List[Dict] = []
+        
+        # Local FAQ tier answered before the model, with per-tier latency stats
+        self.knowledge_base = KnowledgeBase()
+        self.single_flight = SingleFlight()
+        self.scheduler = FairScheduler(Config.LLM_MAX_CONCURRENCY, Config.LLM_RESERVED_HIGH_PRIORITY)
+        self.tier_stats: Dict[str, Dict[str, float]] = {
+            tier: {"requests": 0, "total_ms": 0.0, "max_ms": 0.0}
+            for tier in ("knowledge_base", "demo", "template", "llm")
+        }
+    
+    def _create_llm(self, cached_content: Optional[str] = None, profile: Optional[Dict[str, Any]] = None) -> ChatGoogleGenerativeAI:
+        """Create a Gemini chat model for a profile (default: MODEL_PROFILES["default"]), optionally bound to a cached prompt prefix"""
+        profile = profile or Config.MODEL_PROFILES["default"]
+        options = {"cached_content": cached_content} if cached_content else {}
+        return ChatGoogleGenerativeAI(
+            model=profile["model"],
+            google_api_key=Config.GEMINI_API_KEY,
+            max_output_tokens=profile["max_tokens"],
+            temperature=profile["temperature"],
+            **options
+        )
     
-    def analyze_query(self, merchant_query: str) -> Dict:
+    def _create_llm_for_profile(self, profile: Dict[str, Any]) -> ChatGoogleGenerativeAI:
+        """Create a model for the router; only the main model can use the cached prompt prefix"""
+        cached_content = self.prompt_cache_name if profile["model"] == Config.MODEL_NAME else None
+        return self._create_llm(cached_content, profile)
+    
+    def _get_prompt_cache(self) -> Optional[str]:
+        """Find or create a provider-side cache holding the system prompt for this prompt version"""
+        try:
+            import google.generativeai as genai
+            from google.generativeai import caching
+            
+            genai.configure(api_key=Config.GEMINI_API_KEY)
+            display_name = f"cashfree-support-{self.prompt_version}"
+            
+            # Reuse a cache created by another worker or an earlier run of the same prompt version
+            for cached in caching.CachedContent.list():
+                if cached.display_name == display_name:
+                    return cached.name
+            
+            cached = caching.CachedContent.create(
+                model=f"models/{Config.MODEL_NAME}",
+                display_name=display_name,
+                system_instruction=self.system_prompt,
+                ttl=timedelta(seconds=Config.PROMPT_CACHE_TTL)
+            )
+            return cached.name
+        except Exception as e:
+            # Prompts below the provider's minimum cacheable size also end up here
+            print(f"⚠️  Warning: Prompt caching unavailable ({str(e)}). Sending the system prompt with each call.")
+            return None
+    
+    def _invoke_model(self, model, messages: List, merchant_id: Optional[str] = None, priority: str = "medium",
+                      route: Optional[str] = None, profile: Optional[Dict[str, Any]] = None):
+        """
+        Invoke a model once a scheduler slot is free for the merchant
+        
+        Args:
+            route: Router route to account the call under, with the profile it used
+        
+        Raises:
+            SchedulerBusy: Low-priority call could not get a slot within LLM_LOW_PRIORITY_MAX_WAIT
+        """
+        merchant_id = merchant_id or self.data_manager.merchant_data["merchant_id"]
+        max_wait = Config.LLM_LOW_PRIORITY_MAX_WAIT if priority == "low" else None
+        with self.scheduler.slot(merchant_id, Config.LLM_MERCHANT_WEIGHTS.get(merchant_id, 1.0), priority, max_wait):
+            started = time.perf_counter()
+            response = model.invoke(messages)
+        if route:
+            output = response.content if hasattr(response, "content") else response.model_dump_json()
+            prompt = "".join(str(message.content) for message in messages)
+            self.router.record(route, profile, time.perf_counter() - started, prompt, output)
+        return response
+    
+    def _query_priority(self, query: str) -> str:
+        """Scheduling priority of a query: escalations first, deferrable categories last"""
+        if self._check_escalation_needed(query):
+            return "high"
+        if self._analyze_locally(query)["category"] in Config.LOW_PRIORITY_CATEGORIES:
+            return "low"
+        return "medium"
+    
+    def _system_messages(self, model_name: Optional[str] = None) -> List[SystemMessage]:
+        """System prompt messages to send, empty when the prefix is served from the provider cache"""
+        if self.prompt_cache_name and model_name in (None, Config.MODEL_NAME):
+            return []
+        return [SystemMessage(content=self.system_prompt)]
+    
+    def analyze_query(self, merchant_query: str, merchant_id: Optional[str] = None) -> Dict:
         """
         Analyze merchant query and categorize the issue
         
         Args:
             merchant_query: The merchant's question or issue description
+            merchant_id: Merchant asking, used for fair scheduling of model calls
             
         Returns:
-            Dictionary with analysis results
-        """
-        # Create comprehensive analysis prompt
-        analysis_prompt = f"""
-        Analyze this merchant query and categorize the issue:
-        
-        Query: "{merchant_query}"
-        
-        Please provide:
-        1. Issue category (account_hold, kyc_compliance, payout_issue, transaction_limit, support_ticket, self_help, notification, dashboard_insight, admin_function, testing)
-        2. Priority level (high, medium, low)
-        3. Key concerns identified
-        4. Suggested immediate actions
-        5. Required tools/functions to invoke
-        
-        Format as JSON.
+            Dictionary with parsed analysis fields
         """
-        
-        # Get AI analysis
-        analysis_response = self.llm.invoke([
-            SystemMessage(content=self.system_prompt),
-            HumanMessage(content=analysis_prompt)
-        ])
+        triage_profile = self.router.triage_profile()
+        if self.demo_mode or not self.llm or triage_profile is None:
+            # Keyword rules categorize and spot escalations without a model call
+            started = time.perf_counter()
+            analysis = self._analyze_locally(merchant_query)
+            self.router.record("triage", None, time.perf_counter() - started)
+        else:
+            # Create comprehensive analysis prompt
+            analysis_prompt = f"""
+            Analyze this merchant query and categorize the issue:
+            
+            Query: "{merchant_query}"
+            
+            Please provide:
+            1. Issue category
+            2. Priority level (high, medium, low)
+            3. Key concerns identified
+            4. Suggested immediate actions
+            5. Required tools/functions to invoke
+            """
+            
+            # Get AI analysis as a validated schema
+            try:
+                analysis = self._invoke_model(
+                    self.router.model(triage_profile, QueryAnalysis),
+                    self._system_messages(triage_profile["model"]) + [HumanMessage(content=analysis_prompt)],
+                    merchant_id,
+                    self._query_priority(merchant_query),
+                    "triage",
+                    triage_profile
+                ).model_dump()
+            except SchedulerBusy:
+                analysis = self._analyze_locally(merchant_query)
         
         return {
             "query": merchant_query,
-            "analysis": analysis_response.content,
+            "analysis": analysis,
             "timestamp": datetime.now().isoformat()
         }
     
-    def generate_response(self, merchant_query: str, ticket_history: Optional[str] = None) -> Dict:
-        """
-        Generate intelligent response based on merchant query and ticket history
-        
-        Args:
-            merchant_query: The merchant's current question
-            ticket_history: Optional previous conversation history
-            
-        Returns:
-            Dictionary with AI-generated response and suggestions
-        """
-        # Get relevant data from data manager
-        relevant_data = self.data_manager.get_relevant_data_for_query(merchant_query)
-        
+    def _analyze_locally(self, query: str, category: Optional[str] = None) -> Dict[str, Any]:
+        """Categorize a query with keyword rules when no model call is made"""
+        if category is None:
+            category = categorize(query)
+        return QueryAnalysis(
+            category=category,
+            priority="high" if self._check_escalation_needed(query) else "medium",
+            suggested_actions=self._generate_suggestions(query)[:3]
+        ).model_dump()
+    
+    def _build_response_prompt(self, merchant_query: str, ticket_history: Optional[str], relevant_data: Dict[str, Any]) -> str:
+        """Build the response generation prompt from history, merchant data and similar tickets"""
         # Build context from ticket history if available
         context = ""
         if ticket_history:
@@ -172,8 +221,17 @@ class CashfreeSupportAI:
         # Add relevant data to context
         data_context = f"Relevant merchant data:\n{json.dumps(relevant_data, indent=2)}\n\n"
         
+        # Ground the answer in how similar tickets were resolved
+        similar_tickets = self.data_manager.find_similar_tickets(merchant_query, Config.SIMILAR_TICKETS_K)
+        if similar_tickets:
+            cases = "\n".join(
+                f"- {ticket['subject']}: {ticket['description']} -> Resolution: {ticket['resolution'] or 'resolved'}"
+                for ticket in similar_tickets
+            )
+            data_context += f"Similar resolved tickets:\n{cases}\n\n"
+        
         # Create comprehensive response generation prompt
-        response_prompt = f"""
+        return f"""
         {context}{data_context}Merchant Query: "{merchant_query}"
         
         Please provide a comprehensive response including:
@@ -184,52 +242,186 @@ class CashfreeSupportAI:
         5. Preventive measures
         6. Specific tools or functions to use
         7. Reference the provided merchant data when relevant
+        8. Reuse what worked in similar resolved tickets, if any
         
         Make it clear, actionable, and merchant-friendly.
         Include specific details from the merchant data when applicable.
         """
+    
+    def generate_response(self, merchant_query: str, ticket_history: Optional[str] = None, include_analysis: bool = False,
+                          merchant_id: Optional[str] = None) -> Dict:
+        """
+        Generate intelligent response based on merchant query and ticket history
         
-        # Generate AI response
-        if self.demo_mode or not self.llm:
-            # Demo mode response
-            demo_response = self._generate_demo_response(merchant_query, relevant_data)
-            conversation_entry = {
+        Args:
+            merchant_query: The merchant's current question
+            ticket_history: Optional previous conversation history
+            include_analysis: Also return the query analysis (category, priority, actions),
+                produced by the same model call as the answer
+            merchant_id: Merchant asking, used for fair scheduling of model calls and to fill
+                knowledge base answers from that merchant's own records
+            
+        Returns:
+            Dictionary with AI-generated response and suggestions
+        """
+        started = time.perf_counter()
+        
+        # Tier 1: answer FAQ-style queries from the local knowledge base
+        kb_answer = self.knowledge_base.answer(
+            merchant_query, self.data_manager, Config.KB_CONFIDENCE_THRESHOLD, merchant_id
+        )
+        if kb_answer:
+            self.conversation_history.append({
                 "query": merchant_query,
-                "response": demo_response,
+                "response": kb_answer["response"],
                 "timestamp": datetime.now().isoformat()
-            }
-            self.conversation_history.append(conversation_entry)
+            })
+            self._record_tier("knowledge_base", started)
             
-            return {
-                "response": demo_response,
+            result = {
+                "response": kb_answer["response"],
                 "suggestions": self._generate_suggestions(merchant_query),
                 "escalation_needed": self._check_escalation_needed(merchant_query),
                 "conversation_id": len(self.conversation_history),
-                "merchant_data": relevant_data,
-                "demo_mode": True
+                "merchant_data": kb_answer["merchant_data"],
+                "answered_by": "knowledge_base",
+                "kb_confidence": kb_answer["confidence"]
             }
+            if include_analysis:
+                result["analysis"] = self._analyze_locally(merchant_query, kb_answer["category"])
+            return result
+        
+        # Get relevant data from data manager
+        relevant_data = self.data_manager.get_relevant_data_for_query(merchant_query)
+        
+        # Generate AI response
+        if self.demo_mode or not self.llm:
+            # Demo mode response
+            return self._template_response(merchant_query, relevant_data, include_analysis, "demo", started)
         else:
-            # Real AI response
-            ai_response = self.llm.invoke([
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=response_prompt)
-            ])
+            priority = self._query_priority(merchant_query)
+            profile = self.router.profile(categorize(merchant_query))
+            
+            def call_model() -> Dict[str, Any]:
+                response_prompt = self._build_response_prompt(merchant_query, ticket_history, relevant_data)
+                messages = self._system_messages(profile["model"])
+                if include_analysis and self.router.triage_mode == "main":
+                    # One structured call returns both the analysis and the answer
+                    messages.append(HumanMessage(content=response_prompt + COMBINED_ANALYSIS_INSTRUCTION))
+                    answer = self._invoke_model(
+                        self.router.model(profile, SupportAnswer), messages, merchant_id, priority, "answer_with_analysis", profile
+                    )
+                    return {"response": answer.response, "analysis": answer.model_dump(exclude={"response"})}
+                # Real AI response
+                messages.append(HumanMessage(content=response_prompt))
+                output = {"response": self._invoke_model(self.router.model(profile), messages, merchant_id, priority, "answer", profile).content}
+                if include_analysis:
+                    # Triage stays off the answer model
+                    output["analysis"] = self.analyze_query(merchant_query, merchant_id)["analysis"]
+                return output
+            
+            # Identical concurrent queries over the same data share one model call
+            try:
+                model_output, coalesced = self.single_flight.do(
+                    self._coalescing_key(merchant_query, ticket_history, relevant_data, include_analysis),
+                    call_model
+                )
+            except SchedulerBusy:
+                # Low-priority work is degraded to the template answer rather than queued behind urgent queries
+                return self._template_response(merchant_query, relevant_data, include_analysis, "template", started)
+            response_text = model_output["response"]
+            analysis = model_output.get("analysis")
             
             # Store in conversation history
             conversation_entry = {
                 "query": merchant_query,
-                "response": ai_response.content,
+                "response": response_text,
                 "timestamp": datetime.now().isoformat()
             }
             self.conversation_history.append(conversation_entry)
+            self._record_tier("llm", started)
             
-            return {
-                "response": ai_response.content,
+            result = {
+                "response": response_text,
                 "suggestions": self._generate_suggestions(merchant_query),
                 "escalation_needed": self._check_escalation_needed(merchant_query),
                 "conversation_id": len(self.conversation_history),
-                "merchant_data": relevant_data
+                "merchant_data": relevant_data,
+                "answered_by": "llm",
+                "prompt_version": self.prompt_version,
+                "coalesced": coalesced
             }
+            if analysis is not None:
+                result["analysis"] = analysis
+            return result
+    
+    def _template_response(self, merchant_query: str, relevant_data: Dict[str, Any], include_analysis: bool,
+                           tier: str, started: float) -> Dict[str, Any]:
+        """Answer from the built-in response templates, in demo mode or when model capacity is saved for urgent work"""
+        template_response = self._generate_demo_response(merchant_query, relevant_data)
+        conversation_entry = {
+            "query": merchant_query,
+            "response": template_response,
+            "timestamp": datetime.now().isoformat()
+        }
+        self.conversation_history.append(conversation_entry)
+        self._record_tier(tier, started)
+        
+        result = {
+            "response": template_response,
+            "suggestions": self._generate_suggestions(merchant_query),
+            "escalation_needed": self._check_escalation_needed(merchant_query),
+            "conversation_id": len(self.conversation_history),
+            "merchant_data": relevant_data,
+            "answered_by": tier
+        }
+        if tier == "demo":
+            result["demo_mode"] = True
+        else:
+            result["degraded"] = True
+        if include_analysis:
+            result["analysis"] = self._analyze_locally(merchant_query)
+        return result
+    
+    def _coalescing_key(self, merchant_query: str, ticket_history: Optional[str], relevant_data: Dict[str, Any], include_analysis: bool) -> str:
+        """Key identifying model calls that would produce the same answer"""
+        normalized_query = " ".join(re.findall(r"[a-z0-9]+", merchant_query.lower()))
+        category = self._analyze_locally(merchant_query)["category"]
+        data_fingerprint = hashlib.sha256(
+            json.dumps([relevant_data, ticket_history], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        return "|".join([self.prompt_version, category, normalized_query, data_fingerprint, str(include_analysis)])
+    
+    def _record_tier(self, tier: str, started: float) -> None:
+        """Record one request served by a pipeline tier"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.tier_stats[tier]
+        stats["requests"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Get the share of traffic served by each tier and its latency"""
+        total = sum(stats["requests"] for stats in self.tier_stats.values())
+        tiers = {}
+        for tier, stats in self.tier_stats.items():
+            tiers[tier] = {
+                "requests": stats["requests"],
+                "share": round(stats["requests"] / total, 3) if total else 0.0,
+                "avg_latency_ms": round(stats["total_ms"] / stats["requests"], 2) if stats["requests"] else 0.0,
+                "max_latency_ms": round(stats["max_ms"], 2)
+            }
+        return {
+            "total_requests": total,
+            "served_locally": round(tiers["knowledge_base"]["share"], 3),
+            "prompt_version": self.prompt_version,
+            "prompt_segments": SYSTEM_PROMPT["segments"],
+            "prompt_cached": bool(self.prompt_cache_name),
+            "coalescing": self.single_flight.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "model_routing": self.router.get_stats(),
+            "tiers": tiers
+        }
     
     def _generate_suggestions(self, query: str) -> List[str]:
         """Generate relevant suggestions based on query"""
@@ -319,7 +511,7 @@ class CashfreeSupportAI:
         # Admin Functions
         elif any(word in query_lower for word in ["admin", "list", "bulk", "manager"]):
             suggestions = [
-                "Use admin portal for bulk operations",
+                "Run bulk operations for merchant lists, reminders or tickets",
                 "Generate reports for management review",
                 "Set up automated compliance checks",
                 "Configure team access permissions",
@@ -476,10 +668,10 @@ I can help you with various merchant support issues including:
         """
         
         # Generate summary
-        summary_response = self.llm.invoke([
-            SystemMessage(content="You are a support conversation summarizer."),
+        summary_response = self._invoke_model(self.summary_llm, [
+            SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
             HumanMessage(content=summary_prompt)
-        ])
+        ], route="summary", profile=self.router.profile())
         
         return summary_response.content
     
@@ -553,10 +745,16 @@ I can help you with various merchant support issues including:
         
         if scenario_type in scenario_prompts:
             prompt = scenario_prompts[scenario_type]
-            response = self.llm.invoke([
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=prompt)
-            ])
+            profile = self.router.profile(scenario_type)
+            try:
+                response = self._invoke_model(
+                    self.router.model(profile), self._system_messages(profile["model"]) + [HumanMessage(content=prompt)],
+                    priority=self._query_priority(query), route="scenario", profile=profile
+                )
+            except SchedulerBusy:
+                result = self._template_response(query, relevant_data, False, "template", time.perf_counter())
+                result.update({"scenario_type": scenario_type, "query": query})
+                return result
             
             return {
                 "scenario_type": scenario_type,
@@ -0,0 +1,129 @@
+"""
+Ticket Retrieval Index for Cashfree AI Support Assistant
+BM25 inverted index over resolved tickets, used to ground responses in past resolutions
+"""
+from typing import Dict, List, Any, Set
+import heapq
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "for", "from", "has", "have", "i", "in",
+    "is", "it", "my", "of", "on", "or", "the", "to", "was", "we", "with", "you", "your",
+    "me", "can", "do", "how", "what", "why", "this", "that", "been", "not"
+}
+
+SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def stem(token: str) -> str:
+    """Strip a common English suffix so delayed/delays match delay"""
+    for suffix in SUFFIXES:
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, stemmed word tokens without stopwords"""
+    return [stem(token) for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class TicketRetrievalIndex:
+    """Incremental BM25 index over ticket subject, description and resolution text"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize an empty index with BM25 parameters"""
+        self.k1 = k1
+        self.b = b
+        # term -> ticket_id -> term frequency
+        self.postings: Dict[str, Dict[str, int]] = {}
+        # ticket_id -> (document length, distinct terms)
+        self.documents: Dict[str, Any] = {}
+        self.tickets: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        """Number of indexed tickets"""
+        return len(self.documents)
+
+    @staticmethod
+    def ticket_text(ticket: Dict[str, Any]) -> str:
+        """Text used to index a ticket"""
+        return " ".join([
+            ticket.get("subject", ""),
+            ticket.get("description", ""),
+            ticket.get("resolution", "")
+        ])
+
+    def add(self, ticket: Dict[str, Any]) -> None:
+        """Index a ticket, replacing any previous version of it"""
+        ticket_id = ticket["ticket_id"]
+        self.remove(ticket_id)
+
+        tokens = tokenize(self.ticket_text(ticket))
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[ticket_id] = frequency
+
+        terms: Set[str] = set(frequencies)
+        self.documents[ticket_id] = (len(tokens), terms)
+        self.tickets[ticket_id] = ticket
+        self.total_length += len(tokens)
+
+    def remove(self, ticket_id: str) -> None:
+        """Drop a ticket from the index"""
+        document = self.documents.pop(ticket_id, None)
+        if document is None:
+            return
+        length, terms = document
+        for term in terms:
+            postings = self.postings[term]
+            del postings[ticket_id]
+            if not postings:
+                del self.postings[term]
+        del self.tickets[ticket_id]
+        self.total_length -= length
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Find the tickets most similar to a query
+
+        Args:
+            query: Free-text merchant query
+            k: Number of tickets to return
+
+        Returns:
+            Up to k tickets with a BM25 score, best first
+        """
+        if not self.documents:
+            return []
+
+        count = len(self.documents)
+        average_length = self.total_length / count or 1
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for ticket_id, frequency in postings.items():
+                length = self.documents[ticket_id][0]
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[ticket_id] = scores.get(ticket_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "ticket_id": ticket_id,
+                "subject": self.tickets[ticket_id].get("subject", ""),
+                "description": self.tickets[ticket_id].get("description", ""),
+                "resolution": self.tickets[ticket_id].get("resolution", ""),
+                "score": round(score, 3)
+            }
+            for ticket_id, score in best
+        ]